@@ -0,0 +1,448 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# Benchmarks import the simulation and post-processing modules as scripts
+# in those directories do
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'post-processing'))
+sys.path.insert(0, os.path.join(ROOT, 'simulation'))
+
+import arrays.matrix as mat
+
+import frequency.frequency as frequency
+
+import modal.modal as modal
+
+import newmark.integrator as integrator
+import newmark.kernels as kernels
+import newmark.newmark as newmark
+
+import utilities.motion as motion
+import utilities.save as save
+import utilities.sink as sink
+
+import read
+import solve
+
+GROUPS = ('assembly', 'step', 'solve', 'io')
+SIZES = (51, 501, 5001, 50001, 100001)
+QUICK_SIZES = (51, 501)
+SOLVERS = ('compliant', 'lumped', 'lumped-jit', 'rigid', 'implicit',
+           'frequency', 'modal')
+
+# Soil column shared by every case, one 1 m element per node so mesh size
+# sets the height and the time step stays fixed
+PARAMS = {'vs': 100.0, 'rho': 1000.0, 'vs_rock': 100.0, 'rho_rock': 1000.0}
+DT = 0.009
+# Largest mesh assembled with dense storage
+DENSE_MAX = 5001
+
+
+def measure(run, setup=None, repeat=3):
+    """Return wall time and peak traced memory of a benchmark
+
+    The first call runs under `tracemalloc` for the peak memory of Python
+    and Numpy allocations (memory maps and compiled kernel work arrays are
+    not traced), and doubles as a warm up for caches and Numba compilation.
+    The following `repeat` calls are timed without tracing.
+
+    Parameters
+    ----------
+    run : callable
+        Benchmarked function called with the outputs of `setup`
+    setup : callable
+        Untimed function returning a tuple of arguments of `run` (default
+        is None for no arguments)
+    repeat : int
+        Number of timed calls (default is 3)
+
+    Returns
+    -------
+    result : dict
+        Dictionary with `'time'` (fastest call) [s], `'median'` [s],
+        `'times'` (every call) [s], and `'peak_mb'` [MB]
+    """
+
+    args = setup() if (setup != None) else ()
+    tracemalloc.start()
+    try:
+        run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    del args
+
+    times = []
+    for _ in range(max(1, repeat)):
+        args = setup() if (setup != None) else ()
+        start = time.perf_counter()
+        run(*args)
+        times += [time.perf_counter() - start]
+        del args
+
+    return {
+        'time': min(times),
+        'median': statistics.median(times),
+        'times': times,
+        'peak_mb': peak / 2**20,
+    }
+
+
+def column(num_nodes, storage='banded', rigid=False):
+    """Return params and sim dictionaries of a column with `num_nodes`
+
+    Parameters
+    ----------
+    num_nodes : int
+        Number of nodes
+    storage : str
+        Matrix storage (default is `'banded'`)
+    rigid : bool
+        True for a rigid base (default is False)
+
+    Returns
+    -------
+    params : dict
+        Dictionary of material parameters
+    sim : dict
+        Dictionary of simulation settings
+    """
+
+    sim = {'name': f'n{num_nodes}', 'rigid': rigid, 'A': 1.0,
+           'B': 4 * np.pi, 'h': float(num_nodes - 1), 'h_elem': 1.0,
+           'storage': storage, 'dt': DT}
+    return dict(PARAMS), sim
+
+
+def benchAssembly(sizes, repeat):
+    """Time mass and stiffness matrix assembly in every storage"""
+
+    results = []
+    for n in sizes:
+        params, sim = column(n)
+        prof = solve.assemble(params, sim)[0]
+        for storage in ('dense', 'banded', 'csr'):
+            if (storage == 'dense') and (n > DENSE_MAX):
+                continue
+            cases = {
+                'mass': lambda: mat.MassMatrix(n, prof.rho, prof.h_elem, 1.0,
+                                               storage),
+                'stiffness': lambda: mat.StiffnessMatrix(
+                    n, prof.vs, prof.rho, 1.0, prof.h_elem, storage),
+            }
+            for name, run in cases.items():
+                results += [dict(measure(run, repeat=repeat),
+                                 group='assembly', case=f'{name}/{storage}',
+                                 nodes=n, steps=None)]
+
+    return results
+
+
+class _Discard(sink.Sink):
+    """Sink dropping every block so only the engine is timed"""
+
+    def store(self, cols, arrays):
+        pass
+
+
+def benchStep(sizes, steps, repeat, solvers=SOLVERS):
+    """Time per step cost of every Newmark solver and whole run engine"""
+
+    results = []
+    a_time = DT * np.arange(steps + 1)
+    v_hat, a_hat = motion.Motion(1.0, 4 * np.pi).history(a_time)
+    surface = np.array([0])
+
+    for n in sizes:
+        for name in solvers:
+            jit = name == 'lumped-jit'
+            if jit and (kernels.explicitTridiagonal is None):
+                continue
+            rigid = name in ('rigid', 'modal')
+            params, sim = column(n, rigid=rigid)
+            _, m, k, c, f = solve.assemble(params, sim)
+            args = (0.0, 0.5, DT, m.matrix, k.matrix, c.matrix, f)
+
+            # Whole run engines solve every step at once
+            if name == 'frequency':
+                setup = None
+                run = lambda: frequency.response(
+                    m.matrix, k.matrix, c.matrix, f, v_hat, DT, surface)
+            elif name == 'modal':
+                # Cold eigenbasis so every call includes the eigensolve
+                setup = lambda: modal._cache.clear() or ()
+                run = lambda: modal.response(m.matrix, k.matrix, a_hat, DT,
+                                             20, surface)
+            else:
+                if name == 'compliant':
+                    make = lambda: newmark.ExplicitNewmarkCompliant(*args)
+                elif name == 'rigid':
+                    make = lambda: newmark.ExplicitNewmarkRigid(*args)
+                elif name == 'implicit':
+                    make = lambda: newmark.ImplicitNewmark(
+                        0.25, *args[1:])
+                else:
+                    make = lambda: newmark.ExplicitNewmarkLumped(*args)
+                setup = lambda: (make(),)
+                run = lambda solver: integrator.integrate(
+                    solver, v_hat[:-1], a_hat[:-1], jit, _Discard())
+
+            result = measure(run, setup, repeat)
+            result['per_step'] = result['time'] / steps
+            results += [dict(result, group='step', case=name, nodes=n,
+                             steps=steps)]
+
+    return results
+
+
+def benchSolve(sizes, steps, repeat, fmt='npy'):
+    """Time the whole `solve.solve` pipeline writing every output"""
+
+    results = []
+    root = tempfile.mkdtemp(prefix='bench-solve-')
+    try:
+        for n in sizes:
+            for rigid in (False, True):
+                params, sim = column(n, rigid=rigid)
+                sim.update({'tf': steps * DT, 'format': fmt})
+                count = iter(range(repeat + 1))
+
+                def setup():
+                    # Fresh output directory for every call
+                    return (dict(sim, name=f'{sim["name"]}-{next(count)}'),)
+
+                def run(sim):
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        saveDir = solve.solve(params, sim, root)
+                    shutil.rmtree(saveDir)
+
+                base = 'rigid' if rigid else 'compliant'
+                results += [dict(measure(run, setup, repeat), group='solve',
+                                 case=f'{base}/{fmt}', nodes=n, steps=steps)]
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def benchIO(sizes, steps, repeat, formats=save.FORMATS):
+    """Time saving and loading [nodes x steps] data in every format"""
+
+    results = []
+    root = tempfile.mkdtemp(prefix='bench-io-')
+    try:
+        for n in sizes:
+            df = np.random.default_rng(0).standard_normal((n, steps + 1))
+            for fmt in formats:
+                if ((fmt == 'h5') and (save.h5py is None)) or (
+                        (fmt == 'zarr') and (save.zarr is None)):
+                    continue
+                path = os.path.join(root, f'{fmt}-{n}')
+                os.makedirs(path)
+
+                def dump():
+                    save.saveData(df, 'disp', path, fmt)
+
+                def load():
+                    read.loadData(path, 'disp')
+
+                def surface():
+                    with read.Results(path) as results:
+                        results.get('disp', [0])
+
+                for name, run in (('save', dump), ('load', load),
+                                  ('surface', surface)):
+                    results += [dict(measure(run, repeat=repeat), group='io',
+                                     case=f'{name}/{fmt}', nodes=n,
+                                     steps=steps)]
+                shutil.rmtree(path)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    return results
+
+
+def environment():
+    """Return dictionary describing the benchmarked code and machine"""
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    versions = {'numpy': np.__version__}
+    for name in ('scipy', 'numba', 'h5py', 'zarr'):
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = None
+
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'versions': versions,
+    }
+
+
+def run(groups=GROUPS, sizes=SIZES, steps=200, repeat=3, verbose=True):
+    """Run benchmark groups
+
+    Parameters
+    ----------
+    groups : tuple
+        Benchmark groups from `GROUPS` (default is every group)
+    sizes : tuple
+        Numbers of nodes (default is `SIZES`)
+    steps : int
+        Number of time steps of step, solve, and io benchmarks (default is
+        200)
+    repeat : int
+        Number of timed calls per case (default is 3)
+    verbose : bool
+        True to print each case as it finishes (default is True)
+
+    Returns
+    -------
+    report : dict
+        Dictionary with `'env'` (see `environment`), `'config'`, and
+        `'results'` (list of case dictionaries with `'group'`, `'case'`,
+        `'nodes'`, `'steps'`, `'time'`, `'median'`, `'times'`, and
+        `'peak_mb'`, plus `'per_step'` for the step group)
+    """
+
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        raise ValueError(f'unknown groups {sorted(unknown)}, use {GROUPS}')
+
+    benches = {
+        'assembly': lambda n: benchAssembly([n], repeat),
+        'step': lambda n: benchStep([n], steps, repeat),
+        'solve': lambda n: benchSolve([n], steps, repeat),
+        'io': lambda n: benchIO([n], steps, repeat),
+    }
+
+    results = []
+    for group in groups:
+        for n in sizes:
+            for r in benches[group](n):
+                results += [r]
+                if verbose:
+                    print(f'{group:9s} {r["case"]:18s} {n:7d} nodes '
+                          f'{r["time"]:10.4f} s {r["peak_mb"]:9.1f} MB')
+
+    return {
+        'env': environment(),
+        'config': {'groups': list(groups), 'sizes': list(sizes),
+                   'steps': steps, 'repeat': repeat, 'dt': DT},
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=0.1):
+    """Return cases whose time changed between two reports
+
+    Parameters
+    ----------
+    old : dict
+        Baseline report from `run`
+    new : dict
+        New report from `run`
+    threshold : float
+        Relative change in fastest time reported (default is 0.1)
+
+    Returns
+    -------
+    changes : list
+        List of `(group, case, nodes, steps, old_time, new_time)` tuples of
+        cases in both reports that are slower or faster by more than
+        `threshold`
+    """
+
+    def key(r):
+        return (r['group'], r['case'], r['nodes'], r['steps'])
+
+    baseline = {key(r): r['time'] for r in old['results']}
+    changes = []
+    for r in new['results']:
+        t0 = baseline.get(key(r))
+        if (t0 != None) and (abs(r['time'] / t0 - 1.0) > threshold):
+            changes += [key(r) + (t0, r['time'])]
+
+    return changes
+
+
+def main():
+    """
+    Run benchmarks and write a JSON report, for example
+        python benchmarks/bench.py --quick
+        python benchmarks/bench.py --groups step io --sizes 501 50001
+        python benchmarks/bench.py --compare benchmarks/results-abc1234.json
+    """
+    parser = argparse.ArgumentParser(description='Solve pipeline benchmarks')
+    parser.add_argument('--groups', nargs='+', default=list(GROUPS),
+                        choices=GROUPS, help='benchmark groups')
+    parser.add_argument('--sizes', nargs='+', type=int, default=None,
+                        help=f'numbers of nodes (default: {SIZES})')
+    parser.add_argument('--steps', type=int, default=200,
+                        help='time steps per run')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timed calls per case')
+    parser.add_argument('--quick', action='store_true',
+                        help=f'small meshes {QUICK_SIZES} and 50 steps')
+    parser.add_argument('--out', default=None,
+                        help='report file (default: benchmarks/'
+                             'results-<commit>.json)')
+    parser.add_argument('--compare', default=None,
+                        help='baseline report to compare against')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative time change reported by --compare')
+    args = parser.parse_args()
+
+    sizes = args.sizes if (args.sizes != None) else (
+        QUICK_SIZES if args.quick else SIZES)
+    steps = 50 if (args.quick and args.steps == 200) else args.steps
+    report = run(args.groups, sizes, steps, args.repeat)
+
+    # Write report named after the benchmarked commit
+    out = args.out
+    if out == None:
+        commit = (report['env']['commit'] or 'local')[:7]
+        out = os.path.join(ROOT, 'benchmarks', f'results-{commit}.json')
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f'Wrote {out}')
+
+    # Report changes and exit with failure on slower cases
+    if args.compare != None:
+        with open(args.compare) as f:
+            old = json.load(f)
+        changes = compare(old, report, args.threshold)
+        for group, case, n, s, t0, t1 in changes:
+            label = 'slower' if (t1 > t0) else 'faster'
+            print(f'{group} {case} {n} nodes: {t0:.4f} s -> {t1:.4f} s '
+                  f'({t1 / t0:.2f}x, {label})')
+        if any(t1 > t0 for *_, t0, t1 in changes):
+            quit(1)
+
+
+if __name__ == '__main__':
+    main()
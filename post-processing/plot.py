@@ -5,6 +5,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import AutoMinorLocator
 
+import read
 from settings import *
 
 
@@ -23,19 +24,23 @@ def plot(save, dir_name):
     None    
     """
 
-    # Put simulation data into arrays
+    # Open simulation data (any saved format) without loading it
     inDir = up(up(up(os.getcwd()))) + '/simulation/data/' + dir_name
-    u = np.loadtxt(inDir + 'dispData.txt', delimiter=' ')
-    v = np.loadtxt(inDir + 'velData.txt', delimiter=' ')
-    a = np.loadtxt(inDir + 'accData.txt', delimiter=' ')
+    results = read.Results(inDir)
 
     # Make matplotlib text look nice
     textSettings()
 
-    #
-    num_nodes = u.shape[0]
-    steps = u.shape[1]
-    t = np.linspace(0, 2.0, steps)
+    # Recorded quantities and nodes from run metadata when available
+    meta = results.meta
+    names = ['disp', 'vel', 'acc']
+    if (meta is not None) and ('quantities' in meta):
+        names = [name for name in names if name in meta['quantities']]
+    if (meta is not None) and ('nodes' in meta):
+        num_nodes = len(meta['nodes'])
+    else:
+        num_nodes = results.shape(names[0])[0]
+    t = results.time(name=names[0])
 
     # Set colormap
     c = plt.cm.copper(np.linspace(1.0, 0.25, num_nodes))
@@ -44,21 +49,33 @@ def plot(save, dir_name):
     _, axs = plt.subplots(nrows=3, ncols=1, sharex=True, figsize=(7, 8))
 
     # Generate labels
-    labels = ['50m (Top)']
-    for i in range(num_nodes - 2):
-        j = abs(num_nodes - 2 - i)
-        labels += [f'{j:d}m']
-    labels += ['0m (Base)']
-
-    # Plot 1D model outputs
-    for i in [0, 10, 20, 30, 40, 50]:
-        # for i in range(num_nodes):
-        j = abs(num_nodes - 1 - i)
-        axs[0].plot(t, u[j, :], label=labels[j], c=c[j])
-        axs[1].plot(t, v[j, :], label=labels[j], c=c[j])
-        axs[2].plot(t, a[j, :], label=labels[j], c=c[j])
-
-    # Loop axes
+    if (meta is not None) and ('h' in meta):
+        height = meta['h'] - np.array(meta['depth'])
+        labels = [f'{z:g}m' for z in height]
+        if meta['depth'][0] == 0.0:
+            labels[0] += ' (Top)'
+        if height[-1] == 0.0:
+            labels[-1] += ' (Base)'
+    else:
+        labels = ['50m (Top)']
+        for i in range(num_nodes - 2):
+            j = abs(num_nodes - 2 - i)
+            labels += [f'{j:d}m']
+        labels += ['0m (Base)']
+
+    # Plot 1D model outputs at up to six recorded nodes from the base up,
+    # reading only those rows
+    rows = np.unique(np.linspace(0, num_nodes - 1, 6).round().astype(int))
+    rows = rows[::-1]
+    for ax, name in zip(axs, ['disp', 'vel', 'acc']):
+        if name not in names:
+            continue
+        df = results.get(name, rows)
+        for i, j in enumerate(rows):
+            ax.plot(t, df[i, :], label=labels[j], c=c[j])
+    results.close()
+
+    # Loop axes (unrecorded quantities stay empty)
     for ax in axs:
 
         # Set ticks
@@ -67,7 +84,8 @@ def plot(save, dir_name):
         ax.yaxis.set_minor_locator(AutoMinorLocator())
 
         # Set legend
-        ax.legend(**legendDict(0))
+        if ax.lines:
+            ax.legend(**legendDict(0))
 
     # Label axes
     axs[0].set_ylabel('Displacement (x-dir) [m]')
@@ -0,0 +1,374 @@
+import json
+import os
+import zipfile
+
+import numpy as np
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+# Output files of each format written by `simulation/utilities/save.py`
+FILES = {
+    'txt': '{name}Data.txt',
+    'npy': '{name}Data.npy',
+    'npz': '{name}Data.npz',
+    'h5': 'data.h5',
+    'zarr': 'data.zarr',
+}
+
+
+def loadMeta(inDir):
+    """Load run metadata
+
+    Parameters
+    ----------
+    inDir : str
+        Directory where output data is located
+
+    Returns
+    -------
+    meta : dict
+        Dictionary of run metadata (None for runs saved without metadata)
+    """
+
+    fname = os.path.join(inDir, 'meta.json')
+    if not os.path.exists(fname):
+        return None
+    with open(fname) as f:
+        return json.load(f)
+
+
+def findFormat(inDir, name='disp'):
+    """Return format of saved data
+
+    Parameters
+    ----------
+    inDir : str
+        Directory where output data is located
+    name : str
+        Data name (default is `'disp'`)
+
+    Returns
+    -------
+    fmt : str
+        Output format
+    """
+
+    meta = loadMeta(inDir)
+    if meta is not None:
+        return meta['format']
+    for fmt, pattern in FILES.items():
+        if os.path.exists(os.path.join(inDir, pattern.format(name=name))):
+            return fmt
+    raise FileNotFoundError(f'no {name} data in {inDir}')
+
+
+def loadData(inDir, name):
+    """Load simulation data saved in any format
+
+    Parameters
+    ----------
+    inDir : str
+        Directory where output data is located
+    name : str
+        Data name (`'disp'`, `'vel'`, or `'acc'`)
+
+    Returns
+    -------
+    df : Numpy array
+        Numpy array [num_nodes x (steps + 1)]
+    """
+
+    fmt = findFormat(inDir, name)
+    fname = os.path.join(inDir, FILES[fmt].format(name=name))
+
+    if fmt == 'txt':
+        return np.loadtxt(fname, delimiter=' ')
+    if fmt == 'npy':
+        return np.load(fname)
+    if fmt == 'npz':
+        with np.load(fname) as f:
+            return f['data']
+    if fmt == 'h5':
+        if h5py is None:
+            raise ImportError('h5 data requires h5py')
+        with h5py.File(fname, 'r') as f:
+            return f[name][...]
+    if zarr is None:
+        raise ImportError('zarr data requires zarr')
+    return np.asarray(zarr.open_group(fname, mode='r')[name])
+
+
+class Results:
+    """Lazy reader of one run's outputs
+
+    Data is opened memory mapped (`'npy'`), as chunked datasets (`'h5'`
+    and `'zarr'`), or streamed one node at a time (`'txt'` and `'npz'`),
+    so only the requested nodes and time window are read into memory.
+    Streamed formats are still read (and decompressed) up to the last
+    requested node.
+
+    Attributes
+    ----------
+    inDir : str
+        Directory where output data is located
+    meta : dict
+        Dictionary of run metadata (None for runs saved without metadata)
+    fmt : str
+        Output format
+    dt : float
+        Time between saved steps [s] (None without metadata)
+    depth : Numpy array
+        Numpy array [rows] for depth of each saved node [m] (None without
+        metadata)
+
+    Methods
+    -------
+    shape(name)
+        Return shape [rows x columns] of saved data
+    time(t0, t1)
+        Return saved times in a time window
+    rows(depths)
+        Return saved rows nearest to depths
+    get(name, rows, t0, t1)
+        Return data of some rows in a time window
+    close()
+        Close open data files
+    """
+
+    def __init__(self, inDir):
+        """
+        Parameters
+        ----------
+        inDir : str
+            Directory where output data is located
+        """
+
+        self.inDir = inDir
+        self.meta = loadMeta(inDir)
+        self.fmt = findFormat(inDir)
+        self.dt = None
+        self.depth = None
+        if self.meta is not None:
+            self.dt = self.meta.get('dt_out', self.meta['dt'])
+            self.depth = np.array(self.meta['depth'])
+        self._file = None
+        self._shapes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _fname(self, name):
+        return os.path.join(self.inDir, FILES[self.fmt].format(name=name))
+
+    def _array(self, name):
+        """Return lazily sliced array (None for `'txt'` and `'npz'`)"""
+
+        if self.fmt == 'npy':
+            return np.load(self._fname(name), mmap_mode='r')
+        if self.fmt == 'h5':
+            if h5py is None:
+                raise ImportError('h5 data requires h5py')
+            if self._file is None:
+                self._file = h5py.File(self._fname(name), 'r')
+            return self._file[name]
+        if self.fmt == 'zarr':
+            if zarr is None:
+                raise ImportError('zarr data requires zarr')
+            if self._file is None:
+                self._file = zarr.open_group(self._fname(name), mode='r')
+            return self._file[name]
+        return None
+
+    def shape(self, name):
+        """Return shape of saved data
+
+        Parameters
+        ----------
+        name : str
+            Data name
+
+        Returns
+        -------
+        shape : tuple
+            Shape [rows x columns]
+        """
+
+        if name not in self._shapes:
+            array = self._array(name)
+            if array is not None:
+                self._shapes[name] = tuple(array.shape)
+            elif self.fmt == 'npz':
+                with _npzMember(self._fname(name)) as (_, shape, _):
+                    self._shapes[name] = shape
+            else:
+                with open(self._fname(name)) as f:
+                    cols = len(f.readline().split())
+                    rows = 1 + sum(1 for _ in f)
+                self._shapes[name] = (rows, cols)
+
+        return self._shapes[name]
+
+    def time(self, t0=None, t1=None, name='disp'):
+        """Return saved times in a time window
+
+        Parameters
+        ----------
+        t0 : float
+            Start of window [s] (default is None for the first step)
+        t1 : float
+            End of window [s], inclusive (default is None for the last step)
+        name : str
+            Data name setting the number of saved steps (default is `'disp'`)
+
+        Returns
+        -------
+        t : Numpy array
+            Numpy array [columns] for time of each saved step [s]
+        """
+
+        cols = self._columns(name, t0, t1)
+        return self._step(name) * np.arange(cols.start, cols.stop)
+
+    def rows(self, depths):
+        """Return saved rows nearest to depths
+
+        Parameters
+        ----------
+        depths : list
+            List of depths below surface [m]
+
+        Returns
+        -------
+        rows : Numpy array
+            Numpy array of row indices
+        """
+
+        if self.depth is None:
+            raise ValueError('depths need run metadata')
+        depths = np.atleast_1d(np.asarray(depths, dtype=float))
+        return np.abs(self.depth[:, None] - depths[None, :]).argmin(axis=0)
+
+    def get(self, name, rows=None, t0=None, t1=None):
+        """Return data of some rows in a time window
+
+        Parameters
+        ----------
+        name : str
+            Data name (`'disp'`, `'vel'`, `'acc'`, or `'peak'`)
+        rows : list
+            List of row indices (default is None for every row)
+        t0 : float
+            Start of window [s] (default is None for the first step)
+        t1 : float
+            End of window [s], inclusive (default is None for the last step)
+
+        Returns
+        -------
+        df : Numpy array
+            Numpy array [rows x columns]
+        """
+
+        num_rows = self.shape(name)[0]
+        rows = np.arange(num_rows)[rows if (rows is not None) else
+                                   slice(None)]
+        rows = np.atleast_1d(rows)
+        cols = self._columns(name, t0, t1)
+
+        # Sorted unique rows of the time window from sliceable arrays
+        array = self._array(name)
+        if array is not None:
+            unique, inverse = np.unique(rows, return_inverse=True)
+            if self.fmt == 'npy':
+                df = array[:, cols][unique]
+            elif self.fmt == 'h5':
+                df = array[unique.tolist(), cols]
+            else:
+                df = array.oindex[unique, cols]
+            return np.asarray(df)[inverse]
+
+        df = np.empty((len(rows), cols.stop - cols.start))
+        order = np.argsort(rows)
+        if self.fmt == 'npz':
+            with _npzMember(self._fname(name)) as (f, shape, offset):
+                for i in order:
+                    f.seek(offset + 8 * (rows[i] * shape[1] + cols.start))
+                    df[i] = np.frombuffer(f.read(8 * df.shape[1]),
+                                          dtype='<f8')
+        else:
+            wanted = {}
+            for i in order:
+                wanted.setdefault(rows[i], []).append(i)
+            with open(self._fname(name)) as f:
+                for row, line in enumerate(f):
+                    if row in wanted:
+                        values = np.array(line.split()[cols], dtype=float)
+                        df[wanted.pop(row)] = values
+                    if not wanted:
+                        break
+
+        return df
+
+    def _columns(self, name, t0, t1):
+        """Return column slice of a time window"""
+
+        cols = self.shape(name)[1]
+        dt = self._step(name)
+        start = 0 if (t0 == None) else int(np.ceil(t0 / dt - 1e-9))
+        stop = cols if (t1 == None) else int(np.floor(t1 / dt + 1e-9)) + 1
+        return slice(max(0, start), min(cols, stop))
+
+    def _step(self, name):
+        """Return time between saved steps (2 s runs without metadata)"""
+
+        if self.dt != None:
+            return self.dt
+        return 2.0 / (self.shape(name)[1] - 1)
+
+    def close(self):
+        """Close open data files"""
+
+        if (self.fmt == 'h5') and (self._file is not None):
+            self._file.close()
+        self._file = None
+
+
+class _npzMember:
+    """Context manager opening the `.npy` array inside an `.npz` file
+
+    Yields the open member, the array shape, and the byte offset of its
+    data. Seeking in a compressed member decompresses everything up to the
+    target (and from the start again to seek back), so rows are read in
+    increasing order: one pass over the data up to the last row, holding
+    only the requested rows in memory.
+    """
+
+    def __init__(self, fname):
+        self.fname = fname
+
+    def __enter__(self):
+        self._zip = zipfile.ZipFile(self.fname)
+        f = self._zip.open('data.npy')
+        if np.lib.format.read_magic(f) == (1, 0):
+            header = np.lib.format.read_array_header_1_0(f)
+        else:
+            header = np.lib.format.read_array_header_2_0(f)
+        shape, fortran, dtype = header
+        if fortran or (dtype != np.dtype('<f8')):
+            raise ValueError(f'{self.fname} is not C ordered float64 data')
+        self._f = f
+        return f, shape, f.tell()
+
+    def __exit__(self, *args):
+        self._f.close()
+        self._zip.close()
@@ -0,0 +1,77 @@
+import numpy as np
+
+import arrays.storage as sto
+
+
+def elementMatrices(values, matrix_elem):
+    """Return stack of element matrices scaled by per element values
+
+    Parameters
+    ----------
+    values : float or Numpy array
+        Scale factor (scalar or per element [num_elem])
+    matrix_elem : Numpy array
+        Numpy array [2 x 2] for unit element matrix
+
+    Returns
+    -------
+    matrices : Numpy array
+        Numpy array [num_elem x 2 x 2] (or [1 x 2 x 2] for scalar values) of
+        element matrices
+    """
+
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    return values[:, None, None] * np.asarray(matrix_elem)[None, :, :]
+
+
+def assemble(dim, matrices, storage='dense'):
+    """Assemble global matrix from two node element matrices at once
+
+    Element `e` connects nodes `e` and `e + 1`. All element contributions
+    are scatter-added with a single `np.bincount`, so no Python loop over
+    elements is needed.
+
+    Parameters
+    ----------
+    dim : int
+        Dimension [dim x dim] corresponding to number of nodes
+    matrices : Numpy array
+        Numpy array [(dim - 1) x 2 x 2] of element matrices
+    storage : str
+        `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is
+        `'dense'`)
+
+    Returns
+    -------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Global matrix [dim x dim]
+    """
+
+    num_elem = dim - 1
+    matrices = np.broadcast_to(matrices, (num_elem, 2, 2))
+
+    # Global row and column of each of the four entries per element
+    first = np.arange(num_elem)
+    rows = (first[:, None] + np.array([0, 0, 1, 1])[None, :]).ravel()
+    cols = (first[:, None] + np.array([0, 1, 0, 1])[None, :]).ravel()
+    vals = matrices.reshape((num_elem * 4))
+
+    if storage == 'dense':
+        flat = np.bincount(rows * dim + cols, vals, minlength=dim * dim)
+        return flat.reshape((dim, dim))
+
+    if storage == 'banded':
+        matrix = sto.BandedMatrix(dim)
+        flat = np.bincount((1 + rows - cols) * dim + cols, vals,
+                           minlength=3 * dim)
+        matrix.ab[:] = flat.reshape((3, dim))
+        return matrix
+
+    if storage == 'csr':
+        if sto.sp is None:
+            raise ImportError('csr storage requires scipy')
+        coo = sto.sp.coo_matrix((vals, (rows, cols)), shape=(dim, dim))
+        return coo.tocsr()
+
+    raise ValueError(
+        f'unknown storage {storage!r}, use one of {sto.STORAGES}')
@@ -0,0 +1,123 @@
+import numpy as np
+
+import arrays.storage as sto
+
+try:
+    import scipy.linalg as sla
+    import scipy.sparse as sp
+    import scipy.sparse.linalg as spla
+except ImportError:
+    sla = None
+    sp = None
+    spla = None
+
+
+class Factor:
+    """Reusable factorization of a constant linear system
+
+    Attributes
+    ----------
+    dim : int
+        Dimension [dim x dim] of the system
+    kind : str
+        Factorization kind, `'diagonal'`, `'cholesky_banded'`, `'splu'`,
+        `'lu'`, or `'inverse'`
+    key : tuple
+        Parameters the system was built from (used to detect changes)
+
+    Methods
+    -------
+    solve(rhs)
+        Return solution of the factored system for right hand side `rhs`
+    """
+
+    def __init__(self, matrix, key=None):
+        """
+        Parameters
+        ----------
+        matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+            System matrix [dim x dim]
+        key : tuple
+            Parameters the system was built from (default is None)
+        """
+
+        self.dim = matrix.shape[0]
+        self.key = key
+
+        # Diagonal systems are inverted entry by entry
+        if sto.isDiagonal(matrix):
+            self.kind = 'diagonal'
+            self._data = 1.0 / sto.diagonal(matrix)
+
+        # Banded systems are Cholesky factored if symmetric positive
+        # definite, else LU factored in sparse form (both keep the band)
+        elif isinstance(matrix, sto.BandedMatrix) and (sla is not None):
+            self.kind = None
+            if _isSymmetric(matrix):
+                try:
+                    cho = sla.cholesky_banded(matrix.ab[:matrix.upper + 1])
+                    self.kind = 'cholesky_banded'
+                    self._data = cho
+                except np.linalg.LinAlgError:
+                    pass
+            if self.kind is None:
+                self.kind = 'splu'
+                self._data = spla.splu(_toSparse(matrix))
+
+        # Sparse systems use a sparse LU factorization
+        elif sto.isSparse(matrix):
+            self.kind = 'splu'
+            self._data = spla.splu(matrix.tocsc())
+
+        # General systems are LU factored once (inverted once without scipy)
+        elif sla is not None:
+            self.kind = 'lu'
+            self._data = sla.lu_factor(sto.toDense(matrix))
+        else:
+            self.kind = 'inverse'
+            self._data = np.linalg.inv(sto.toDense(matrix))
+
+    def solve(self, rhs):
+        """Return solution of the factored system for right hand side `rhs`
+
+        Parameters
+        ----------
+        rhs : Numpy array
+            Numpy array [dim] or [dim x N] for right hand side
+
+        Returns
+        -------
+        x : Numpy array
+            Numpy array with the shape of `rhs` for solution
+        """
+
+        if self.kind == 'diagonal':
+            if rhs.ndim == 1:
+                return self._data * rhs
+            return self._data.reshape((self.dim, 1)) * rhs
+        if self.kind == 'cholesky_banded':
+            return sla.cho_solve_banded((self._data, False), rhs)
+        if self.kind == 'splu':
+            return self._data.solve(rhs)
+        if self.kind == 'lu':
+            return sla.lu_solve(self._data, rhs)
+        return self._data @ rhs
+
+
+def _toSparse(matrix):
+    """Return banded matrix as a scipy CSC matrix"""
+
+    offsets = range(-matrix.lower, matrix.upper + 1)
+    return sp.diags([matrix.band(k) for k in offsets], list(offsets),
+                    format='csc')
+
+
+def _isSymmetric(matrix):
+    """Return True if banded matrix is symmetric"""
+
+    if matrix.lower != matrix.upper:
+        return False
+    for offset in range(1, matrix.upper + 1):
+        if not np.array_equal(matrix.band(offset), matrix.band(-offset)):
+            return False
+    return True
@@ -1,5 +1,8 @@
 import numpy as np
 
+import arrays.assembly as asm
+import arrays.storage as sto
+
 
 class Matrix:
     """Parent class for matrices
@@ -10,26 +13,40 @@ class Matrix:
         Empty name
     dim : int
         Dimension [dim x dim] corresponding to number of nodes
-    matrix : Numpy array
-        Numpy array [dim x dim] for zero matrix
+    storage : str
+        Storage of `matrix`, `'dense'`, `'banded'`, or `'csr'`
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] initialized to zero unless given
     
     Methods
     -------
     out()
         Print name and matrix contents to terminal
+    diagonal()
+        Return main diagonal of matrix
+    isDiagonal()
+        Return True if matrix has no off-diagonal entries
     """
 
-    def __init__(self, dim):
+    def __init__(self, dim, storage='dense', matrix=None):
         """
         Parameters
         ----------
         dim : int
             Dimension [dim x dim] corresponding to number of nodes
+        storage : str
+            `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is
+            `'dense'`)
+        matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Assembled matrix [dim x dim] in `storage` (default is None to
+            allocate a zero matrix)
         """
 
         self.name = None
         self.dim = dim
-        self.matrix = np.zeros((dim, dim))
+        self.storage = storage
+        self.matrix = (sto.allocate(dim, storage) if (matrix is None)
+                       else matrix)
 
     def out(self):
         """Print name and matrix contents to terminal
@@ -41,7 +58,29 @@ class Matrix:
 
         print(f'\n{self.name : ^70}')
         print('-' * 70)
-        print(f'{self.matrix}\n')
+        print(f'{sto.toDense(self.matrix)}\n')
+
+    def diagonal(self):
+        """Return main diagonal of matrix
+
+        Returns
+        -------
+        diag : Numpy array
+            Numpy array [dim] for main diagonal
+        """
+
+        return sto.diagonal(self.matrix)
+
+    def isDiagonal(self):
+        """Return True if matrix has no off-diagonal entries
+
+        Returns
+        -------
+        flag : bool
+            True if all off-diagonal entries are zero
+        """
+
+        return sto.isDiagonal(self.matrix)
 
 
 class DampingMatrix(Matrix):
@@ -55,11 +94,13 @@ class DampingMatrix(Matrix):
         Dimension [dim x dim] corresponding to number of nodes
     c : float
         Damping coeffient
-    matrix : Numpy array
-        Numpy array [dim x dim] for dammping matrix
+    storage : str
+        Storage of `matrix`, `'dense'`, `'banded'`, or `'csr'`
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for dammping matrix
     """
 
-    def __init__(self, dim, vs_rock, rho_rock, a_elem):
+    def __init__(self, dim, vs_rock, rho_rock, a_elem, storage='dense'):
         """
         Parameters
         ----------
@@ -71,13 +112,17 @@ class DampingMatrix(Matrix):
             Density of underlying rock [kg/m3]
         a_elem : float
             Cross section of element [m2]
+        storage : str
+            `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is
+            `'dense'`)
         """
 
-        Matrix.__init__(self, dim)
+        Matrix.__init__(self, dim, storage)
 
         self.name = 'Damping Matrix'
         self.c = vs_rock * rho_rock * a_elem
         self.matrix[-1, -1] += self.c
+        self.matrix = sto.finalize(self.matrix)
 
 
 class MassMatrix(Matrix):
@@ -89,33 +134,38 @@ class MassMatrix(Matrix):
         Matrix name
     dim : int
         Dimension [dim x dim] corresponding to number of nodes
-    mass : float
-        Element mass [kg]
-    matrix : Numpy array
-        Numpy array [dim x dim] for lumped mass matrix
+    mass : float or Numpy array
+        Element mass [kg] (scalar or per element [dim - 1])
+    storage : str
+        Storage of `matrix`, `'dense'`, `'banded'`, or `'csr'`
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for lumped mass matrix
     """
 
-    def __init__(self, dim, rho, h_elem, a_elem):
+    def __init__(self, dim, rho, h_elem, a_elem, storage='dense'):
         """
         Parameters
         ----------
         dim : int
             Dimension [dim x dim] corresponding to number of nodes
-        rho : float
-            Mass density [kg/m3]
-        h_elem : float
-            Height of element [m]
+        rho : float or Numpy array
+            Mass density [kg/m3] (scalar or per element [dim - 1])
+        h_elem : float or Numpy array
+            Height of element [m] (scalar or per element [dim - 1])
         a_elem : float
             Cross section of element [m2]
+        storage : str
+            `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is
+            `'dense'`)
         """
 
-        Matrix.__init__(self, dim)
+        mass = rho * h_elem * a_elem
+        matrix_elem = 0.5 * np.eye(2)
+        Matrix.__init__(self, dim, storage, asm.assemble(
+            dim, asm.elementMatrices(mass, matrix_elem), storage))
 
         self.name = 'Mass Matrix'
-        self.mass = rho * h_elem * a_elem
-        for i in range(dim - 1):
-            self.matrix[i, i] += 0.5 * self.mass
-            self.matrix[i + 1, i + 1] += 0.5 * self.mass
+        self.mass = mass
 
 
 class StiffnessMatrix(Matrix):
@@ -127,38 +177,44 @@ class StiffnessMatrix(Matrix):
         Stiffness name
     dim : int
         Dimension [dim x dim] corresponding to number of nodes
-    G : float
-        Shear modulus [Pa]
-    g : float
-        Shear spring constant
-    matrix : Numpy array
-        Numpy array [dim x dim] for stiffness matrix
+    G : float or Numpy array
+        Shear modulus [Pa] (scalar or per element [dim - 1])
+    g : float or Numpy array
+        Shear spring constant (scalar or per element [dim - 1])
+    storage : str
+        Storage of `matrix`, `'dense'`, `'banded'`, or `'csr'`
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
     """
 
-    def __init__(self, dim, vs, rho, a_elem, h_elem):
+    def __init__(self, dim, vs, rho, a_elem, h_elem, storage='dense'):
         """
         Parameters
         ----------
         dim : int
             Dimension [dim x dim] corresponding to number of nodes
-        vs : float
-            Shear wave velocity [m/s]
-        rho : float
-            Mass density [kg/m3]
+        vs : float or Numpy array
+            Shear wave velocity [m/s] (scalar or per element [dim - 1])
+        rho : float or Numpy array
+            Mass density [kg/m3] (scalar or per element [dim - 1])
         a_elem : float
             Cross section of element [m2]
-        h_elem : float
-            Height of element [m]
+        h_elem : float or Numpy array
+            Height of element [m] (scalar or per element [dim - 1])
+        storage : str
+            `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is
+            `'dense'`)
         """
 
-        Matrix.__init__(self, dim)
-
-        self.name = 'Stiffness Matrix'
-        self.G = vs * vs * rho
-        self.g = self.G * a_elem / h_elem
-        matrix_elem = self.g * np.array([
+        G = vs * vs * rho
+        g = G * a_elem / h_elem
+        matrix_elem = np.array([
             [1.0, -1.0],
             [-1.0, 1.0],
         ])
-        for i in range(dim - 1):
-            self.matrix[i:i + 2, i:i + 2] += matrix_elem
\ No newline at end of file
+        Matrix.__init__(self, dim, storage, asm.assemble(
+            dim, asm.elementMatrices(g, matrix_elem), storage))
+
+        self.name = 'Stiffness Matrix'
+        self.G = G
+        self.g = g
\ No newline at end of file
@@ -0,0 +1,503 @@
+import numpy as np
+
+try:
+    import scipy.sparse as sp
+except ImportError:
+    sp = None
+
+STORAGES = ('dense', 'banded', 'csr')
+
+
+class BandedMatrix:
+    """Square matrix stored by diagonals
+
+    Entries are kept in the LAPACK (`scipy.linalg.solve_banded`) layout where
+    `ab[upper + i - j, j] = matrix[i, j]`, so a tridiagonal matrix needs
+    `3 * dim` numbers instead of `dim * dim`.
+
+    Attributes
+    ----------
+    dim : int
+        Dimension [dim x dim] corresponding to number of nodes
+    lower : int
+        Number of sub-diagonals
+    upper : int
+        Number of super-diagonals
+    ab : Numpy array
+        Numpy array [(lower + upper + 1) x dim] for diagonals (or
+        [(lower + upper + 1) x dim x N] for a batch of N matrices acting on
+        [dim x N] arrays column by column)
+
+    Methods
+    -------
+    band(offset)
+        Return view of diagonal `offset` (positive above main diagonal)
+    diagonal()
+        Return copy of main diagonal
+    isDiagonal()
+        Return True if matrix has no off-diagonal entries
+    toarray()
+        Return dense Numpy array
+    copy()
+        Return copy of matrix
+    dot(x, out)
+        Return banded product with a [dim] or [dim x N] array
+    """
+
+    def __init__(self, dim, lower=1, upper=1, ab=None):
+        """
+        Parameters
+        ----------
+        dim : int
+            Dimension [dim x dim] corresponding to number of nodes
+        lower : int
+            Number of sub-diagonals (default is 1)
+        upper : int
+            Number of super-diagonals (default is 1)
+        ab : Numpy array
+            Numpy array [(lower + upper + 1) x dim] for diagonals (default is
+            None for zero matrix)
+        """
+
+        self.dim = dim
+        self.lower = lower
+        self.upper = upper
+        if ab is None:
+            ab = np.zeros((lower + upper + 1, dim))
+        self.ab = ab
+
+    @property
+    def shape(self):
+        return (self.dim, self.dim)
+
+    def __str__(self):
+        return str(self.toarray())
+
+    def _index(self, i, j):
+        """Return position of entry [i, j] in `ab` or None if outside band"""
+
+        i = i + self.dim if i < 0 else i
+        j = j + self.dim if j < 0 else j
+        if not ((0 <= i < self.dim) and (0 <= j < self.dim)):
+            raise IndexError(f'index ({i}, {j}) out of range')
+        if not (-self.lower <= j - i <= self.upper):
+            return None
+        return (self.upper + i - j, j)
+
+    def __getitem__(self, key):
+        i, j = key
+        index = self._index(i, j)
+        return 0.0 if index is None else self.ab[index]
+
+    def __setitem__(self, key, value):
+        i, j = key
+        cols = range(self.dim)[j] if isinstance(j, slice) else [j]
+        for col in cols:
+            index = self._index(i, col)
+            if index is not None:
+                self.ab[index] = value
+            elif value != 0.0:
+                raise IndexError(f'entry ({i}, {col}) is outside of band')
+
+    def band(self, offset):
+        """Return view of diagonal `offset` (positive above main diagonal)
+
+        Parameters
+        ----------
+        offset : int
+            Diagonal offset
+
+        Returns
+        -------
+        band : Numpy array
+            Numpy array [dim - |offset|] view into `ab`
+        """
+
+        row = self.upper - offset
+        if offset >= 0:
+            return self.ab[row, offset:]
+        return self.ab[row, :self.dim + offset]
+
+    def diagonal(self):
+        """Return copy of main diagonal
+
+        Returns
+        -------
+        diag : Numpy array
+            Numpy array [dim] for main diagonal
+        """
+
+        return self.band(0).copy()
+
+    def isDiagonal(self):
+        """Return True if matrix has no off-diagonal entries
+
+        Returns
+        -------
+        flag : bool
+            True if all off-diagonal entries are zero
+        """
+
+        return (np.count_nonzero(self.ab[:self.upper]) == 0
+                and np.count_nonzero(self.ab[self.upper + 1:]) == 0)
+
+    def toarray(self):
+        """Return dense Numpy array
+
+        Returns
+        -------
+        matrix : Numpy array
+            Numpy array [dim x dim]
+        """
+
+        matrix = np.zeros((self.dim, self.dim), dtype=self.ab.dtype)
+        for offset in range(-self.lower, self.upper + 1):
+            idx = np.arange(self.dim - abs(offset))
+            rows = idx - min(offset, 0)
+            matrix[rows, rows + offset] = self.band(offset)
+        return matrix
+
+    def copy(self):
+        """Return copy of matrix
+
+        Returns
+        -------
+        matrix : BandedMatrix object
+            Copy of matrix
+        """
+
+        return BandedMatrix(self.dim, self.lower, self.upper, self.ab.copy())
+
+    def dot(self, x, out=None):
+        """Return banded product with a [dim] or [dim x N] array
+
+        Parameters
+        ----------
+        x : Numpy array
+            Numpy array [dim] or [dim x N]
+        out : Numpy array
+            Numpy array with the shape of `x` to write the product into
+            (default is None to allocate)
+
+        Returns
+        -------
+        y : Numpy array
+            Numpy array with the shape of `x` for product
+        """
+
+        x = np.asarray(x)
+        extra = (slice(None),) + (None,) * (x.ndim - 1)
+        if self.ab.ndim == 3:
+            extra = (slice(None), slice(None))
+        if out is None:
+            out = np.empty(x.shape, dtype=np.result_type(self.ab, x))
+
+        # Main diagonal first so `out` needs no zeroing
+        np.multiply(self.band(0)[extra], x, out=out)
+        for offset in range(-self.lower, self.upper + 1):
+            if offset == 0:
+                continue
+            band = self.band(offset)[extra]
+            if offset > 0:
+                out[:self.dim - offset] += band * x[offset:]
+            else:
+                out[-offset:] += band * x[:self.dim + offset]
+        return out
+
+    def __matmul__(self, x):
+        return self.dot(x)
+
+    def __add__(self, other):
+        if not isinstance(other, BandedMatrix):
+            return NotImplemented
+        lower = max(self.lower, other.lower)
+        upper = max(self.upper, other.upper)
+        dtype = np.result_type(self.ab, other.ab)
+        ab = np.zeros((lower + upper + 1,) + self.ab.shape[1:], dtype=dtype)
+        for term in (self, other):
+            row = upper - term.upper
+            ab[row:row + term.lower + term.upper + 1] += term.ab
+        return BandedMatrix(self.dim, lower, upper, ab)
+
+    def __mul__(self, scalar):
+        if not np.isscalar(scalar):
+            return NotImplemented
+        return BandedMatrix(self.dim, self.lower, self.upper, scalar * self.ab)
+
+    __rmul__ = __mul__
+
+
+def stack(matrices, lower=1, upper=1):
+    """Return batch of banded matrices stored in one BandedMatrix
+
+    Parameters
+    ----------
+    matrices : list
+        List of N square matrices [dim x dim] of any storage with at most
+        `lower` sub- and `upper` super-diagonals
+    lower : int
+        Number of sub-diagonals (default is 1)
+    upper : int
+        Number of super-diagonals (default is 1)
+
+    Returns
+    -------
+    matrix : BandedMatrix object
+        Batched matrix with `ab` [(lower + upper + 1) x dim x N]
+    """
+
+    dim = matrices[0].shape[0]
+    ab = np.zeros((lower + upper + 1, dim, len(matrices)))
+    batch = BandedMatrix(dim, lower, upper, ab)
+    for j, matrix in enumerate(matrices):
+        for offset in range(-lower, upper + 1):
+            if isinstance(matrix, BandedMatrix):
+                inside = -matrix.lower <= offset <= matrix.upper
+                band = matrix.band(offset) if inside else 0.0
+            elif isSparse(matrix):
+                band = matrix.diagonal(offset)
+            else:
+                band = np.diag(matrix, offset)
+            batch.band(offset)[:, j] = band
+    return batch
+
+
+def allocate(dim, storage='dense'):
+    """Return zero matrix for building into with given storage
+
+    Parameters
+    ----------
+    dim : int
+        Dimension [dim x dim] corresponding to number of nodes
+    storage : str
+        `'dense'`, `'banded'` (tridiagonal), or `'csr'` (default is `'dense'`)
+
+    Returns
+    -------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Zero matrix (sparse matrices are in a buildable format until
+        `finalize` is called)
+    """
+
+    if storage == 'dense':
+        return np.zeros((dim, dim))
+    if storage == 'banded':
+        return BandedMatrix(dim)
+    if storage == 'csr':
+        if sp is None:
+            raise ImportError('csr storage requires scipy')
+        return sp.lil_matrix((dim, dim))
+    raise ValueError(f'unknown storage {storage!r}, use one of {STORAGES}')
+
+
+def finalize(matrix):
+    """Return matrix converted from its buildable format to its final format
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix returned by `allocate`
+
+    Returns
+    -------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix ready for products and solves (sparse matrices as CSR)
+    """
+
+    if isSparse(matrix):
+        return matrix.tocsr()
+    return matrix
+
+
+def isSparse(matrix):
+    """Return True if matrix is a scipy sparse matrix"""
+
+    return (sp is not None) and sp.issparse(matrix)
+
+
+def matvec(matrix, x, out):
+    """Write product of matrix and `x` into `out` for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix [dim x dim]
+    x : Numpy array
+        Numpy array [dim] or [dim x N]
+    out : Numpy array
+        Numpy array with the shape of `x` for product
+
+    Returns
+    -------
+    out : Numpy array
+        Numpy array with the shape of `x` for product
+    """
+
+    if isinstance(matrix, BandedMatrix):
+        return matrix.dot(x, out)
+    if isSparse(matrix):
+        out[...] = matrix @ x
+        return out
+    return np.matmul(matrix, x, out=out)
+
+
+def diagonal(matrix):
+    """Return copy of main diagonal for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix
+
+    Returns
+    -------
+    diag : Numpy array
+        Numpy array [dim] for main diagonal
+    """
+
+    if isinstance(matrix, BandedMatrix) or isSparse(matrix):
+        return np.asarray(matrix.diagonal()).copy()
+    return np.diag(matrix).copy()
+
+
+def isDiagonal(matrix):
+    """Return True if matrix has no off-diagonal entries for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix
+
+    Returns
+    -------
+    flag : bool
+        True if all off-diagonal entries are zero
+    """
+
+    if isinstance(matrix, BandedMatrix):
+        return matrix.isDiagonal()
+    if isSparse(matrix):
+        coo = matrix.tocoo()
+        return np.count_nonzero(coo.data[coo.row != coo.col]) == 0
+    return np.count_nonzero(matrix - np.diag(np.diag(matrix))) == 0
+
+
+def tridiagonal(matrix):
+    """Return sub-, main, and super-diagonal for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square tridiagonal matrix
+
+    Returns
+    -------
+    lower : Numpy array
+        Numpy array [dim - 1] for entries [i + 1, i]
+    diag : Numpy array
+        Numpy array [dim] for entries [i, i]
+    upper : Numpy array
+        Numpy array [dim - 1] for entries [i, i + 1]
+
+    Raises
+    ------
+    ValueError
+        If matrix has entries outside of the three diagonals
+    """
+
+    if isinstance(matrix, BandedMatrix):
+        outside = (np.count_nonzero(matrix.ab[:max(0, matrix.upper - 1)])
+                   + np.count_nonzero(matrix.ab[matrix.upper + 2:]))
+        dim = matrix.dim
+        bands = [matrix.band(offset).copy()
+                 if (-matrix.lower <= offset <= matrix.upper)
+                 else np.zeros(dim - 1) for offset in (-1, 0, 1)]
+    elif isSparse(matrix):
+        coo = matrix.tocoo()
+        outside = np.count_nonzero(coo.data[np.abs(coo.row - coo.col) > 1])
+        bands = [np.asarray(matrix.diagonal(offset)).copy()
+                 for offset in (-1, 0, 1)]
+    else:
+        matrix = np.asarray(matrix)
+        outside = (np.count_nonzero(np.triu(matrix, 2))
+                   + np.count_nonzero(np.tril(matrix, -2)))
+        bands = [np.diagonal(matrix, offset).copy() for offset in (-1, 0, 1)]
+
+    if outside:
+        raise ValueError('matrix is not tridiagonal')
+
+    return tuple(bands)
+
+
+def leading(matrix, n):
+    """Return copy of leading [n x n] block for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix
+    n : int
+        Size of block
+
+    Returns
+    -------
+    block : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [n x n] in the same storage
+    """
+
+    if isinstance(matrix, BandedMatrix):
+        ab = matrix.ab[:, :n].copy()
+
+        # Drop sub-diagonal entries in rows past the block
+        for offset in range(1, matrix.lower + 1):
+            ab[matrix.upper + offset, max(0, n - offset):] = 0.0
+        return BandedMatrix(n, matrix.lower, matrix.upper, ab)
+    if isSparse(matrix):
+        return matrix.tocsr()[:n, :n]
+    return np.array(matrix[:n, :n])
+
+
+def toDense(matrix):
+    """Return dense Numpy array for any storage
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix
+
+    Returns
+    -------
+    matrix : Numpy array
+        Numpy array [dim x dim]
+    """
+
+    if isinstance(matrix, BandedMatrix) or isSparse(matrix):
+        return matrix.toarray()
+    return np.asarray(matrix)
+
+
+def identityRow(matrix, row):
+    """Return copy of matrix with `row` replaced by the identity row
+
+    Parameters
+    ----------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Square matrix
+    row : int
+        Row to replace (negative values count from the end)
+
+    Returns
+    -------
+    matrix : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Copy of matrix in the same storage
+    """
+
+    if isSparse(matrix):
+        out = matrix.tolil()
+    elif isinstance(matrix, BandedMatrix):
+        out = matrix.copy()
+    else:
+        out = np.array(matrix, dtype=float)
+    out[row, :] = 0.0
+    out[row, row] = 1.0
+    return finalize(out)
@@ -0,0 +1,143 @@
+import os
+
+import newmark.integrator as integrator
+import newmark.newmark as newmark
+
+import utilities.motion as motion
+import utilities.save as save
+import utilities.sink as sink
+
+import numpy as np
+
+import solve
+
+# Settings the batch solver cannot honor when set (explicit banded
+# Newmark with no compiled kernel, snapshots, result cache, or timing)
+UNSUPPORTED = ('nonlinear', 'jit', 'restart', 'results', 'profile')
+
+
+def solveBatch(params_list, sim_list, root='simulation/data/'):
+    """Solve an ensemble of 1D FEM problems advanced together
+
+    All cases are integrated as one [num_nodes x N] state with the batch
+    explicit Newmark solver (banded, without the compiled kernel), then
+    saved to their own output directories. Cases may differ in material
+    parameters and base motion but must share the mesh size, base
+    condition, and final time. The time step is the smallest stable time
+    step of all cases.
+
+    Parameters
+    ----------
+    params_list : list
+        List of N dictionaries of material parameters (see `solve.solve`)
+    sim_list : list
+        List of N dictionaries of simulation settings (see `solve.solve`)
+    root : str
+        Directory holding output directories (default is
+        `'simulation/data/'`)
+
+    Returns
+    -------
+    saveDirs : list
+        List of N output directories
+
+    Raises
+    ------
+    FileExistsError
+        If any output directory already exists
+    ValueError
+        If cases cannot share one state array and one time axis, set
+        options the batch solver does not support (another engine or
+        scheme, nonlinear elements, the compiled kernel, dense or csr
+        storage, checkpoints, the result cache, or timing), or have an
+        unknown output format
+    ImportError
+        If an output format needs h5py or zarr and it is not installed
+    """
+
+    if len(params_list) != len(sim_list):
+        raise ValueError('need one sim dictionary per params dictionary')
+
+    # Set directory names for saving
+    saveDirs = [os.path.join(root, sim['name']) for sim in sim_list]
+
+    # Do not overwrite existing data, and check every case runs on the
+    # batch solver before any work
+    for saveDir, sim in zip(saveDirs, sim_list):
+        if os.path.exists(saveDir):
+            raise FileExistsError(
+                f'data save location {saveDir} already exists')
+        unsupported = [name for name in UNSUPPORTED if sim.get(name)]
+        if sim.get('engine') not in (None, 'newmark'):
+            unsupported += ['engine']
+        if sim.get('scheme') not in (None, 'explicit'):
+            unsupported += ['scheme']
+        if sim.get('storage') not in (None, 'banded'):
+            unsupported += ['storage']
+        if sim.get('checkpoint') != None:
+            unsupported += ['checkpoint']
+        if unsupported:
+            raise ValueError(f'case {sim["name"]!r} sets {unsupported}, '
+                             f'which the batch solver does not support')
+        solve.outputFormat(sim)
+
+    # Assemble every case
+    cases = [solve.assemble(params, sim)
+             for params, sim in zip(params_list, sim_list)]
+    profs = [case[0] for case in cases]
+
+    # Check cases can share one state array and one time axis
+    if len(set(prof.num_nodes for prof in profs)) != 1:
+        raise ValueError('all cases need the same number of nodes')
+    if len(set(bool(sim['rigid']) for sim in sim_list)) != 1:
+        raise ValueError('all cases need the same base condition')
+    steps_info = [solve.timeStep(prof, sim)
+                  for prof, sim in zip(profs, sim_list)]
+    if len(set(info[2] for info in steps_info)) != 1:
+        raise ValueError('all cases need the same final time')
+
+    # Shared time axis with smallest time step
+    dt = min(info[0] for info in steps_info)
+    tf = steps_info[0][2]
+    steps = int(round(tf / dt))
+    time = dt * np.arange(steps)
+    print(f'Batch of {len(cases)} cases, time step {dt:.4e} s, {steps} steps')
+
+    # Set explicit Newmark params
+    beta = 0.0
+    gamma = 0.5
+
+    # Set batch Newmark solver
+    rigid = sim_list[0]['rigid']
+    solver = newmark.ExplicitNewmarkBatch(
+        beta, gamma, dt, [case[1].matrix for case in cases],
+        [case[2].matrix for case in cases], [case[3].matrix for case in cases],
+        [case[4] for case in cases], rigid)
+
+    # Imposed kinematics for every step and case [steps x N]
+    histories = [motion.fromInputs(sim).history(time)
+                 for sim in sim_list]
+    v_hat = np.column_stack([h[0] for h in histories])
+    a_hat = np.column_stack([h[1] for h in histories])
+
+    # Make directories and save inputs and run metadata of each case
+    streams = []
+    for j, (params, sim) in enumerate(zip(params_list, sim_list)):
+        os.makedirs(saveDirs[j])
+        save.saveDicts({'Params': params, 'Sim': sim}, saveDirs[j])
+        time_info = {'dt': dt, 'dt_cr': steps_info[j][1], 'tf': tf,
+                     'steps': steps}
+        save.saveDicts({'Time': time_info}, saveDirs[j])
+        fmt = solve.outputFormat(sim)
+        out = solve.outputs(profs[j], sim, dt)
+        save.saveMeta(solve.metadata(profs[j], params, sim, dt,
+                                     steps_info[j][1], tf, steps, fmt, out),
+                      saveDirs[j])
+        streams += [solve.recorder(out, saveDirs[j], fmt)]
+
+    # Integrate all cases together streaming each case to its own directory
+    stream = sink.BatchSink(streams)
+    integrator.integrate(solver, v_hat, a_hat, sink=stream,
+                         chunk=sim_list[0].get('chunk'))
+
+    return saveDirs
@@ -0,0 +1,193 @@
+import collections
+import hashlib
+import os
+
+import numpy as np
+
+import arrays.storage as sto
+
+import frequency.frequency as frequency
+
+# One cache per disk location shared by every run in a process
+_shared = {}
+
+
+class TransferCache:
+    """Least recently used cache of column transfer functions
+
+    Transfer functions depend only on the assembled matrices, the
+    frequencies, and the returned nodes, so they are keyed by a hash of
+    those arrays. Any number of motions can then be run on one column for
+    the cost of an FFT multiply each. With a `path`, transfer functions are
+    also saved as `.npz` files and reused by later processes.
+
+    Memory is bounded by the total size of the transfer functions kept, as
+    one transfer function of every node of a long record can alone take
+    gigabytes. Transfer functions larger than the bound are returned (and
+    saved to `path`) but not kept in memory.
+
+    Attributes
+    ----------
+    maxbytes : int
+        Largest total size of transfer functions kept in memory [bytes]
+    nbytes : int
+        Total size of transfer functions kept in memory [bytes]
+    path : str
+        Directory of saved transfer functions (None for memory only)
+    hits : int
+        Number of lookups answered from memory or disk
+    misses : int
+        Number of lookups that computed a transfer function
+
+    Methods
+    -------
+    key(m, k, c, omega, nodes)
+        Return hash key of a transfer function
+    get(m, k, c, omega, nodes)
+        Return cached or newly computed transfer function
+    clear()
+        Empty memory cache
+    """
+
+    def __init__(self, maxbytes=256 * 2**20, path=None):
+        """
+        Parameters
+        ----------
+        maxbytes : int
+            Largest total size of transfer functions kept in memory [bytes]
+            (default is 256 MiB)
+        path : str
+            Directory of saved transfer functions (default is None for
+            memory only)
+        """
+
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._memory = collections.OrderedDict()
+        if path != None:
+            os.makedirs(path, exist_ok=True)
+
+    def key(self, m, k, c, omega, nodes=None):
+        """Return hash key of a transfer function
+
+        Parameters
+        ----------
+        m, k, c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrices [dim x dim] for mass, stiffness, and damping
+        omega : Numpy array
+            Numpy array [nf] for real or complex angular frequencies
+            [rad/s]
+        nodes : Numpy array
+            Numpy array of returned node indices (default is None for every
+            node)
+
+        Returns
+        -------
+        key : str
+            Hex digest
+        """
+
+        h = hashlib.sha256()
+        for matrix in (m, k, c):
+            for band in sto.tridiagonal(matrix):
+                h.update(np.ascontiguousarray(band, dtype=float).tobytes())
+        h.update(np.ascontiguousarray(omega, dtype=complex).tobytes())
+        if nodes is not None:
+            h.update(np.ascontiguousarray(nodes, dtype=np.int64).tobytes())
+
+        return h.hexdigest()
+
+    def get(self, m, k, c, omega, nodes=None):
+        """Return cached or newly computed transfer function
+
+        Parameters
+        ----------
+        m, k, c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrices [dim x dim] for mass, stiffness, and damping
+        omega : Numpy array
+            Numpy array [nf] for real or complex angular frequencies
+            [rad/s]
+        nodes : Numpy array
+            Numpy array of returned node indices (default is None for every
+            node)
+
+        Returns
+        -------
+        H : Numpy array
+            Numpy array [nodes x nf] for complex velocity per unit base
+            force (read only)
+        """
+
+        key = self.key(m, k, c, omega, nodes)
+
+        # Memory
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        # Disk
+        fname = None
+        if self.path != None:
+            fname = os.path.join(self.path, f'{key}.npz')
+        if (fname != None) and os.path.exists(fname):
+            with np.load(fname) as f:
+                H = f['H']
+            self.hits += 1
+        else:
+            H = frequency.transferFunction(m, k, c, omega, nodes)
+            self.misses += 1
+            if fname != None:
+                _saveAtomic(fname, H)
+
+        H.flags.writeable = False
+        if H.nbytes <= self.maxbytes:
+            self._memory[key] = H
+            self.nbytes += H.nbytes
+            while self.nbytes > self.maxbytes:
+                self.nbytes -= self._memory.popitem(last=False)[1].nbytes
+
+        return H
+
+    def clear(self):
+        """Empty memory cache"""
+
+        self._memory.clear()
+        self.nbytes = 0
+
+
+def shared(path=None, maxbytes=256 * 2**20):
+    """Return the process wide cache for a disk location
+
+    Parameters
+    ----------
+    path : str
+        Directory of saved transfer functions (default is None for memory
+        only)
+    maxbytes : int
+        Largest total size of transfer functions kept in memory [bytes] when
+        the cache is created (default is 256 MiB)
+
+    Returns
+    -------
+    cache : TransferCache object
+        Cache shared by every caller with the same `path`
+    """
+
+    key = None if (path == None) else os.path.abspath(path)
+    if key not in _shared:
+        _shared[key] = TransferCache(maxbytes, key)
+
+    return _shared[key]
+
+
+def _saveAtomic(fname, H):
+    """Save transfer function so concurrent readers never see a partial
+    file"""
+
+    tmp = f'{fname}.{os.getpid()}.tmp.npz'
+    np.savez(tmp, H=H)
+    os.replace(tmp, fname)
@@ -0,0 +1,282 @@
+import numpy as np
+
+import arrays.storage as sto
+
+import frequency.frequency as frequency
+
+# Window with hysteretic damping, whose acausal response before each
+# impulse is amplified by 1 / WRAP when the window is undone
+WRAP = 1e-2
+
+
+class Curves:
+    """Strain dependent modulus reduction and damping of every element
+
+    Elements follow hyperbolic curves
+    `G / G_max = 1 / (1 + (strain / gamma_ref)^curvature)` with damping
+    growing from `damping_min` at small strain to `damping_max` as the
+    modulus degrades, or curves tabulated against strain and interpolated in
+    log strain. Elements without a reference strain or table stay linear
+    with `damping_min`. Strain is absolute (not percent).
+
+    Attributes
+    ----------
+    gamma_ref : Numpy array
+        Numpy array [num_elem] for reference strain of hyperbolic curves
+        (inf for linear elements)
+    curvature : Numpy array
+        Numpy array [num_elem] for curvature of hyperbolic curves
+    damping_min : Numpy array
+        Numpy array [num_elem] for small strain damping ratio
+    damping_max : Numpy array
+        Numpy array [num_elem] for large strain damping ratio
+    tables : list
+        List of `(elements, strain, modulus, damping)` tuples of tabulated
+        curves, with a boolean Numpy array [num_elem] of elements using each
+
+    Methods
+    -------
+    evaluate(strain)
+        Return modulus reduction and damping ratio of every element
+    """
+
+    def __init__(self, gamma_ref, curvature, damping_min, damping_max,
+                 tables=None):
+        """
+        Parameters
+        ----------
+        gamma_ref : Numpy array
+            Numpy array [num_elem] for reference strain (inf for linear)
+        curvature : Numpy array
+            Numpy array [num_elem] for curvature of hyperbolic curves
+        damping_min : Numpy array
+            Numpy array [num_elem] for small strain damping ratio
+        damping_max : Numpy array
+            Numpy array [num_elem] for large strain damping ratio
+        tables : list
+            List of `(elements, strain, modulus, damping)` tuples of
+            tabulated curves (default is None)
+        """
+
+        self.gamma_ref = np.asarray(gamma_ref, dtype=float)
+        self.curvature = np.asarray(curvature, dtype=float)
+        self.damping_min = np.asarray(damping_min, dtype=float)
+        self.damping_max = np.asarray(damping_max, dtype=float)
+        self.tables = tables if (tables != None) else []
+
+    def evaluate(self, strain):
+        """Return modulus reduction and damping ratio of every element
+
+        Parameters
+        ----------
+        strain : Numpy array
+            Numpy array [num_elem] for effective shear strain
+
+        Returns
+        -------
+        modulus : Numpy array
+            Numpy array [num_elem] for `G / G_max`
+        damping : Numpy array
+            Numpy array [num_elem] for damping ratio
+        """
+
+        strain = np.abs(np.asarray(strain, dtype=float))
+        modulus = 1.0 / (1.0 + (strain / self.gamma_ref) ** self.curvature)
+        damping = (self.damping_min
+                   + (self.damping_max - self.damping_min) * (1.0 - modulus))
+
+        # Tabulated curves replace hyperbolic ones of their elements
+        for elements, x, g, d in self.tables:
+            log_strain = np.log10(np.maximum(strain[elements], x[0]))
+            modulus[elements] = np.interp(log_strain, np.log10(x), g)
+            damping[elements] = np.interp(log_strain, np.log10(x), d)
+
+        return modulus, damping
+
+
+def fromProfile(prof, params):
+    """Return strain dependent curves of a profile
+
+    Each layer dictionary may set `'gamma_ref'`, `'curvature'` (default is
+    1.0), `'damping_min'` (default is 0.0), and `'damping_max'` (default is
+    0.25) for hyperbolic curves, or `'curves'`, a dictionary of equal length
+    `'strain'` (increasing), `'modulus'` (`G / G_max`), and `'damping'`
+    lists. Keys missing from a layer are taken from `params`, so one set of
+    curves may serve every layer.
+
+    Parameters
+    ----------
+    prof : Profile object
+        Discretized soil column
+    params : dict
+        Dictionary of material parameters (see `solve.solve`)
+
+    Returns
+    -------
+    curves : Curves object
+        Curves of every element
+    """
+
+    def get(layer, key, default):
+        value = layer.get(key, params.get(key))
+        return value if (value != None) else default
+
+    gamma_ref = []
+    curvature = []
+    damping_min = []
+    damping_max = []
+    tables = []
+    for i, layer in enumerate(prof.layers):
+        gamma_ref += [get(layer, 'gamma_ref', np.inf)]
+        curvature += [get(layer, 'curvature', 1.0)]
+        damping_min += [get(layer, 'damping_min', 0.0)]
+        damping_max += [get(layer, 'damping_max', 0.25)]
+        table = get(layer, 'curves', None)
+        if table != None:
+            tables += [(prof.layer == i,
+                        np.asarray(table['strain'], dtype=float),
+                        np.asarray(table['modulus'], dtype=float),
+                        np.asarray(table['damping'], dtype=float))]
+
+    # Linear layers keep small strain damping at any strain
+    damping_max = np.where(np.isinf(gamma_ref), damping_min, damping_max)
+
+    return Curves(*[np.asarray(x, dtype=float)[prof.layer]
+                    for x in (gamma_ref, curvature, damping_min,
+                              damping_max)], tables)
+
+
+def response(m, c, f, g_max, h_elem, curves, v_hat, dt, nodes=None,
+             ratio=0.65, tol=0.01, max_iter=15, pad=2.0):
+    """Return compliant base response iterated to strain compatible
+    properties
+
+    Every iteration solves the whole record in the frequency domain with
+    complex element moduli `G (1 + 2 i damping)`, takes the peak shear
+    strain of every element from one inverse FFT of all element strain
+    spectra, and updates every element from its curves at `ratio` times the
+    peak strain. Iteration stops once no element complex modulus changes by
+    more than `tol`. Spectra are exponentially windowed (see
+    `frequency.frequencies`), so peak strains carry no response wrapped
+    around by the circular FFT and converged properties do not depend on
+    `pad`. Frequency independent (hysteretic) damping is slightly acausal,
+    so the padding must leave a quiet zone before the record for the
+    response it predicts ahead of the base force.
+
+    Parameters
+    ----------
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
+    f : Vector object
+        Forcing vector object
+    g_max : Numpy array
+        Numpy array [num_elem] for small strain shear spring constant of
+        each element (see `StiffnessMatrix.g`)
+    h_elem : Numpy array
+        Numpy array [num_elem] for height of each element [m]
+    curves : Curves object
+        Strain dependent curves of every element
+    v_hat : Numpy array
+        Numpy array [n] for imposed velocity at times `dt * arange(n)`
+    dt : float
+        Time step [s]
+    nodes : Numpy array
+        Numpy array of returned node indices (default is None for every
+        node)
+    ratio : float
+        Effective over peak strain (default is 0.65)
+    tol : float
+        Largest relative change of complex modulus at convergence (default
+        is 0.01)
+    max_iter : int
+        Largest number of iterations (default is 15)
+    pad : float
+        Smallest ratio of FFT length to record length, at least 1.5
+        (default is 2.0)
+
+    Returns
+    -------
+    u : Numpy array
+        Numpy array [nodes x n] for nodal displacement
+    v : Numpy array
+        Numpy array [nodes x n] for nodal velocity
+    a : Numpy array
+        Numpy array [nodes x n] for nodal acceleration
+    result : dict
+        Dictionary with `'strain'` (effective strain), `'modulus'`
+        (`G / G_max`), and `'damping'` Numpy arrays [num_elem] of the
+        returned response, `'iterations'`, `'converged'`, and `'change'`
+        (relative modulus change of the last iteration)
+
+    Raises
+    ------
+    ValueError
+        If `pad` is below 1.5
+    """
+
+    if pad < 1.5:
+        raise ValueError(f'equivalent linear response needs pad of at least '
+                         f'1.5, not {pad}')
+
+    v_hat = np.asarray(v_hat, dtype=float)
+    n = len(v_hat)
+    damped = bool(np.any(curves.damping_max > 0.0) or curves.tables)
+    wrap = WRAP if damped else frequency.WRAP
+    nfft, omega = frequency.frequencies(n, dt, pad, wrap)
+    force = np.fft.rfft(f.c * v_hat * frequency.window(omega, n, dt), nfft)
+    m_bands = sto.tridiagonal(m)
+    c_bands = sto.tridiagonal(c)
+    g_max = np.broadcast_to(np.asarray(g_max, dtype=float), h_elem.shape)
+
+    # Small strain properties to start
+    modulus, damping = curves.evaluate(np.zeros(len(h_elem)))
+    change = np.inf
+    for iteration in range(1, max_iter + 1):
+        g = g_max * modulus * (1.0 + 2j * damping)
+        H = frequency.transferBands(m_bands, _bands(g), c_bands, omega)
+        V = H * force
+        strain = ratio * _peakStrain(V, omega, nfft, n, dt, h_elem)
+
+        # Relative change of complex modulus of the worst element
+        new_modulus, new_damping = curves.evaluate(strain)
+        g_new = g_max * new_modulus * (1.0 + 2j * new_damping)
+        change = float(np.max(np.abs(g_new - g) / np.abs(g)))
+        if change <= tol:
+            break
+        modulus, damping = new_modulus, new_damping
+
+    if nodes is not None:
+        V = V[nodes]
+    u, v, a = frequency.histories(V, omega, nfft, n, dt)
+
+    return u, v, a, {
+        'strain': strain,
+        'modulus': modulus,
+        'damping': damping,
+        'iterations': iteration,
+        'converged': change <= tol,
+        'change': change,
+    }
+
+
+def _bands(g):
+    """Return tridiagonal stiffness bands from element spring constants"""
+
+    diag = np.zeros(len(g) + 1, dtype=g.dtype)
+    diag[:-1] += g
+    diag[1:] += g
+    return -g, diag, -g
+
+
+def _peakStrain(V, omega, nfft, n, dt, h_elem):
+    """Return peak absolute shear strain of every element from windowed
+    nodal velocity spectra"""
+
+    # Displacement spectra (complex frequencies are never zero)
+    U = np.diff(V, axis=0) / (1j * omega)
+
+    strain = np.fft.irfft(U, nfft, axis=1)[:, :n]
+    strain /= frequency.window(omega, n, dt)
+    return np.abs(strain).max(axis=1) / h_elem
@@ -0,0 +1,281 @@
+import numpy as np
+
+import arrays.storage as sto
+
+import frequency.tridiagonal as tri
+
+try:
+    from scipy.fft import next_fast_len
+except ImportError:
+    next_fast_len = None
+
+# Fraction of response left after one FFT length by the exponential window
+WRAP = 1e-6
+
+
+def transferFunction(m, k, c, omega, nodes=None, block=2**20):
+    """Return nodal velocity per unit base force at each frequency
+
+    Solves `(K + i w C - w^2 M) U = e_base` for every frequency `w` and
+    returns `i w U`. Frequencies may be complex, `w - i alpha`, for the
+    exponentially windowed response (see `frequencies`). At `w = 0` the
+    free column only moves as a rigid body resisted by the dashpot, so the
+    velocity is the force over the total damping.
+
+    Parameters
+    ----------
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for tridiagonal mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for tridiagonal stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for tridiagonal damping matrix
+    omega : Numpy array
+        Numpy array [nf] for real or complex angular frequencies [rad/s]
+    nodes : Numpy array
+        Numpy array of returned node indices (default is None for every
+        node)
+    block : int
+        Largest number of complex work entries (nodes times frequencies)
+        solved at once (default is 2**20)
+
+    Returns
+    -------
+    H : Numpy array
+        Numpy array [nodes x nf] for complex velocity per unit base force
+    """
+
+    bands = [sto.tridiagonal(matrix) for matrix in (m, k, c)]
+    return transferBands(*bands, omega, nodes, block)
+
+
+def transferBands(m_bands, k_bands, c_bands, omega, nodes=None,
+                  block=2**20):
+    """Return nodal velocity per unit base force from tridiagonal bands
+
+    Same as `transferFunction` for matrices given by their bands, so the
+    stiffness may be complex (hysteretic damping) or change between calls
+    without assembling a matrix.
+
+    Parameters
+    ----------
+    m_bands, k_bands, c_bands : tuple
+        Tuples `(lower, diag, upper)` of real or complex Numpy arrays
+        [dim - 1], [dim], and [dim - 1] for mass, stiffness, and damping
+        (see `storage.tridiagonal`)
+    omega : Numpy array
+        Numpy array [nf] for real or complex angular frequencies [rad/s]
+    nodes : Numpy array
+        Numpy array of returned node indices (default is None for every
+        node)
+    block : int
+        Largest number of complex work entries (nodes times frequencies)
+        solved at once (default is 2**20)
+
+    Returns
+    -------
+    H : Numpy array
+        Numpy array [nodes x nf] for complex velocity per unit base force
+    """
+
+    bands = (m_bands, k_bands, c_bands)
+    dim = len(bands[0][1])
+    nodes = np.arange(dim) if (nodes is None) else np.asarray(nodes)
+    omega = np.asarray(omega)
+    if not np.iscomplexobj(omega):
+        omega = omega.astype(float)
+
+    H = np.empty((len(nodes), len(omega)), dtype=complex)
+
+    # Dynamic stiffness bands K + i w C - w^2 M, solved for blocks of
+    # nonzero frequencies so work arrays stay bounded
+    solved = np.flatnonzero(omega != 0.0)
+    step = max(1, block // dim)
+    for start in range(0, len(solved), step):
+        cols = solved[start:start + step]
+        w = omega[cols]
+        lower, diag, upper = [
+            kb[:, None] + 1j * w * cb[:, None] - w * w * mb[:, None]
+            for mb, kb, cb in zip(*bands)]
+        rhs = np.zeros((dim, len(w)), dtype=complex)
+        rhs[-1] = 1j * w
+        H[:, cols] = tri.solve(lower, diag, upper, rhs)[nodes]
+
+    # Rigid body velocity at zero frequency
+    c_total = sum(np.sum(band) for band in bands[2])
+    H[:, omega == 0.0] = 1.0 / c_total
+
+    return H
+
+
+def response(m, k, c, f, v_hat, dt, nodes=None, pad=2.0, cache=None):
+    """Return compliant base response computed in the frequency domain
+
+    The base force `f.c * v_hat` is transformed with a real FFT, multiplied
+    by the velocity transfer function, and transformed back. Acceleration
+    is `i w` times velocity and displacement is the trapezoidal integral of
+    velocity. The FFT is circular, so the slowly decaying tail of the
+    column would wrap around onto the start of the record. Forces are
+    therefore windowed by `exp(-alpha t)` and the transfer function is
+    taken at complex frequencies `w - i alpha` (see `frequencies`), which
+    leaves a fraction `WRAP` of the tail after one FFT length, and the
+    window is undone after the inverse FFT.
+
+    Parameters
+    ----------
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
+    f : Vector object
+        Forcing vector object
+    v_hat : Numpy array
+        Numpy array [n] for imposed velocity at times `dt * arange(n)`
+    dt : float
+        Time step [s]
+    nodes : Numpy array
+        Numpy array of returned node indices (default is None for every
+        node)
+    pad : float
+        Smallest ratio of FFT length to record length (default is 2.0)
+    cache : TransferCache object
+        Cache of transfer functions reused across motions (default is None
+        to compute it every call)
+
+    Returns
+    -------
+    u : Numpy array
+        Numpy array [nodes x n] for nodal displacement
+    v : Numpy array
+        Numpy array [nodes x n] for nodal velocity
+    a : Numpy array
+        Numpy array [nodes x n] for nodal acceleration
+    """
+
+    v_hat = np.asarray(v_hat, dtype=float)
+    n = len(v_hat)
+    nfft, omega = frequencies(n, dt, pad)
+
+    # Nodal velocity spectra from the windowed base force spectrum
+    force = np.fft.rfft(f.c * v_hat * window(omega, n, dt), nfft)
+    if cache is None:
+        H = transferFunction(m, k, c, omega, nodes)
+    else:
+        H = cache.get(m, k, c, omega, nodes)
+
+    return histories(H * force, omega, nfft, n, dt)
+
+
+def frequencies(n, dt, pad=2.0, wrap=WRAP):
+    """Return FFT length and complex frequencies of a windowed record
+
+    The FFT length is at least `pad` times the record. The window decay
+    rate `alpha` leaves a fraction `wrap` of any response after one FFT
+    length, so response wrapped around by the circular FFT is negligible
+    however slowly the column decays.
+
+    Parameters
+    ----------
+    n : int
+        Number of time steps of the record
+    dt : float
+        Time step [s]
+    pad : float
+        Smallest ratio of FFT length to record length (default is 2.0)
+    wrap : float
+        Fraction of response left after one FFT length (default is `WRAP`)
+
+    Returns
+    -------
+    nfft : int
+        FFT length
+    omega : Numpy array
+        Numpy array [nfft // 2 + 1] for complex angular frequencies
+        `w - i alpha` [rad/s] of the real FFT
+    """
+
+    nfft = fftLength(int(np.ceil(pad * n)))
+    alpha = np.log(1.0 / wrap) / (nfft * dt)
+
+    return nfft, 2 * np.pi * np.fft.rfftfreq(nfft, dt) - 1j * alpha
+
+
+def window(omega, n, dt):
+    """Return exponential window of complex frequencies `omega`
+
+    Parameters
+    ----------
+    omega : Numpy array
+        Numpy array [nf] for complex angular frequencies `w - i alpha`
+        [rad/s] (see `frequencies`)
+    n : int
+        Number of time steps
+    dt : float
+        Time step [s]
+
+    Returns
+    -------
+    window : Numpy array
+        Numpy array [n] for `exp(-alpha t)`, its inverse undoes the window
+    """
+
+    return np.exp(np.imag(omega[0]) * dt * np.arange(n))
+
+
+def histories(V, omega, nfft, n, dt):
+    """Return nodal time histories from velocity spectra
+
+    Parameters
+    ----------
+    V : Numpy array
+        Numpy array [nodes x nf] for real FFT of windowed nodal velocity
+        (overwritten)
+    omega : Numpy array
+        Numpy array [nf] for complex angular frequencies [rad/s] (see
+        `frequencies`)
+    nfft : int
+        FFT length
+    n : int
+        Number of returned time steps
+    dt : float
+        Time step [s]
+
+    Returns
+    -------
+    u : Numpy array
+        Numpy array [nodes x n] for nodal displacement
+    v : Numpy array
+        Numpy array [nodes x n] for nodal velocity
+    a : Numpy array
+        Numpy array [nodes x n] for nodal acceleration
+    """
+
+    unwind = 1.0 / window(omega, n, dt)
+    v = np.fft.irfft(V, nfft, axis=1)[:, :n] * unwind
+    V *= 1j * omega
+    a = np.fft.irfft(V, nfft, axis=1)[:, :n] * unwind
+    u = np.zeros(v.shape)
+    np.cumsum(0.5 * dt * (v[:, 1:] + v[:, :-1]), axis=1, out=u[:, 1:])
+
+    return u, v, a
+
+
+def fftLength(n):
+    """Return fast FFT length of at least `n`
+
+    Parameters
+    ----------
+    n : int
+        Smallest length
+
+    Returns
+    -------
+    nfft : int
+        Length with only small prime factors (power of 2 without SciPy)
+    """
+
+    if next_fast_len is not None:
+        return next_fast_len(n, real=True)
+    return 1 << max(0, int(n - 1).bit_length())
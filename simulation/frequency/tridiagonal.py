@@ -0,0 +1,46 @@
+import numpy as np
+
+
+def solve(lower, diag, upper, rhs):
+    """Solve many tridiagonal systems at once, one per column
+
+    Elimination runs from the last row (base) up, so for the dynamic
+    stiffness of a soil column with a dashpot at the base every pivot is the
+    damped impedance of the column below and never vanishes. Each row
+    operation is vectorized over all systems.
+
+    Parameters
+    ----------
+    lower : Numpy array
+        Numpy array [dim - 1 x N] for entries [i + 1, i]
+    diag : Numpy array
+        Numpy array [dim x N] for entries [i, i]
+    upper : Numpy array
+        Numpy array [dim - 1 x N] for entries [i, i + 1]
+    rhs : Numpy array
+        Numpy array [dim x N] for right hand sides
+
+    Returns
+    -------
+    x : Numpy array
+        Numpy array [dim x N] for solutions
+    """
+
+    dim = diag.shape[0]
+    dtype = np.result_type(lower, diag, upper, rhs)
+    d = np.array(diag, dtype=dtype)
+    x = np.array(rhs, dtype=dtype)
+
+    # Eliminate upper entries from the base up
+    for i in range(dim - 2, -1, -1):
+        ratio = upper[i] / d[i + 1]
+        d[i] -= ratio * lower[i]
+        x[i] -= ratio * x[i + 1]
+
+    # Substitute from the surface down
+    x[0] /= d[0]
+    for i in range(1, dim):
+        x[i] -= lower[i - 1] * x[i - 1]
+        x[i] /= d[i]
+
+    return x
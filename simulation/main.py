@@ -9,6 +9,15 @@ def main():
         'rho': Mass density [km/m3]
         'vs_rock': Shear wave velocity of underlying rock [(]m/s]
         'rho_rock': Mass density of underlying rock [km/m3]
+        'layers': List of layer dicts from the top down with 'h', 'vs', 'rho',
+            and optional 'h_elem' (optional, replaces 'vs', 'rho', and 'h')
+        'gamma_ref': Reference strain of modulus reduction for
+            'equivalent' and backbone for 'nonlinear' (optional, also per
+            layer)
+        'damping_min', 'damping_max': Small and large strain damping ratio
+            for 'equivalent' (optional, also per layer)
+        'curvature': Backbone curvature for 'equivalent' and 'nonlinear'
+            (optional, also per layer)
     """
     params = {
         'vs': 100,
@@ -22,10 +31,52 @@ def main():
         'rigid': Boolean with True to use rigid base
         'A': Amplitude of imposed velocity
         'B': Period of imposed velocity equal 2*pi/B
+        'motion': Recorded accelerogram file replacing 'A' and 'B' (optional)
+        'motion_dt': Sample interval [s] of single column records (optional)
+        'motion_scale': Factor on recorded acceleration (optional)
+        'baseline': Order of baseline correction polynomial (optional)
         'h': Height of total bar [m]
         'h_elem': Height of element [m] (optional)
+        'f_max': Highest frequency to resolve [Hz] (optional)
+        'ppw': Nodes per shortest wavelength for 'f_max' (optional)
         'w_elem': Width of element [m] (optional)
         'l_elem': Length of element [m] (optional)
+        'tf': Final time [s] (optional)
+        'dt': Time step [s] (optional, default is from CFL limit)
+        'cfl': Safety factor on critical time step (optional)
+        'scheme': Newmark 'explicit' or 'implicit' (optional)
+        'storage': Matrix storage 'dense', 'banded', or 'csr' (optional)
+        'jit': Boolean to require (True) or disable (False) Numba (optional)
+        'format': Output format 'txt', 'npy', 'npz', 'h5', or 'zarr'
+            (optional)
+        'chunk': Number of time steps held in memory between writes to
+            disk (optional)
+        'nodes': List of recorded node indices (optional)
+        'depths': List of recorded depths [m] (optional)
+        'quantities': List of recorded 'disp', 'vel', and 'acc' (optional)
+        'dt_out': Output time interval [s] (optional)
+        'peaks': Boolean with True to save peak values per node (optional)
+        'engine': 'newmark', 'frequency' (compliant base only), 'modal'
+            (rigid base only), or 'equivalent' (compliant base only)
+            (optional)
+        'pad': FFT length over number of steps for 'frequency' and
+            'equivalent' (optional)
+        'cache_dir': Directory of saved transfer functions (optional)
+        'modes': Number of modes for 'modal' (optional)
+        'zeta': Modal damping ratio for 'modal' (optional)
+        'strain_ratio': Effective over peak strain for 'equivalent'
+            (optional)
+        'tol': Convergence tolerance for 'equivalent' (optional)
+        'max_iter': Largest number of iterations for 'equivalent' (optional)
+        'nonlinear': Boolean with True for hysteretic elements (optional)
+        'profile': Boolean with True to save phase timing, throughput, and
+            peak memory to profile.json (optional)
+        'checkpoint': Wall time [s] between snapshots of the run (optional)
+        'restart': Boolean with True to resume from the last snapshot
+            (optional)
+        'results': Directory of the result cache reusing outputs of runs
+            with the same inputs (optional)
+        'results_size': Largest size of the result cache [GB] (optional)
         'print_flag': Boolean with True to print matrices terminal (optional)
     """
     sim = {
@@ -36,8 +87,12 @@ def main():
         'h': 50.0,
     }
 
-    # Solve
-    solve.solve(params, sim)
+    # Solve (warn and quit if data would be overwritten or mesh is invalid)
+    try:
+        solve.solve(params, sim)
+    except (FileExistsError, ValueError) as e:
+        print(f'Warning: {e}!!')
+        quit()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,181 @@
+import collections
+import hashlib
+
+import numpy as np
+
+import arrays.storage as sto
+
+try:
+    import scipy.linalg as sla
+    import scipy.signal as sig
+except ImportError:
+    sla = None
+    sig = None
+
+# Eigenbases of recently used profiles
+_cache = collections.OrderedDict()
+CACHE_SIZE = 16
+
+
+class Modes:
+    """Lowest modes of a soil column fixed at the base
+
+    Attributes
+    ----------
+    omega : Numpy array
+        Numpy array [num_modes] for natural angular frequencies [rad/s]
+    phi : Numpy array
+        Numpy array [dim x num_modes] for mass normalized mode shapes (zero
+        at the base node)
+    participation : Numpy array
+        Numpy array [num_modes] for participation factors of the base
+        acceleration
+    """
+
+    def __init__(self, omega, phi, participation):
+        """
+        Parameters
+        ----------
+        omega : Numpy array
+            Numpy array [num_modes] for natural angular frequencies [rad/s]
+        phi : Numpy array
+            Numpy array [dim x num_modes] for mass normalized mode shapes
+        participation : Numpy array
+            Numpy array [num_modes] for participation factors
+        """
+
+        self.omega = omega
+        self.phi = phi
+        self.participation = participation
+
+
+def modes(m, k, num_modes):
+    """Return lowest modes of the column with a fixed base node
+
+    Lumped (diagonal) mass turns `k u = w^2 m u` into the symmetric
+    tridiagonal problem `m^-1/2 k m^-1/2`, solved for only the lowest modes
+    with a tridiagonal eigen-solver. Other mass matrices use a dense
+    generalized solver. Results are cached per profile.
+
+    Parameters
+    ----------
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for tridiagonal stiffness matrix
+    num_modes : int
+        Number of modes (at most `dim - 1`)
+
+    Returns
+    -------
+    basis : Modes object
+        Lowest modes
+    """
+
+    if sla is None:
+        raise ImportError('modal engine requires scipy')
+
+    dim = k.shape[0]
+    num_modes = min(int(num_modes), dim - 1)
+
+    # Profile key from matrix entries
+    h = hashlib.sha256(str(num_modes).encode())
+    for matrix in (m, k):
+        for band in sto.tridiagonal(matrix):
+            h.update(np.ascontiguousarray(band, dtype=float).tobytes())
+    key = h.hexdigest()
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+
+    # Free nodes above the fixed base
+    m_free = sto.leading(m, dim - 1)
+    k_free = sto.leading(k, dim - 1)
+    select = (0, num_modes - 1)
+    if sto.isDiagonal(m_free):
+        scale = 1.0 / np.sqrt(sto.diagonal(m_free))
+        lower, diag, _ = sto.tridiagonal(k_free)
+        w2, y = sla.eigh_tridiagonal(diag * scale * scale,
+                                     lower * scale[1:] * scale[:-1],
+                                     select='i', select_range=select)
+        phi = scale[:, None] * y
+    else:
+        w2, phi = sla.eigh(sto.toDense(k_free), sto.toDense(m_free),
+                           subset_by_index=select)
+
+    # Base acceleration loads free nodes through mass row sums
+    influence = sto.matvec(m, np.ones(dim), np.empty(dim))[:-1]
+    participation = phi.T @ influence
+
+    phi = np.vstack((phi, np.zeros((1, num_modes))))
+    basis = Modes(np.sqrt(np.maximum(w2, 0.0)), phi, participation)
+
+    _cache[key] = basis
+    while len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+
+    return basis
+
+
+def response(m, k, a_hat, dt, num_modes=20, nodes=None, zeta=0.0):
+    """Return rigid base response by modal superposition
+
+    Each modal equation `q'' + 2 zeta w q' + w^2 q = -G a_hat` is solved
+    exactly for base acceleration varying linearly between samples, as a
+    recursive filter over the whole record. Nodal response is the base
+    motion plus the modal sum, evaluated only at the returned nodes.
+
+    Parameters
+    ----------
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    a_hat : Numpy array
+        Numpy array [n] for imposed base acceleration at `dt * arange(n)`
+    dt : float
+        Time step [s]
+    num_modes : int
+        Number of modes (default is 20)
+    nodes : Numpy array
+        Numpy array of returned node indices (default is None for every
+        node)
+    zeta : float
+        Modal damping ratio (default is 0.0)
+
+    Returns
+    -------
+    u : Numpy array
+        Numpy array [nodes x n] for nodal displacement
+    v : Numpy array
+        Numpy array [nodes x n] for nodal velocity
+    a : Numpy array
+        Numpy array [nodes x n] for nodal acceleration
+    """
+
+    basis = modes(m, k, num_modes)
+    a_hat = np.asarray(a_hat, dtype=float)
+    phi = basis.phi if (nodes is None) else basis.phi[nodes]
+
+    # Modal displacement and velocity [num_modes x n]
+    q = np.empty((len(basis.omega), len(a_hat)))
+    dq = np.empty(q.shape)
+    for j, (w, g) in enumerate(zip(basis.omega, basis.participation)):
+        A = np.array([[0.0, 1.0], [-w * w, -2.0 * zeta * w]])
+        B = np.array([[0.0], [-g]])
+        system = sig.cont2discrete((A, B, np.eye(2), np.zeros((2, 1))), dt,
+                                   method='foh')
+        num, den = sig.ss2tf(*system[:4])
+        q[j] = sig.lfilter(num[0], den, a_hat)
+        dq[j] = sig.lfilter(num[1], den, a_hat)
+    w = basis.omega[:, None]
+    ddq = (-w * w * q - 2.0 * zeta * w * dq
+           - basis.participation[:, None] * a_hat)
+
+    # Base motion integrated with the same update as the explicit solver
+    v_base = np.zeros(len(a_hat))
+    np.cumsum(0.5 * dt * (a_hat[1:] + a_hat[:-1]), out=v_base[1:])
+    u_base = np.zeros(len(a_hat))
+    np.cumsum(dt * v_base[:-1] + 0.5 * dt * dt * a_hat[:-1], out=u_base[1:])
+
+    return phi @ q + u_base, phi @ dq + v_base, phi @ ddq + a_hat
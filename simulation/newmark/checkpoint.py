@@ -0,0 +1,168 @@
+import os
+import time
+
+import numpy as np
+
+
+class Checkpoint:
+    """Periodic snapshots of integrator state for restarting a run
+
+    A snapshot holds the nodal state at the end of a block of time steps,
+    the solver time, the step index (which is also the position in the
+    imposed motion), the state of hysteretic elements, and the in memory
+    state of the sink (e.g. running peaks). It is written as one
+    uncompressed `.npz` file that atomically replaces the previous
+    snapshot, so the file on disk is always a complete snapshot taken after
+    its blocks reached the sink.
+
+    Attributes
+    ----------
+    fname : str
+        Snapshot file name
+    interval : float
+        Smallest wall time between snapshots [s]
+    last : float
+        Wall clock of the last snapshot [s]
+
+    Methods
+    -------
+    due()
+        Return True once `interval` has passed since the last snapshot
+    save(step, solver, u, v, a, sink=None)
+        Write snapshot of state at `step`
+    """
+
+    def __init__(self, fname, interval=600.0):
+        """
+        Parameters
+        ----------
+        fname : str
+            Snapshot file name
+        interval : float
+            Smallest wall time between snapshots [s] (default is 600.0)
+        """
+
+        self.fname = fname
+        self.interval = float(interval)
+        self.last = time.monotonic()
+
+    def due(self):
+        """Return True once `interval` has passed since the last snapshot
+
+        Returns
+        -------
+        due : bool
+            True if a snapshot should be written
+        """
+
+        return (time.monotonic() - self.last) >= self.interval
+
+    def save(self, step, solver, u, v, a, sink=None):
+        """Write snapshot of state at `step`
+
+        Parameters
+        ----------
+        step : int
+            Number of time steps taken
+        solver : Newmark object
+            Solver at time step `step`
+        u : Numpy array
+            Numpy array [nodal shape] for nodal displacement at `step`
+        v : Numpy array
+            Numpy array [nodal shape] for nodal velocity at `step`
+        a : Numpy array
+            Numpy array [nodal shape] for nodal acceleration at `step`
+        sink : Sink object
+            Sink holding every step up to `step` (default is None)
+        """
+
+        arrays = {'step': step, 'time': solver.time, 'dt': solver.dt,
+                  'u': u, 'v': v, 'a': a}
+        if solver.elements is not None:
+            arrays.update(('elements/' + key, value)
+                          for key, value in solver.elements.state().items())
+        if sink is not None:
+            arrays.update(('sink/' + key, value)
+                          for key, value in sink.state().items())
+
+        # Write aside then swap in so a crash never leaves half a snapshot
+        tmp = self.fname + '.tmp'
+        with open(tmp, 'wb') as f:
+            np.savez(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.fname)
+        self.last = time.monotonic()
+
+
+def load(fname):
+    """Return snapshot saved by `Checkpoint.save`
+
+    Parameters
+    ----------
+    fname : str
+        Snapshot file name
+
+    Returns
+    -------
+    state : dict
+        Dictionary of snapshot arrays
+    """
+
+    with np.load(fname) as data:
+        return {key: data[key] for key in data.files}
+
+
+def restore(state, solver, sink, shape):
+    """Return solver, elements, and sink to a snapshot
+
+    Parameters
+    ----------
+    state : dict
+        Snapshot from `load`
+    solver : Newmark object
+        Solver of the same system as the snapshot
+    sink : Sink object
+        Sink resumed to append after the snapshot (None for no sink)
+    shape : tuple
+        Shape of whole histories, nodal shape + (steps + 1,)
+
+    Returns
+    -------
+    step : int
+        Number of time steps taken at the snapshot
+    u : Numpy array
+        Numpy array [nodal shape] for nodal displacement at `step`
+    v : Numpy array
+        Numpy array [nodal shape] for nodal velocity at `step`
+    a : Numpy array
+        Numpy array [nodal shape] for nodal acceleration at `step`
+
+    Raises
+    ------
+    ValueError
+        If the snapshot is from a different system or time step
+    """
+
+    step = int(state['step'])
+    if (state['u'].shape != tuple(shape[:-1])) or (step >= shape[-1]):
+        raise ValueError(f'checkpoint of shape {state["u"].shape} at step '
+                         f'{step} does not fit histories of shape {shape}')
+    if float(state['dt']) != solver.dt:
+        raise ValueError(f'checkpoint time step {float(state["dt"])} differs '
+                         f'from solver time step {solver.dt}')
+
+    solver.time = float(state['time'])
+    if solver.elements is not None:
+        solver.elements.restore(_scope(state, 'elements/'))
+    if sink is not None:
+        sink.resume(shape, step + 1, _scope(state, 'sink/'))
+
+    return step, state['u'], state['v'], state['a']
+
+
+def _scope(state, prefix):
+    """Return entries of `state` under `prefix` with the prefix removed"""
+
+    return {key[len(prefix):]: value for key, value in state.items()
+            if key.startswith(prefix)}
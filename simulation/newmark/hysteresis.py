@@ -0,0 +1,242 @@
+import numpy as np
+
+import newmark.kernels as kernels
+
+STATE = ('strain', 'stress', 'gamma_r', 'tau_r', 'direction', 'gamma_max')
+
+
+class Masing:
+    """Hyperbolic (MKZ) soil elements with Masing unload-reload rules
+
+    The backbone is `tau = G_max * gamma / (1 + |gamma / gamma_ref|^s)`.
+    After a strain reversal at `(gamma_r, tau_r)` an element follows the
+    Masing branch `tau_r + 2 * backbone((gamma - gamma_r) / 2)` until its
+    strain exceeds the largest strain reached so far, where it rejoins the
+    backbone. Every element keeps one reversal point, so state is a few
+    contiguous arrays updated in place for all elements at once.
+
+    Attributes
+    ----------
+    num_elem : int
+        Number of elements
+    g_max : Numpy array
+        Numpy array [num_elem] for small strain shear spring constant
+    h_elem : Numpy array
+        Numpy array [num_elem] for height of element [m]
+    gamma_ref : Numpy array
+        Numpy array [num_elem] for reference strain (inf for linear)
+    curvature : Numpy array
+        Numpy array [num_elem] for backbone curvature `s`
+    strain : Numpy array
+        Numpy array [num_elem] for current shear strain
+    stress : Numpy array
+        Numpy array [num_elem] for current shear stress over `G_max`
+    gamma_r : Numpy array
+        Numpy array [num_elem] for strain at last reversal
+    tau_r : Numpy array
+        Numpy array [num_elem] for stress over `G_max` at last reversal
+    direction : Numpy array
+        Numpy array [num_elem] for sign of current loading (0 at rest)
+    gamma_max : Numpy array
+        Numpy array [num_elem] for largest absolute strain so far
+
+    Methods
+    -------
+    backbone(gamma, out)
+        Write backbone stress over `G_max` at strain `gamma`
+    force(u, out)
+        Update state to nodal displacement `u` and write restoring force
+    kernelArgs()
+        Return parameter and state arrays for the compiled kernels
+    reset()
+        Return every element to rest
+    state()
+        Return state arrays by name
+    restore(state)
+        Copy state arrays saved by `state` back in place
+    """
+
+    def __init__(self, g_max, h_elem, gamma_ref, curvature=1.0):
+        """
+        Parameters
+        ----------
+        g_max : float or Numpy array
+            Small strain shear spring constant `G_max * area / h_elem`
+            (scalar or per element [num_elem], see `StiffnessMatrix.g`)
+        h_elem : Numpy array
+            Numpy array [num_elem] for height of element [m]
+        gamma_ref : float or Numpy array
+            Reference strain (scalar or per element, inf for linear)
+        curvature : float or Numpy array
+            Backbone curvature (scalar or per element, default is 1.0)
+        """
+
+        self.h_elem = np.asarray(h_elem, dtype=float)
+        self.num_elem = len(self.h_elem)
+        shape = self.h_elem.shape
+        self.g_max = np.broadcast_to(np.asarray(g_max, dtype=float),
+                                     shape).copy()
+        self.gamma_ref = np.broadcast_to(np.asarray(gamma_ref, dtype=float),
+                                         shape).copy()
+        self.curvature = np.broadcast_to(np.asarray(curvature, dtype=float),
+                                         shape).copy()
+
+        # Element force per unit stress over G_max
+        self._scale = self.g_max * self.h_elem
+
+        # Work arrays so each step allocates nothing
+        self._gamma = np.empty(shape)
+        self._tmp = np.empty(shape)
+        self._branch = np.empty(shape)
+        self._sign = np.empty(shape)
+        self._mask = np.empty(shape, dtype=bool)
+        self._rev = np.empty(shape, dtype=bool)
+
+        self.reset()
+
+    def reset(self):
+        """Return every element to rest"""
+
+        shape = self.h_elem.shape
+        self.strain = np.zeros(shape)
+        self.stress = np.zeros(shape)
+        self.gamma_r = np.zeros(shape)
+        self.tau_r = np.zeros(shape)
+        self.direction = np.zeros(shape)
+        self.gamma_max = np.zeros(shape)
+
+    def state(self):
+        """Return state arrays by name
+
+        Returns
+        -------
+        state : dict
+            Dictionary of `'strain'`, `'stress'`, `'gamma_r'`, `'tau_r'`,
+            `'direction'`, and `'gamma_max'` Numpy arrays [num_elem]
+        """
+
+        return {key: getattr(self, key) for key in STATE}
+
+    def restore(self, state):
+        """Copy state arrays saved by `state` back in place
+
+        Arrays are copied into the existing ones, so arguments already
+        taken by the compiled kernels stay valid.
+
+        Parameters
+        ----------
+        state : dict
+            Dictionary of state Numpy arrays [num_elem] (see `state`)
+        """
+
+        for key in STATE:
+            np.copyto(getattr(self, key), state[key])
+
+    def backbone(self, gamma, out):
+        """Write backbone stress over `G_max` at strain `gamma`
+
+        Parameters
+        ----------
+        gamma : Numpy array
+            Numpy array [num_elem] for shear strain
+        out : Numpy array
+            Numpy array [num_elem] for `gamma / (1 + |gamma / gamma_ref|^s)`
+
+        Returns
+        -------
+        out : Numpy array
+            Same as `out`
+        """
+
+        # `float_power` calls the C library `pow` like the compiled kernel
+        # (`power` may use a vectorized approximation differing in the last
+        # bit), so both updates give identical histories
+        np.divide(gamma, self.gamma_ref, out=out)
+        np.abs(out, out=out)
+        np.float_power(out, self.curvature, out=out)
+        out += 1.0
+        np.divide(gamma, out, out=out)
+
+        return out
+
+    def force(self, u, out):
+        """Update state to nodal displacement `u` and write restoring force
+
+        Must be called once per time step with the new displacement, since
+        every call commits the strain as a step of the loading history. All
+        elements are updated in one compiled pass when Numba is installed.
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for nodal displacement
+        out : Numpy array
+            Numpy array [dim] for nodal restoring force (linear elements
+            give `k @ u`)
+
+        Returns
+        -------
+        out : Numpy array
+            Same as `out`
+        """
+
+        if kernels.masingForce is not None:
+            kernels.masingForce(u, out, *self.kernelArgs())
+            return out
+
+        gamma = self._gamma
+        tmp = self._tmp
+        branch = self._branch
+
+        # Element strain, element e joins nodes e and e + 1
+        np.subtract(u[1:], u[:-1], out=gamma)
+        gamma /= self.h_elem
+
+        # Reversals where loading changes sign start a new Masing branch
+        np.subtract(gamma, self.strain, out=tmp)
+        np.sign(tmp, out=self._sign)
+        np.not_equal(self._sign, self.direction, out=self._rev)
+        np.not_equal(self._sign, 0.0, out=self._mask)
+        self._rev &= self._mask
+        np.copyto(self.gamma_r, self.strain, where=self._rev)
+        np.copyto(self.tau_r, self.stress, where=self._rev)
+        np.copyto(self.direction, self._sign, where=self._rev)
+
+        # Masing branch tau_r + 2 * backbone((gamma - gamma_r) / 2)
+        np.subtract(gamma, self.gamma_r, out=tmp)
+        tmp *= 0.5
+        self.backbone(tmp, branch)
+        branch *= 2.0
+        branch += self.tau_r
+
+        # Backbone beyond the largest strain so far
+        self.backbone(gamma, self.stress)
+        np.abs(gamma, out=tmp)
+        np.less(tmp, self.gamma_max, out=self._mask)
+        np.copyto(self.stress, branch, where=self._mask)
+        np.maximum(self.gamma_max, tmp, out=self.gamma_max)
+        self.strain[:] = gamma
+
+        # Scatter element forces to their two nodes
+        np.multiply(self.stress, self._scale, out=tmp)
+        np.negative(tmp, out=out[:-1])
+        out[-1] = 0.0
+        out[1:] += tmp
+
+        return out
+
+    def kernelArgs(self):
+        """Return parameter and state arrays for the compiled kernels
+
+        Returns
+        -------
+        args : tuple
+            Element height, force per unit stress over `G_max`, reference
+            strain, curvature, and the state arrays `strain`, `stress`,
+            `gamma_r`, `tau_r`, `direction`, and `gamma_max` (see
+            `kernels.masingForce`)
+        """
+
+        return (self.h_elem, self._scale, self.gamma_ref, self.curvature,
+                self.strain, self.stress, self.gamma_r, self.tau_r,
+                self.direction, self.gamma_max)
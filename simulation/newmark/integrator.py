@@ -0,0 +1,193 @@
+import numpy as np
+
+import arrays.storage as sto
+
+import newmark.checkpoint as ckpt
+import newmark.kernels as kernels
+import newmark.newmark as newmark
+
+import utilities.sink as snk
+
+
+def integrate(solver, v_hat, a_hat, jit=None, sink=None, chunk=None,
+              checkpoint=None, state=None):
+    """Integrate the whole time history in one call
+
+    Nodal histories are preallocated once in column major order so every
+    step writes contiguous columns in place. With a `sink`, only a ring
+    buffer of `chunk + 1` columns is kept: each full block is handed to the
+    sink and its last column becomes the first column of the next block, so
+    memory stays bounded however long the run is.
+    When Numba is installed and the solver has diagonal mass and damping
+    with a tridiagonal stiffness or hysteretic elements, each block runs in
+    a compiled kernel with no per step Python overhead.
+    With a `checkpoint`, a snapshot of the state is written at the end of
+    the first block after each checkpoint interval, and a run given such a
+    snapshot as `state` continues from it, appending to the histories
+    already in `sink`.
+
+    Parameters
+    ----------
+    solver : Newmark object
+        Explicit Newmark solver at its initial time
+    v_hat : Numpy array
+        Numpy array [steps] (or [steps x N] for a batch solver) for imposed
+        velocity at each step (see `Motion.history`)
+    a_hat : Numpy array
+        Numpy array [steps] (or [steps x N] for a batch solver) for imposed
+        acceleration at each step (see `Motion.history`)
+    jit : bool
+        True to require the compiled kernel, False to never use it (default
+        is None to use it when available)
+    sink : Sink object
+        Destination of streamed histories (default is None to keep whole
+        histories in memory)
+    chunk : int
+        Number of time steps held in memory between writes to `sink`
+        (default is None for 1024, ignored with no sink)
+    checkpoint : Checkpoint object
+        Periodic snapshots of the state (default is None for none, needs
+        `sink`)
+    state : dict
+        Snapshot to resume from (see `checkpoint.load`, default is None to
+        start at rest, needs `sink`)
+
+    Returns
+    -------
+    result : tuple or object
+        Nodal displacement, velocity, and acceleration Numpy arrays
+        [dim x (steps + 1)] (or [dim x N x (steps + 1)]) with no sink,
+        otherwise the result of closing `sink`
+
+    Raises
+    ------
+    ValueError
+        If the compiled kernel is required but unavailable, or checkpoints
+        or a snapshot are given with no sink
+    """
+
+    # Imposed kinematics for all steps at once
+    v_hat = np.asarray(v_hat, dtype=float)
+    a_hat = np.asarray(a_hat, dtype=float)
+    steps = v_hat.shape[0]
+
+    # Whole histories in memory unless streamed to a sink in blocks
+    if (sink is None) and ((checkpoint is not None) or (state is not None)):
+        raise ValueError('checkpoints need a sink holding the histories')
+    if sink is None:
+        chunk = steps
+    else:
+        chunk = 1024 if (chunk == None) else chunk
+        chunk = max(1, min(chunk, steps))
+    nodal = (solver.dim,) + v_hat.shape[1:]
+
+    # Ring buffer of one block plus the state it starts from
+    u = np.zeros(nodal + (chunk + 1,), order='F')
+    v = np.zeros(nodal + (chunk + 1,), order='F')
+    a = np.zeros(nodal + (chunk + 1,), order='F')
+    first = 0
+    if state is not None:
+        # Continue from the snapshot, appending to written histories
+        first, u_0, v_0, a_0 = ckpt.restore(state, solver, sink,
+                                            nodal + (steps + 1,))
+        u[..., 0] = u_0
+        v[..., 0] = v_0
+        a[..., 0] = a_0
+    elif sink is not None:
+        sink.open(nodal + (steps + 1,))
+        sink.write(u[..., :1], v[..., :1], a[..., :1])
+
+    # Compiled kernel
+    args = kernelArgs(solver)
+    if solver.elements is None:
+        kernel = kernels.explicitTridiagonal
+    else:
+        kernel = kernels.explicitMasing
+    if jit and ((args is None) or (kernel is None)):
+        raise ValueError('compiled kernel needs Numba and a lumped explicit '
+                         'solver with banded stiffness or hysteretic '
+                         'elements')
+    use_jit = (jit != False) and (args is not None) and (kernel is not None)
+
+    for start in range(first, steps, chunk):
+        n = min(chunk, steps - start)
+        block = slice(start, start + n)
+
+        if use_jit:
+            kernel(u, v, a, v_hat[block], a_hat[block], *args)
+            solver.time += n * solver.dt
+        else:
+            # Python loop over steps with in place updates
+            for s in range(n):
+                solver.step(u[..., s], v[..., s], a[..., s],
+                            v_hat[start + s], a_hat[start + s],
+                            u[..., s + 1], v[..., s + 1], a[..., s + 1])
+
+        # Hand off block and carry its last state to the next block
+        if sink is not None:
+            sink.write(u[..., 1:n + 1], v[..., 1:n + 1], a[..., 1:n + 1])
+            u[..., 0] = u[..., n]
+            v[..., 0] = v[..., n]
+            a[..., 0] = a[..., n]
+
+            # Snapshot once every block up to here reached the sink
+            if (checkpoint is not None) and checkpoint.due():
+                checkpoint.save(start + n, solver, u[..., 0], v[..., 0],
+                                a[..., 0], sink)
+
+    if sink is None:
+        return u, v, a
+    return sink.close()
+
+
+def kernelArgs(solver):
+    """Return solver arrays for the compiled kernel or None if unsupported
+
+    Parameters
+    ----------
+    solver : Newmark object
+        Explicit Newmark solver
+
+    Returns
+    -------
+    args : tuple
+        Stiffness bands (or element arrays and a force buffer for
+        hysteretic elements, see `kernels.explicitMasing`), inverse diagonal
+        left hand side, damping diagonal, force coefficient, `dt`, `gamma`,
+        and rigid flag (None if the solver is not diagonal with tridiagonal
+        stiffness or hysteretic elements)
+    """
+
+    if isinstance(solver, newmark.ExplicitNewmarkLumped):
+        solver.checkSystem()
+        lhs_inv = solver.lhs
+        c_diag = solver.c_diag
+        f_c = solver.f.c
+        rigid = False
+    elif isinstance(solver, newmark.ExplicitNewmarkRigid):
+        lhs = solver.buildLHS()
+        if not sto.isDiagonal(lhs):
+            return None
+        lhs_inv = 1.0 / sto.diagonal(lhs)
+        c_diag = np.zeros(solver.dim)
+        f_c = 0.0
+        rigid = True
+    else:
+        return None
+    common = (lhs_inv, c_diag, f_c, solver.dt, solver.gamma, rigid)
+
+    # Hysteretic elements replace the stiffness bands
+    if solver.elements is not None:
+        return (solver.elements.kernelArgs() + (np.empty(solver.dim),)
+                + common)
+
+    k = solver.k
+    if not (isinstance(k, sto.BandedMatrix) and (k.ab.ndim == 2)
+            and (k.lower <= 1) and (k.upper <= 1)):
+        return None
+
+    # Pad to exactly one sub- and super-diagonal
+    k = k + sto.BandedMatrix(k.dim)
+
+    return (np.ascontiguousarray(k.band(-1)), np.ascontiguousarray(k.band(0)),
+            np.ascontiguousarray(k.band(1))) + common
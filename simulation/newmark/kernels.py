@@ -0,0 +1,190 @@
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _explicitTridiagonal(u, v, a, v_hat, a_hat, k_lower, k_diag, k_upper,
+                         lhs_inv, c_diag, f_c, dt, gamma, rigid):
+    """Integrate explicit Newmark steps for tridiagonal stiffness and
+    diagonal mass and damping
+
+    Writes steps `1` to `steps` of `u`, `v`, and `a` from step `0`. Plain
+    loops are used so the function can be compiled with Numba.
+
+    Parameters
+    ----------
+    u : Numpy array
+        Numpy array [dim x (steps + 1)] for nodal displacement
+    v : Numpy array
+        Numpy array [dim x (steps + 1)] for nodal velocity
+    a : Numpy array
+        Numpy array [dim x (steps + 1)] for nodal acceleration
+    v_hat : Numpy array
+        Numpy array [steps] for imposed velocity
+    a_hat : Numpy array
+        Numpy array [steps] for imposed acceleration
+    k_lower : Numpy array
+        Numpy array [dim - 1] for stiffness entries [i + 1, i]
+    k_diag : Numpy array
+        Numpy array [dim] for stiffness entries [i, i]
+    k_upper : Numpy array
+        Numpy array [dim - 1] for stiffness entries [i, i + 1]
+    lhs_inv : Numpy array
+        Numpy array [dim] for inverse of diagonal left hand side
+    c_diag : Numpy array
+        Numpy array [dim] for diagonal of damping matrix
+    f_c : float
+        Force coefficient on imposed velocity at the base node
+    dt : float
+        Time step
+    gamma : float
+        gamma parameter
+    rigid : bool
+        True to impose `a_hat` at the base node instead of the force
+    """
+
+    n = u.shape[0]
+    steps = v_hat.shape[0]
+    for s in range(steps):
+
+        # Predictor
+        for i in range(n):
+            u[i, s + 1] = u[i, s] + dt * v[i, s] + 0.5 * dt * dt * a[i, s]
+            v[i, s + 1] = v[i, s] + (1 - gamma) * dt * a[i, s]
+
+        # Solve and update predictors
+        for i in range(n):
+            r = k_diag[i] * u[i, s + 1]
+            if i > 0:
+                r += k_lower[i - 1] * u[i - 1, s + 1]
+            if i < n - 1:
+                r += k_upper[i] * u[i + 1, s + 1]
+            r = -r - c_diag[i] * v[i, s + 1]
+            if i == n - 1:
+                if rigid:
+                    r = a_hat[s]
+                else:
+                    r += f_c * v_hat[s]
+            a[i, s + 1] = lhs_inv[i] * r
+            v[i, s + 1] += gamma * dt * a[i, s + 1]
+
+
+def _masingForce(u, force, h_elem, scale, gamma_ref, curvature, strain,
+                 stress, gamma_r, tau_r, direction, gamma_max):
+    """Update hysteretic element state and write nodal restoring force
+
+    Same rules as `Masing.force` in one pass over the elements. Plain loops
+    are used so the function can be compiled with Numba.
+
+    Parameters
+    ----------
+    u : Numpy array
+        Numpy array [dim] for nodal displacement
+    force : Numpy array
+        Numpy array [dim] for nodal restoring force
+    h_elem, scale, gamma_ref, curvature : Numpy array
+        Numpy arrays [num_elem] for element height, force per unit stress
+        over `G_max`, reference strain, and backbone curvature
+    strain, stress, gamma_r, tau_r, direction, gamma_max : Numpy array
+        Numpy arrays [num_elem] of element state (see `Masing`), updated in
+        place
+    """
+
+    force[:] = 0.0
+    for e in range(h_elem.shape[0]):
+        g = (u[e + 1] - u[e]) / h_elem[e]
+
+        # Reversal starts a new Masing branch
+        d = g - strain[e]
+        sign = 1.0 if (d > 0.0) else (-1.0 if (d < 0.0) else 0.0)
+        if (sign != 0.0) and (sign != direction[e]):
+            gamma_r[e] = strain[e]
+            tau_r[e] = stress[e]
+            direction[e] = sign
+
+        # Backbone beyond the largest strain so far, else Masing branch
+        g_abs = abs(g)
+        if g_abs >= gamma_max[e]:
+            t = g / (1.0 + (g_abs / gamma_ref[e]) ** curvature[e])
+            gamma_max[e] = g_abs
+        else:
+            x = 0.5 * (g - gamma_r[e])
+            t = tau_r[e] + 2.0 * x / (
+                1.0 + (abs(x) / gamma_ref[e]) ** curvature[e])
+        strain[e] = g
+        stress[e] = t
+
+        force[e] -= scale[e] * t
+        force[e + 1] += scale[e] * t
+
+
+def _explicitMasing(u, v, a, v_hat, a_hat, h_elem, scale, gamma_ref,
+                    curvature, strain, stress, gamma_r, tau_r, direction,
+                    gamma_max, force, lhs_inv, c_diag, f_c, dt, gamma,
+                    rigid):
+    """Integrate explicit Newmark steps for hysteretic elements and
+    diagonal mass and damping
+
+    Same as `explicitTridiagonal` with the restoring force of `Masing`
+    elements (see `masingForce`) instead of the stiffness matrix.
+
+    Parameters
+    ----------
+    u, v, a : Numpy array
+        Numpy arrays [dim x (steps + 1)] for nodal displacement, velocity,
+        and acceleration
+    v_hat, a_hat : Numpy array
+        Numpy arrays [steps] for imposed velocity and acceleration
+    h_elem, scale, gamma_ref, curvature : Numpy array
+        Numpy arrays [num_elem] of element parameters (see `masingForce`)
+    strain, stress, gamma_r, tau_r, direction, gamma_max : Numpy array
+        Numpy arrays [num_elem] of element state, updated in place
+    force : Numpy array
+        Numpy array [dim] work buffer for nodal restoring force
+    lhs_inv : Numpy array
+        Numpy array [dim] for inverse of diagonal left hand side
+    c_diag : Numpy array
+        Numpy array [dim] for diagonal of damping matrix
+    f_c : float
+        Force coefficient on imposed velocity at the base node
+    dt : float
+        Time step
+    gamma : float
+        gamma parameter
+    rigid : bool
+        True to impose `a_hat` at the base node instead of the force
+    """
+
+    n = u.shape[0]
+    steps = v_hat.shape[0]
+    for s in range(steps):
+
+        # Predictor
+        for i in range(n):
+            u[i, s + 1] = u[i, s] + dt * v[i, s] + 0.5 * dt * dt * a[i, s]
+            v[i, s + 1] = v[i, s] + (1 - gamma) * dt * a[i, s]
+
+        masingForce(u[:, s + 1], force, h_elem, scale, gamma_ref, curvature,
+                    strain, stress, gamma_r, tau_r, direction, gamma_max)
+
+        # Solve and update predictors
+        for i in range(n):
+            r = -force[i] - c_diag[i] * v[i, s + 1]
+            if i == n - 1:
+                if rigid:
+                    r = a_hat[s]
+                else:
+                    r += f_c * v_hat[s]
+            a[i, s + 1] = lhs_inv[i] * r
+            v[i, s + 1] += gamma * dt * a[i, s + 1]
+
+
+if numba is not None:
+    explicitTridiagonal = numba.njit(cache=True)(_explicitTridiagonal)
+    masingForce = numba.njit(cache=True)(_masingForce)
+    explicitMasing = numba.njit(cache=True)(_explicitMasing)
+else:
+    explicitTridiagonal = None
+    masingForce = None
+    explicitMasing = None
@@ -1,5 +1,8 @@
 import numpy as np
 
+import arrays.factor as fac
+import arrays.storage as sto
+
 
 class Newmark:
     """Parent class for newmark solvers
@@ -14,19 +17,41 @@ class Newmark:
         Time step
     time : float
         Current time
-    B : float
-        Period of imposed velocity equal 2*pi/B
-    m : Numpy array
-        Numpy array [dim x dim] for mass matrix
-    k : Numpy array
-        Numpy array [dim x dim] for stiffness matrix
-    c : Numpy array
-        Numpy array [dim x dim] for damping matrix
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
     f : Vector object
         Forcing vector object
+    dim : int
+        Number of nodes
+    lhs : Factor object
+        Factored left hand side (rebuilt if `beta`, `gamma`, or `dt` change)
+    elements : Masing object
+        Nonlinear elements giving the restoring force instead of `k` (None
+        for linear elements)
+
+    Methods
+    -------
+    buildLHS()
+        Return left hand side matrix
+    checkSystem()
+        Factor left hand side if it is missing or no longer constant
+    work(shape)
+        Return preallocated work buffers for nodal arrays of `shape`
+    restoringForce(u, out)
+        Write nodal restoring force of displacement `u`
+    solve(u, v, a, v_hat, a_hat)
+        Solve for updated nodal displacement, velocity, and acceleration
+    predict(u, v, a, u_out, v_out, tmp)
+        Write Newmark predictors into `u_out` and `v_out`
+    correct(a_out, v_out, tmp)
+        Add `gamma * dt * a_out` to velocity predictor in `v_out`
     """
 
-    def __init__(self, beta, gamma, dt, B, m, k, c, f):
+    def __init__(self, beta, gamma, dt, m, k, c, f, elements=None):
         """
         Parameters
         ----------
@@ -36,27 +61,176 @@ class Newmark:
             gamma parameter
         dt : float
             Time step
-        B : float
-            Period of imposed velocity equal 2*pi/B
-        m : Numpy array
-            Numpy array [dim x dim] for mass matrix
-        k : Numpy array
-            Numpy array [dim x dim] for stiffness matrix
-        c : Numpy array
-            Numpy array [dim x dim] for damping matrix
+        m : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for mass matrix
+        k : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for stiffness matrix
+        c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for damping matrix
         f : Vector object
             Forcing vector object
+        elements : Masing object
+            Nonlinear elements replacing `k` in the restoring force (default
+            is None for linear elements)
         """
 
         self.beta = beta
         self.gamma = gamma
         self.dt = dt
         self.time = 0.0
-        self.B = B
         self.m = m
         self.k = k
         self.c = c
         self.f = f
+        self.dim = k.shape[0]
+        self.elements = elements
+        self.lhs = None
+        self._work = {}
+        self.checkSystem()
+
+    def buildLHS(self):
+        """Return left hand side matrix
+
+        Returns
+        -------
+        lhs : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for left hand side
+        """
+
+        return self.m
+
+    def checkSystem(self):
+        """Factor left hand side if it is missing or no longer constant
+
+        The left hand side only depends on `m`, `c`, `beta`, `gamma`, and
+        `dt`, so it is factored once and reused until one of the scalar
+        parameters is changed.
+        """
+
+        key = (self.beta, self.gamma, self.dt)
+        if (self.lhs is None) or (self.lhs.key != key):
+            self.lhs = fac.Factor(self.buildLHS(), key)
+
+    def work(self, shape):
+        """Return preallocated work buffers for nodal arrays of `shape`
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of nodal arrays, [dim] or [dim x N]
+
+        Returns
+        -------
+        rhs : Numpy array
+            Work buffer for right hand side
+        tmp : Numpy array
+            Work buffer for intermediate products
+        """
+
+        if shape not in self._work:
+            self._work[shape] = (np.empty(shape), np.empty(shape))
+        return self._work[shape]
+
+    def restoringForce(self, u, out):
+        """Write nodal restoring force of displacement `u`
+
+        Linear elements give `k @ u`. Nonlinear elements update their
+        history, so explicit solvers call this once per step.
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for nodal displacement
+        out : Numpy array
+            Numpy array [dim] for nodal restoring force
+
+        Returns
+        -------
+        out : Numpy array
+            Same as `out`
+        """
+
+        if self.elements is None:
+            return sto.matvec(self.k, u, out)
+        return self.elements.force(u, out)
+
+    def solve(self, u, v, a, v_hat, a_hat):
+        """Solve for updated nodal displacement, velocity, and acceleration
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for displacement at step `n`
+        v : Numpy array
+            Numpy array [dim] for velocity at step `n`
+        a : Numpy array
+            Numpy array [dim] for acceleration at step `n`
+        v_hat : float
+            Imposed velocity at step `n + 1`
+        a_hat : float
+            Imposed acceleration at step `n + 1`
+
+        Returns
+        -------
+        u_update : Numpy array
+            Numpy array [dim] for displacement at step `n + 1`
+        v_update : Numpy array
+            Numpy array [dim] for velocity at step `n + 1`
+        a_update : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
+        """
+
+        u_update = np.empty(u.shape)
+        v_update = np.empty(v.shape)
+        a_update = np.empty(a.shape)
+        self.step(u, v, a, v_hat, a_hat, u_update, v_update, a_update)
+
+        return u_update, v_update, a_update
+
+    def predict(self, u, v, a, u_out, v_out, tmp):
+        """Write Newmark predictors into `u_out` and `v_out`
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for displacement at step `n`
+        v : Numpy array
+            Numpy array [dim] for velocity at step `n`
+        a : Numpy array
+            Numpy array [dim] for acceleration at step `n`
+        u_out : Numpy array
+            Numpy array [dim] for displacement predictor
+        v_out : Numpy array
+            Numpy array [dim] for velocity predictor
+        tmp : Numpy array
+            Numpy array [dim] work buffer
+        """
+
+        # u + dt * v + (0.5 - beta) * dt^2 * a
+        np.multiply(v, self.dt, out=u_out)
+        u_out += u
+        np.multiply(a, (0.5 - self.beta) * self.dt * self.dt, out=tmp)
+        u_out += tmp
+
+        # v + (1 - gamma) * dt * a
+        np.multiply(a, (1 - self.gamma) * self.dt, out=v_out)
+        v_out += v
+
+    def correct(self, a_out, v_out, tmp):
+        """Add `gamma * dt * a_out` to velocity predictor in `v_out`
+
+        Parameters
+        ----------
+        a_out : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim] for velocity predictor
+        tmp : Numpy array
+            Numpy array [dim] work buffer
+        """
+
+        np.multiply(a_out, self.gamma * self.dt, out=tmp)
+        v_out += tmp
 
 
 class ExplicitNewmarkCompliant(Newmark):
@@ -72,24 +246,31 @@ class ExplicitNewmarkCompliant(Newmark):
         Time step
     time : float
         Current time
-    B : float
-        Period of imposed velocity equal 2*pi/B
-    m : Numpy array
-        Numpy array [dim x dim] for mass matrix
-    k : Numpy array
-        Numpy array [dim x dim] for stiffness matrix
-    c : Numpy array
-        Numpy array [dim x dim] for damping matrix
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
     f : Vector object
         Forcing vector object
+    dim : int
+        Number of nodes
+    lhs : Factor object
+        Factored left hand side (rebuilt if `beta`, `gamma`, or `dt` change)
+    elements : Masing object
+        Nonlinear elements giving the restoring force instead of `k` (None
+        for linear elements)
 
     Methods
     -------
-    solve(u, v, a, v_hat, a_hat)
-        Solve for updated nodal displacement, velocity, and acceleration
+    buildLHS()
+        Return left hand side matrix
+    step(u, v, a, v_hat, a_hat, u_out, v_out, a_out)
+        Write updated nodal displacement, velocity, and acceleration in place
     """
 
-    def __init__(self, beta, gamma, dt, B, m, k, c, f):
+    def __init__(self, beta, gamma, dt, m, k, c, f, elements=None):
         """
         Parameters
         ----------
@@ -99,75 +280,208 @@ class ExplicitNewmarkCompliant(Newmark):
             gamma parameter
         dt : float
             Time step
-        B : float
-            Period of imposed velocity equal 2*pi/B
-        m : Numpy array
-            Numpy array [dim x dim] for mass matrix
-        k : Numpy array
-            Numpy array [dim x dim] for stiffness matrix
-        c : Numpy array
-            Numpy array [dim x dim] for damping matrix
+        m : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for mass matrix
+        k : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for stiffness matrix
+        c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for damping matrix
         f : Vector object
             Forcing vector object
+        elements : Masing object
+            Nonlinear elements replacing `k` in the restoring force (default
+            is None for linear elements)
         """
 
-        Newmark.__init__(self, beta, gamma, dt, B, m, k, c, f)
+        Newmark.__init__(self, beta, gamma, dt, m, k, c, f, elements)
 
-    def solve(self, u, v, a, v_hat, a_hat):
-        """Solve for updated nodal displacement, velocity, and acceleration
+    def buildLHS(self):
+        """Return left hand side matrix
+
+        Returns
+        -------
+        lhs : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for left hand side
+        """
+
+        return self.m + self.gamma * self.dt * self.c
+
+    def step(self, u, v, a, v_hat, a_hat, u_out, v_out, a_out):
+        """Write updated nodal displacement, velocity, and acceleration in
+        place
 
         Parameters
         ----------
         u : Numpy array
-            Numpy array [dim x 1] for displacement at step `n`
+            Numpy array [dim] for displacement at step `n`
         v : Numpy array
-            Numpy array [dim x 1] for velocity at step `n`
+            Numpy array [dim] for velocity at step `n`
         a : Numpy array
-            Numpy array [dim x 1] for acceleration at step `n`
+            Numpy array [dim] for acceleration at step `n`
         v_hat : float
             Imposed velocity at step `n + 1`
         a_hat : float
             Imposed acceleration at step `n + 1`
-
-        Returns
-        -------
-        u_update : Numpy array
-            Numpy array [dim x 1] for displacement at step `n + 1`
-        v_update : Numpy array
-            Numpy array [dim x 1] for velocity at step `n + 1`
-        a_update : Numpy array
-            Numpy array [dim x 1] for acceleration at step `n + 1`
+        u_out : Numpy array
+            Numpy array [dim] for displacement at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim] for velocity at step `n + 1`
+        a_out : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
         """
 
-        # Only impose 1/2 period of movement
-        if self.time > ((1.0 * np.pi) / self.B): v_hat = 0
+        rhs, tmp = self.work(u.shape)
 
-        # Reshape
-        num_nodes = u.shape[0]
-        u = u.reshape((num_nodes, 1))
-        v = v.reshape((num_nodes, 1))
-        a = a.reshape((num_nodes, 1))
+        # Predictor (displacement predictor is final for beta = 0)
+        self.predict(u, v, a, u_out, v_out, tmp)
 
-        # Predictor
-        u_temp = u + self.dt * v + 0.5 * self.dt * self.dt * a
-        v_temp = v + (1 - self.gamma) * self.dt * a
-
-        # Set RHS and LHS
+        # Set RHS
         self.f.update(v_hat)
-        rhs = self.f.vector - 1.0 * (self.c @ v_temp + self.k @ u_temp)
-        lhs = self.m + self.gamma * self.dt * self.c
+        self.restoringForce(u_out, rhs)
+        rhs += sto.matvec(self.c, v_out, tmp)
+        np.subtract(self.f.vector[:, 0], rhs, out=rhs)
 
-        # Solve
-        a_update = (np.linalg.inv(lhs) @ rhs)[:, 0]
+        # Solve with pre-factored LHS
+        self.checkSystem()
+        a_out[...] = self.lhs.solve(rhs)
 
         # Update predictors
-        v_update = v_temp[:, 0] + self.gamma * self.dt * a_update
-        u_update = u_temp[:, 0]
+        self.correct(a_out, v_out, tmp)
 
         # Update time
         self.time += self.dt
 
-        return u_update, v_update, a_update
+
+class ExplicitNewmarkLumped(Newmark):
+    """Child class for explicit newmark solver with compliant base and
+    diagonal (lumped) mass and damping
+
+    Attributes
+    ----------
+    beta : float
+        beta parameter (must be zero)
+    gamma : float
+        gamma parameter
+    dt : float
+        Time step
+    time : float
+        Current time
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
+    f : Vector object
+        Forcing vector object
+    dim : int
+        Number of nodes
+    m_diag : Numpy array
+        Numpy array [dim] for diagonal of mass matrix
+    c_diag : Numpy array
+        Numpy array [dim] for diagonal of damping matrix
+    lhs : Numpy array
+        Numpy array [dim] for inverse of diagonal left hand side
+    elements : Masing object
+        Nonlinear elements giving the restoring force instead of `k` (None
+        for linear elements)
+
+    Methods
+    -------
+    checkSystem()
+        Invert diagonal left hand side if it is missing or no longer constant
+    step(u, v, a, v_hat, a_hat, u_out, v_out, a_out)
+        Write updated nodal displacement, velocity, and acceleration in place
+    """
+
+    def __init__(self, beta, gamma, dt, m, k, c, f, elements=None):
+        """
+        Parameters
+        ----------
+        beta : float
+            beta parameter (must be zero)
+        gamma : float
+            gamma parameter
+        dt : float
+            Time step
+        m : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for diagonal mass matrix
+        k : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for stiffness matrix
+        c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for diagonal damping matrix
+        f : Vector object
+            Forcing vector object
+        elements : Masing object
+            Nonlinear elements replacing `k` in the restoring force (default
+            is None for linear elements)
+        """
+
+        if beta != 0.0:
+            raise ValueError('lumped solver is explicit and needs beta = 0')
+
+        if not (sto.isDiagonal(m) and sto.isDiagonal(c)):
+            raise ValueError('lumped solver needs diagonal mass and damping')
+        self.m_diag = sto.diagonal(m)
+        self.c_diag = sto.diagonal(c)
+
+        Newmark.__init__(self, beta, gamma, dt, m, k, c, f, elements)
+
+    def checkSystem(self):
+        """Invert diagonal left hand side if it is missing or no longer
+        constant
+        """
+
+        key = (self.beta, self.gamma, self.dt)
+        if (self.lhs is None) or (self._key != key):
+            self.lhs = 1.0 / (self.m_diag + self.gamma * self.dt * self.c_diag)
+            self._key = key
+
+    def step(self, u, v, a, v_hat, a_hat, u_out, v_out, a_out):
+        """Write updated nodal displacement, velocity, and acceleration in
+        place
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for displacement at step `n`
+        v : Numpy array
+            Numpy array [dim] for velocity at step `n`
+        a : Numpy array
+            Numpy array [dim] for acceleration at step `n`
+        v_hat : float
+            Imposed velocity at step `n + 1`
+        a_hat : float
+            Imposed acceleration at step `n + 1`
+        u_out : Numpy array
+            Numpy array [dim] for displacement at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim] for velocity at step `n + 1`
+        a_out : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
+        """
+
+        rhs, tmp = self.work(u.shape)
+
+        # Predictor (displacement predictor is final for beta = 0)
+        self.predict(u, v, a, u_out, v_out, tmp)
+
+        # Set RHS (force vector only loads the base node)
+        self.restoringForce(u_out, rhs)
+        np.multiply(self.c_diag, v_out, out=tmp)
+        rhs += tmp
+        np.negative(rhs, out=rhs)
+        rhs[-1] += self.f.c * v_hat
+
+        # Solve elementwise with inverted diagonal LHS
+        self.checkSystem()
+        np.multiply(self.lhs, rhs, out=a_out)
+
+        # Update predictors
+        self.correct(a_out, v_out, tmp)
+
+        # Update time
+        self.time += self.dt
 
 
 class ExplicitNewmarkRigid(Newmark):
@@ -183,24 +497,31 @@ class ExplicitNewmarkRigid(Newmark):
         Time step
     time : float
         Current time
-    B : float
-        Period of imposed velocity equal 2*pi/B
-    m : Numpy array
-        Numpy array [dim x dim] for mass matrix
-    k : Numpy array
-        Numpy array [dim x dim] for stiffness matrix
-    c : Numpy array
-        Numpy array [dim x dim] for damping matrix
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
     f : Vector object
         Forcing vector object
+    dim : int
+        Number of nodes
+    lhs : Factor object
+        Factored left hand side (rebuilt if `beta`, `gamma`, or `dt` change)
+    elements : Masing object
+        Nonlinear elements giving the restoring force instead of `k` (None
+        for linear elements)
 
     Methods
     -------
-    solve(u, v, a, v_hat, a_hat)
-        Solve for updated nodal displacement, velocity, and acceleration
+    buildLHS()
+        Return left hand side matrix
+    step(u, v, a, v_hat, a_hat, u_out, v_out, a_out)
+        Write updated nodal displacement, velocity, and acceleration in place
     """
 
-    def __init__(self, beta, gamma, dt, B, m, k, c, f):
+    def __init__(self, beta, gamma, dt, m, k, c, f, elements=None):
         """
         Parameters
         ----------
@@ -210,75 +531,378 @@ class ExplicitNewmarkRigid(Newmark):
             gamma parameter
         dt : float
             Time step
-        B : float
-            Period of imposed velocity equal 2*pi/B
-        m : Numpy array
-            Numpy array [dim x dim] for mass matrix
-        k : Numpy array
-            Numpy array [dim x dim] for stiffness matrix
-        c : Numpy array
-            Numpy array [dim x dim] for damping matrix
+        m : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for mass matrix
+        k : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for stiffness matrix
+        c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for damping matrix
         f : Vector object
             Forcing vector object
+        elements : Masing object
+            Nonlinear elements replacing `k` in the restoring force (default
+            is None for linear elements)
         """
 
-        Newmark.__init__(self, beta, gamma, dt, B, m, k, c, f)
+        Newmark.__init__(self, beta, gamma, dt, m, k, c, f, elements)
 
-    def solve(self, u, v, a, v_hat, a_hat):
-        """Solve for updated nodal displacement, velocity, and acceleration
+    def buildLHS(self):
+        """Return left hand side matrix
+
+        Returns
+        -------
+        lhs : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for left hand side with known base
+            acceleration imposed
+        """
+
+        return sto.identityRow(self.m, -1)
+
+    def step(self, u, v, a, v_hat, a_hat, u_out, v_out, a_out):
+        """Write updated nodal displacement, velocity, and acceleration in
+        place
 
         Parameters
         ----------
         u : Numpy array
-            Numpy array [dim x 1] for displacement at step `n`
+            Numpy array [dim] for displacement at step `n`
         v : Numpy array
-            Numpy array [dim x 1] for velocity at step `n`
+            Numpy array [dim] for velocity at step `n`
         a : Numpy array
-            Numpy array [dim x 1] for acceleration at step `n`
+            Numpy array [dim] for acceleration at step `n`
         v_hat : float
             Imposed velocity at step `n + 1`
         a_hat : float
             Imposed acceleration at step `n + 1`
+        u_out : Numpy array
+            Numpy array [dim] for displacement at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim] for velocity at step `n + 1`
+        a_out : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
+        """
+
+        rhs, tmp = self.work(u.shape)
+
+        # Predictor (displacement predictor is final for beta = 0)
+        self.predict(u, v, a, u_out, v_out, tmp)
+
+        # Set RHS
+        self.restoringForce(u_out, rhs)
+        np.negative(rhs, out=rhs)
+
+        # Impose known acceleration
+        rhs[-1] = a_hat
+
+        # Solve with pre-factored LHS
+        self.checkSystem()
+        a_out[...] = self.lhs.solve(rhs)
+
+        # Update predictors
+        self.correct(a_out, v_out, tmp)
+
+        # Update time
+        self.time += self.dt
+
+
+class ImplicitNewmark(Newmark):
+    """Child class for implicit newmark solver with compliant or rigid base
+
+    With `beta = 0.25` and `gamma = 0.5` (average acceleration) the scheme
+    is unconditionally stable, so `dt` is not tied to the CFL limit. The
+    effective stiffness `m + gamma * dt * c + beta * dt^2 * k` is constant
+    and factored once (banded Cholesky for banded storage), then every step
+    is a matrix product and a factored solve. For a rigid base the imposed
+    base acceleration is moved to the right hand side and only the block of
+    free nodes is factored, which keeps it symmetric.
+
+    Attributes
+    ----------
+    beta : float
+        beta parameter
+    gamma : float
+        gamma parameter
+    dt : float
+        Time step
+    time : float
+        Current time
+    m : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for mass matrix
+    k : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for stiffness matrix
+    c : Numpy array, BandedMatrix object, or scipy sparse matrix
+        Matrix [dim x dim] for damping matrix
+    f : Vector object
+        Forcing vector object
+    dim : int
+        Number of nodes
+    rigid : bool
+        True for rigid base (imposed acceleration at the base node)
+    lhs : Factor object
+        Factored effective stiffness (of free nodes for rigid base)
+    coupling : Numpy array
+        Numpy array [dim - 1] for effective stiffness column of the base
+        node in free rows (rigid base only)
+
+    Methods
+    -------
+    buildLHS()
+        Return effective stiffness matrix
+    step(u, v, a, v_hat, a_hat, u_out, v_out, a_out)
+        Write updated nodal displacement, velocity, and acceleration in place
+    """
+
+    def __init__(self, beta, gamma, dt, m, k, c, f, rigid=False):
+        """
+        Parameters
+        ----------
+        beta : float
+            beta parameter (0.25 for average acceleration)
+        gamma : float
+            gamma parameter (0.5 for average acceleration)
+        dt : float
+            Time step
+        m : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for mass matrix
+        k : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for stiffness matrix
+        c : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] for damping matrix
+        f : Vector object
+            Forcing vector object
+        rigid : bool
+            True for rigid base (default is False)
+        """
+
+        if not (0.5 <= gamma <= 2 * beta):
+            raise ValueError('implicit solver needs 0.5 <= gamma <= 2 * beta '
+                             'to be unconditionally stable')
+
+        self.rigid = rigid
+        self.coupling = None
+        Newmark.__init__(self, beta, gamma, dt, m, k, c, f)
+
+    def buildLHS(self):
+        """Return effective stiffness matrix
 
         Returns
         -------
-        u_update : Numpy array
-            Numpy array [dim x 1] for displacement at step `n + 1`
-        v_update : Numpy array
-            Numpy array [dim x 1] for velocity at step `n + 1`
-        a_update : Numpy array
-            Numpy array [dim x 1] for acceleration at step `n + 1`
+        lhs : Numpy array, BandedMatrix object, or scipy sparse matrix
+            Matrix [dim x dim] (or [dim - 1 x dim - 1] of free nodes for
+            rigid base) for `m + gamma * dt * c + beta * dt^2 * k`
         """
 
-        # Only impose 1/2 period of movement
-        if self.time > ((1.0 * np.pi) / self.B): a_hat = 0
+        lhs = (self.m + (self.gamma * self.dt) * self.c
+               + (self.beta * self.dt * self.dt) * self.k)
+        if not self.rigid:
+            return lhs
 
-        # Reshape
-        num_nodes = u.shape[0]
-        u = u.reshape((num_nodes, 1))
-        v = v.reshape((num_nodes, 1))
-        a = a.reshape((num_nodes, 1))
+        # Base column in free rows moves to the right hand side
+        unit = np.zeros(self.dim)
+        unit[-1] = 1.0
+        self.coupling = sto.matvec(lhs, unit, np.empty(self.dim))[:-1]
+        return sto.leading(lhs, self.dim - 1)
 
-        # Predictor
-        u_temp = u + self.dt * v + 0.5 * self.dt * self.dt * a
-        v_temp = v + (1 - self.gamma) * self.dt * a
+    def step(self, u, v, a, v_hat, a_hat, u_out, v_out, a_out):
+        """Write updated nodal displacement, velocity, and acceleration in
+        place
 
-        # Set RHS and LHS
-        rhs = -1.0 * (self.k @ u_temp)
-        lhs = self.m
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim] for displacement at step `n`
+        v : Numpy array
+            Numpy array [dim] for velocity at step `n`
+        a : Numpy array
+            Numpy array [dim] for acceleration at step `n`
+        v_hat : float
+            Imposed velocity at step `n + 1`
+        a_hat : float
+            Imposed acceleration at step `n + 1`
+        u_out : Numpy array
+            Numpy array [dim] for displacement at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim] for velocity at step `n + 1`
+        a_out : Numpy array
+            Numpy array [dim] for acceleration at step `n + 1`
+        """
 
-        # Impose known acceleration
-        lhs[-1, -1] = 1.0
-        rhs[-1, 0] = a_hat
+        self.checkSystem()
+        rhs, tmp = self.work(u.shape)
 
-        # Solve
-        a_update = (np.linalg.inv(lhs) @ rhs)[:, 0]
+        # Predictors
+        self.predict(u, v, a, u_out, v_out, tmp)
 
-        # Update predictors
-        v_update = v_temp[:, 0] + self.gamma * self.dt * a_update
-        u_update = u_temp[:, 0]
+        # rhs = -k * u_pred - c * v_pred
+        sto.matvec(self.k, u_out, rhs)
+        sto.matvec(self.c, v_out, tmp)
+        rhs += tmp
+        np.negative(rhs, out=rhs)
+
+        # Solve for acceleration with imposed base force or acceleration
+        if self.rigid:
+            rhs[:-1] -= np.multiply.outer(self.coupling, a_hat)
+            a_out[:-1] = self.lhs.solve(rhs[:-1])
+            a_out[-1] = a_hat
+        else:
+            rhs[-1] += self.f.c * v_hat
+            a_out[:] = self.lhs.solve(rhs)
+
+        # Correctors
+        np.multiply(a_out, self.beta * self.dt * self.dt, out=tmp)
+        u_out += tmp
+        self.correct(a_out, v_out, tmp)
 
         # Update time
         self.time += self.dt
 
-        return u_update, v_update, a_update
\ No newline at end of file
+
+class ExplicitNewmarkBatch(Newmark):
+    """Child class for explicit newmark solver advancing a batch of N
+    independent lumped columns together
+
+    Every column shares the number of nodes but may have its own mass,
+    stiffness, damping, and force coefficient. Nodal
+    arrays are [dim x N] so each step is one banded product and a few
+    elementwise operations for the whole batch.
+
+    Attributes
+    ----------
+    beta : float
+        beta parameter (must be zero)
+    gamma : float
+        gamma parameter
+    dt : float
+        Time step
+    time : float
+        Current time
+    m : list
+        List of N mass matrices [dim x dim]
+    k : BandedMatrix object
+        Batched stiffness matrix with `ab` [3 x dim x N]
+    c : list
+        List of N damping matrices [dim x dim]
+    f : list
+        List of N forcing vector objects
+    dim : int
+        Number of nodes
+    rigid : bool
+        True for rigid base (imposed acceleration at the base node)
+    m_diag : Numpy array
+        Numpy array [dim x N] for diagonals of mass matrices
+    c_diag : Numpy array
+        Numpy array [dim x N] for diagonals of damping matrices (zero for
+        rigid base)
+    f_c : Numpy array
+        Numpy array [N] for force coefficients on imposed velocity
+    lhs : Numpy array
+        Numpy array [dim x N] for inverse of diagonal left hand sides
+
+    Methods
+    -------
+    checkSystem()
+        Invert diagonal left hand sides if missing or no longer constant
+    step(u, v, a, v_hat, a_hat, u_out, v_out, a_out)
+        Write updated nodal displacement, velocity, and acceleration in place
+    """
+
+    def __init__(self, beta, gamma, dt, m, k, c, f, rigid=False):
+        """
+        Parameters
+        ----------
+        beta : float
+            beta parameter (must be zero)
+        gamma : float
+            gamma parameter
+        dt : float
+            Time step
+        m : list
+            List of N diagonal mass matrices [dim x dim] (any storage)
+        k : list
+            List of N tridiagonal stiffness matrices [dim x dim] (any storage)
+        c : list
+            List of N diagonal damping matrices [dim x dim] (any storage)
+        f : list
+            List of N forcing vector objects
+        rigid : bool
+            True for rigid base (default is False)
+        """
+
+        if beta != 0.0:
+            raise ValueError('batch solver is explicit and needs beta = 0')
+
+        if not all(sto.isDiagonal(mi) and sto.isDiagonal(ci)
+                   for mi, ci in zip(m, c)):
+            raise ValueError('batch solver needs diagonal mass and damping')
+
+        self.rigid = rigid
+        self.m_diag = np.column_stack([sto.diagonal(mi) for mi in m])
+        self.c_diag = np.column_stack([sto.diagonal(ci) for ci in c])
+        self.f_c = np.array([fi.c for fi in f])
+
+        # Rigid base imposes the base acceleration and has no dashpot
+        if rigid:
+            self.c_diag[:] = 0.0
+            self.m_diag[-1, :] = 1.0
+
+        Newmark.__init__(self, beta, gamma, dt, m, sto.stack(k), c, f)
+
+    def checkSystem(self):
+        """Invert diagonal left hand sides if missing or no longer constant
+        """
+
+        key = (self.beta, self.gamma, self.dt)
+        if (self.lhs is None) or (self._key != key):
+            self.lhs = 1.0 / (self.m_diag + self.gamma * self.dt * self.c_diag)
+            self._key = key
+
+    def step(self, u, v, a, v_hat, a_hat, u_out, v_out, a_out):
+        """Write updated nodal displacement, velocity, and acceleration in
+        place
+
+        Parameters
+        ----------
+        u : Numpy array
+            Numpy array [dim x N] for displacement at step `n`
+        v : Numpy array
+            Numpy array [dim x N] for velocity at step `n`
+        a : Numpy array
+            Numpy array [dim x N] for acceleration at step `n`
+        v_hat : Numpy array
+            Numpy array [N] for imposed velocity at step `n + 1`
+        a_hat : Numpy array
+            Numpy array [N] for imposed acceleration at step `n + 1`
+        u_out : Numpy array
+            Numpy array [dim x N] for displacement at step `n + 1`
+        v_out : Numpy array
+            Numpy array [dim x N] for velocity at step `n + 1`
+        a_out : Numpy array
+            Numpy array [dim x N] for acceleration at step `n + 1`
+        """
+
+        rhs, tmp = self.work(u.shape)
+
+        # Predictor (displacement predictor is final for beta = 0)
+        self.predict(u, v, a, u_out, v_out, tmp)
+
+        # Set RHS for all columns
+        self.k.dot(u_out, rhs)
+        np.multiply(self.c_diag, v_out, out=tmp)
+        rhs += tmp
+        np.negative(rhs, out=rhs)
+
+        # Impose known acceleration or base force
+        if self.rigid:
+            rhs[-1, :] = a_hat
+        else:
+            rhs[-1, :] += self.f_c * v_hat
+
+        # Solve elementwise with inverted diagonal LHS
+        self.checkSystem()
+        np.multiply(self.lhs, rhs, out=a_out)
+
+        # Update predictors
+        self.correct(a_out, v_out, tmp)
+
+        # Update time
+        self.time += self.dt
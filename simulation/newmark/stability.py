@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def criticalTimeStep(h_elem, vs):
+    """Return largest stable time step of the explicit (central difference)
+    scheme
+
+    For two node elements with lumped mass the highest element frequency is
+    `2 * vs / h_elem`, so the CFL limit `dt <= 2 / omega_max` is the time a
+    shear wave needs to cross the element. The global limit is the smallest
+    element limit.
+
+    Parameters
+    ----------
+    h_elem : float or Numpy array
+        Height of element [m] (scalar or per element)
+    vs : float or Numpy array
+        Shear wave velocity [m/s] (scalar or per element)
+
+    Returns
+    -------
+    dt : float
+        Critical time step [s]
+    """
+
+    return float(np.min(np.asarray(h_elem) / np.asarray(vs)))
+
+
+def stableTimeStep(h_elem, vs, safety=0.9):
+    """Return critical time step reduced by a safety factor
+
+    Parameters
+    ----------
+    h_elem : float or Numpy array
+        Height of element [m] (scalar or per element)
+    vs : float or Numpy array
+        Shear wave velocity [m/s] (scalar or per element)
+    safety : float
+        Fraction of critical time step to use (default is 0.9)
+
+    Returns
+    -------
+    dt : float
+        Stable time step [s]
+    """
+
+    if not (0.0 < safety <= 1.0):
+        raise ValueError('safety factor must be in (0, 1]')
+
+    return safety * criticalTimeStep(h_elem, vs)
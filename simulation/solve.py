@@ -3,147 +3,708 @@ import os
 import arrays.matrix as mat
 import arrays.vector as vec
 
+import frequency.cache as cache
+import frequency.equivalent as equivalent
+import frequency.frequency as frequency
+
+import modal.modal as modal
+
+import newmark.checkpoint as checkpoint
+import newmark.hysteresis as hysteresis
+import newmark.integrator as integrator
 import newmark.newmark as newmark
+import newmark.stability as stability
 
 import utilities.motion as motion
+import utilities.profile as profile
+import utilities.results as results
 import utilities.save as save
+import utilities.sink as sink
+import utilities.timing as timing
 
 import numpy as np
 
+ENGINES = ('newmark', 'frequency', 'modal', 'equivalent')
+SCHEMES = ('explicit', 'implicit')
+CHECKPOINT = 'checkpoint.npz'
 
-def solve(params, sim):
+
+def solve(params, sim, root='simulation/data/'):
     """Solve 1D FEM problem
 
+    Outputs are written to `root + sim['name']` without changing the current
+    working directory, so several problems can be solved in one process.
+
     Parameters
     ----------
     params : dict
         Dictionary of material parameters:
         `'vs'`: Shear wave velocity [m/s]
         `'rho'`: Mass density [kg/m3]
+        `'layers'`: List of layer dictionaries from the top down with `'h'`,
+        `'vs'`, `'rho'`, and optional `'h_elem'` (optional, replaces `'vs'`,
+        `'rho'`, and `'h'`)
         `'vs_rock'`: Shear wave velocity of underlying rock [m/s]
         `'rho_rock'`: Mass density of underlying rock [kg/m3]
+        `'gamma_ref'`, `'curvature'`, `'damping_min'`, `'damping_max'`, or
+        `'curves'`: Strain dependent modulus and damping of the
+        `'equivalent'` engine, per layer or for every layer (optional, see
+        `equivalent.fromProfile`), `'gamma_ref'` and `'curvature'` also set
+        the backbone of `'nonlinear'` elements
     sim : dict
         Dictionary of simulation settings:
         `'name'`: Name of output directory
         `'A'`: Amplitude of imposed velocity
         `'B'`: Period of imposed velocity equals 2*pi/B
+        `'motion'`: Recorded accelerogram file (`.AT2` or `.csv`) imposed
+        instead of the `'A'` and `'B'` pulse (optional)
+        `'motion_dt'`: Sample interval [s] of single column records
+        (optional)
+        `'motion_scale'`: Factor on recorded acceleration, e.g. 9.81 for
+        records in g (optional, default is 1.0)
+        `'baseline'`: Order of polynomial removed from recorded velocity, or
+        None for no correction (optional, default is 1)
         `'h'`: Height of total bar [m]
         `'h_elem'`: Height of element [m] (optional)
+        `'f_max'`: Highest frequency to resolve [Hz], sets element height per
+        layer from `'ppw'` (optional)
+        `'ppw'`: Nodes per shortest wavelength (optional, default is 10)
         `'w_elem'`: Width of element [m] (optional)
         `'l_elem'`: Length of element [m] (optional)
+        `'tf'`: Final time [s] (optional, default is 2.5)
+        `'dt'`: Time step [s] (optional, default is the largest stable step
+        times `'cfl'`)
+        `'cfl'`: Safety factor on the critical time step, may exceed 1 for
+        the `'implicit'` scheme (optional, default is 0.9)
+        `'scheme'`: `'explicit'` (central difference) or `'implicit'`
+        (average acceleration, unconditionally stable) Newmark scheme
+        (optional, default is `'explicit'`)
+        `'storage'`: Matrix storage `'dense'`, `'banded'`, or `'csr'`
+        (optional, default is `'banded'`)
+        `'jit'`: Boolean with True to require the Numba kernel and False to
+        disable it (optional, default uses it when installed)
+        `'format'`: Output format `'txt'`, `'npy'`, `'npz'`, `'h5'`, or
+        `'zarr'` (optional, default is `'txt'`)
+        `'chunk'`: Number of time steps held in memory between writes to
+        disk (optional, default is 1024)
+        `'nodes'`: List of recorded node indices from the surface down
+        (optional, default is every node)
+        `'depths'`: List of recorded depths [m], each saved at its nearest
+        node (optional, replaces `'nodes'`)
+        `'quantities'`: List of recorded quantities from `'disp'`, `'vel'`,
+        and `'acc'` (optional, default is all three)
+        `'dt_out'`: Output time interval [s], rounded to a whole number of
+        time steps (optional, default is every time step)
+        `'peaks'`: Boolean with True to save peak absolute values of every
+        node and quantity (optional)
+        `'engine'`: `'newmark'` for explicit time stepping, `'frequency'`
+        for the frequency domain solution of a compliant base, `'modal'`
+        for modal superposition on a rigid base, or `'equivalent'` for
+        equivalent linear iteration of a compliant base (optional, default
+        is `'newmark'`)
+        `'pad'`: Smallest ratio of FFT length to number of time steps for
+        the `'frequency'` and `'equivalent'` (at least 1.5) engines
+        (optional, default is 2.0)
+        `'cache_dir'`: Directory saving transfer functions of the
+        `'frequency'` engine for reuse by later runs (optional)
+        `'modes'`: Number of lowest modes kept by the `'modal'` engine
+        (optional, default is 20)
+        `'zeta'`: Modal damping ratio of the `'modal'` engine (optional,
+        default is 0.0)
+        `'strain_ratio'`: Effective over peak strain of the `'equivalent'`
+        engine (optional, default is 0.65)
+        `'tol'`: Relative change of element moduli at which the
+        `'equivalent'` engine stops iterating (optional, default is 0.01)
+        `'max_iter'`: Largest number of `'equivalent'` iterations
+        (optional, default is 15)
+        `'nonlinear'`: Boolean with True for hyperbolic (MKZ) elements with
+        Masing unload-reload rules in the explicit `'newmark'` engine
+        (optional)
+        `'profile'`: Boolean with True to save wall time of each phase
+        (`'assemble'`, `'motion'`, `'solve'`, and `'save'`), throughput,
+        and peak memory to `profile.json` (optional, see
+        `timing.Profiler.report`)
+        `'checkpoint'`: Wall time between snapshots of the `'newmark'`
+        engine state [s], saved to `checkpoint.npz` in the output directory
+        (optional)
+        `'restart'`: Boolean with True to resume an interrupted `'newmark'`
+        run from its last snapshot, appending to its outputs (optional)
+        `'results'`: Directory of the result cache, where outputs of
+        finished runs are stored under a hash of `params`, `sim`, the
+        recorded motion, and the solver source, and copied to the output
+        directory of any later run with the same key instead of solving
+        (optional, see `results.ResultCache`)
+        `'results_size'`: Largest size of the result cache [GB] before least
+        recently used outputs are evicted (optional, default is 10.0)
         `'print_flag'`: Boolean with True to print matrices terminal (optional)
+    root : str
+        Directory holding output directories (default is
+        `'simulation/data/'`)
 
     Returns
     -------
-    None
+    saveDir : str
+        Output directory
+
+    Raises
+    ------
+    FileExistsError
+        If the output directory already exists (with no snapshot to
+        resume from with `'restart'`, or other results than the inputs with
+        `'results'`)
+    ValueError
+        If total height and element height are incompatible, the engine
+        is unknown or cannot solve the base condition, or the output format
+        is unknown
+    ImportError
+        If the output format needs h5py or zarr and it is not installed
     """
 
     # Set directory name for saving
-    saveDir = 'simulation/data/' + sim['name']
+    saveDir = os.path.join(root, sim['name'])
+
+    # Reuse finished outputs of the same inputs
+    digest = None
+    store = None
+    if sim.get('results') != None:
+        digest = results.key(params, sim)
+        if results.marked(saveDir) == digest:
+            print(f'Outputs in {saveDir} already match the inputs')
+            return saveDir
+        size = (sim['results_size'] if (sim.get('results_size') != None)
+                else 10.0)
+        store = results.ResultCache(sim['results'], size * 2**30)
+
+    # Do not overwrite existing data unless resuming it from a snapshot
+    snapshot = os.path.join(saveDir, CHECKPOINT)
+    resume = bool(sim.get('restart')) and os.path.exists(snapshot)
+    if os.path.exists(saveDir) and not resume:
+        raise FileExistsError(f'data save location {saveDir} already exists')
+
+    # Check engine and output format before any work
+    engine = sim['engine'] if (sim.get('engine') != None) else 'newmark'
+    if engine not in ENGINES:
+        raise ValueError(f'unknown engine {engine!r}, use one of {ENGINES}')
+    if (engine in ('frequency', 'equivalent')) and sim['rigid']:
+        raise ValueError(f'{engine} engine needs a compliant base')
+    if (engine == 'modal') and not sim['rigid']:
+        raise ValueError('modal engine needs a rigid base')
+    if sim.get('scheme') not in (None,) + SCHEMES:
+        raise ValueError(f'unknown scheme {sim["scheme"]!r}, use one of '
+                         f'{SCHEMES}')
+    if sim.get('nonlinear') and ((engine != 'newmark')
+                                 or (sim.get('scheme') == 'implicit')):
+        raise ValueError('nonlinear elements need the explicit newmark '
+                         'engine')
+    if ((sim.get('checkpoint') != None) or sim.get('restart')) and (
+            engine != 'newmark'):
+        raise ValueError('checkpoints need the newmark engine')
+    fmt = outputFormat(sim)
+
+    # Outputs of the same inputs from the result cache, reused without
+    # assembling since the time stepping comes from the cached metadata
+    # (data files holding metadata are copied, since it is rewritten for
+    # this run)
+    if (store is not None) and not resume:
+        meta = store.meta(digest)
+        copy = [save.dataFile(None, fmt)] if (fmt in ('h5', 'zarr')) else []
+        if (meta is not None) and store.get(digest, saveDir, copy):
+            meta.update(params=params, sim=sim)
+            time_info = {name: meta[name]
+                         for name in ('dt', 'dt_cr', 'tf', 'steps')}
+            save.saveDicts({'Params': params, 'Sim': sim,
+                            'Time': time_info}, saveDir)
+            save.saveMeta(meta, saveDir)
+            print(f'Reused cached outputs {digest[:12]} in {saveDir}')
+            return saveDir
+
+    # Phase timers (saved with `'profile'`)
+    timer = timing.Profiler()
+
+    # Assemble global matrices and force vector
+    with timer.phase('assemble'):
+        prof, m, k, c, f = assemble(params, sim)
+
+    # Make directory and save input paramters (kept from the interrupted
+    # run when resuming)
+    if not resume:
+        with timer.phase('save'):
+            os.makedirs(saveDir)
+            d = {'Params': params, 'Sim': sim}
+            save.saveDicts(d, saveDir)
 
-    # Make directory if it does not exist
-    if not os.path.exists(saveDir):
-        os.makedirs(saveDir)
+    # Grab print boolean and output matrices
+    p_flag = sim['print_flag'] if (sim.get('print_flag') != None) else False
+    if p_flag:
+        prof.out()
+        m.out()
+        k.out()
+        c.out()
+        f.out()
 
-    # Warn and quit if directory already exists
+    # Grab kinematic parameters for base motion
+    rigid = sim['rigid']
+    with timer.phase('motion'):
+        base_motion = motion.fromInputs(sim)
+
+    # Set Newmark params (average acceleration if implicit)
+    scheme = sim['scheme'] if (sim.get('scheme') != None) else 'explicit'
+    if scheme == 'implicit':
+        beta = 0.25
+        gamma = 0.5
+    else:
+        beta = 0.0
+        gamma = 0.5
+
+    # Set time step from the CFL limit
+    dt, dt_cr, tf = timeStep(prof, sim)
+
+    # Set time steps
+    steps = int(round(tf / dt))
+    time = dt * np.arange(steps)
+
+    # Report and save time stepping
+    print(f'Time step {dt:.4e} s ({dt / dt_cr:.3f} of critical '
+          f'{dt_cr:.4e} s), {steps} steps')
+    out = outputs(prof, sim, dt)
+    if not resume:
+        with timer.phase('save'):
+            save.saveDicts({'Time': {'dt': dt, 'dt_cr': dt_cr, 'tf': tf,
+                                     'steps': steps}}, saveDir)
+
+            # Save run metadata first so a run stopped early is still
+            # readable
+            save.saveMeta(metadata(prof, params, sim, dt, dt_cr, tf, steps,
+                                   fmt, out), saveDir)
+
+    # Whole response at once (frequency domain or modal superposition)
+    if engine != 'newmark':
+        with timer.phase('motion'):
+            v_hat, a_hat = base_motion.history(dt * np.arange(steps + 1))
+        pad = sim['pad'] if (sim.get('pad') != None) else 2.0
+
+        # Only recorded nodes unless peaks of every node are saved
+        rows = None if out['peaks'] else out['nodes']
+        with timer.phase('solve'):
+            if engine == 'frequency':
+                # Transfer functions are cached per process, up to the
+                # memory bound of the cache (and on disk with
+                # `'cache_dir'`), so later motions on the same column skip
+                # solving
+                tf_cache = cache.shared(sim.get('cache_dir'))
+                u, v, a = frequency.response(m.matrix, k.matrix, c.matrix, f,
+                                             v_hat, dt, rows, pad, tf_cache)
+            elif engine == 'modal':
+                # Eigenbasis is cached per profile
+                num_modes = (sim['modes'] if (sim.get('modes') != None)
+                             else 20)
+                zeta = sim['zeta'] if (sim.get('zeta') != None) else 0.0
+                u, v, a = modal.response(m.matrix, k.matrix, a_hat, dt,
+                                         num_modes, rows, zeta)
+            else:
+                ratio = (sim['strain_ratio']
+                         if (sim.get('strain_ratio') != None) else 0.65)
+                tol = sim['tol'] if (sim.get('tol') != None) else 0.01
+                max_iter = (sim['max_iter'] if (sim.get('max_iter') != None)
+                            else 15)
+                curves = equivalent.fromProfile(prof, params)
+                g_max = np.broadcast_to(k.g, prof.h_elem.shape)
+                u, v, a, result = equivalent.response(
+                    m.matrix, c.matrix, f, g_max, prof.h_elem, curves, v_hat,
+                    dt, rows, ratio, tol, max_iter, pad)
+                print(f'Equivalent linear {result["iterations"]} iterations, '
+                      f'modulus change {result["change"]:.2e}')
+                if not result['converged']:
+                    print(f'Warning: strain compatible properties did not '
+                          f'converge to {tol:g} in {max_iter} iterations!!')
+
+        with timer.phase('save'):
+            stream = recorder(out if (rows is None) else dict(out, nodes=None),
+                              saveDir, fmt)
+            stream.open(u.shape)
+            stream.write(u, v, a)
+            stream.close()
+
+            # Strain compatible properties of every element
+            if engine == 'equivalent':
+                save.saveData(np.column_stack((result['strain'],
+                                               result['modulus'],
+                                               result['damping'])),
+                              'strain', saveDir, fmt)
+                save.saveDicts({'Equivalent': {
+                    'iterations': result['iterations'],
+                    'converged': result['converged'],
+                    'change': result['change']}}, saveDir)
+
+        finish(timer, sim, saveDir, steps, prof.num_nodes, digest, store)
+        return saveDir
+
+    # Hysteretic elements replace the linear stiffness force
+    elements = None
+    if sim.get('nonlinear'):
+        curves = equivalent.fromProfile(prof, params)
+        if curves.tables:
+            raise ValueError('nonlinear elements need hyperbolic curves '
+                             '(gamma_ref), not tabulated curves')
+        elements = hysteresis.Masing(k.g, prof.h_elem, curves.gamma_ref,
+                                     curves.curvature)
+
+    # Set Newmark solver (lumped fast path if mass and damping are diagonal)
+    if scheme == 'implicit':
+        solver = newmark.ImplicitNewmark(beta, gamma, dt, m.matrix, k.matrix,
+                                         c.matrix, f, rigid)
+    elif rigid:
+        solver = newmark.ExplicitNewmarkRigid(beta, gamma, dt, m.matrix,
+                                              k.matrix, c.matrix, f, elements)
+    elif (beta == 0.0) and m.isDiagonal() and c.isDiagonal():
+        solver = newmark.ExplicitNewmarkLumped(beta, gamma, dt, m.matrix,
+                                               k.matrix, c.matrix, f,
+                                               elements)
     else:
-        print('Warning: data save location already exists!!')
-        quit()
+        solver = newmark.ExplicitNewmarkCompliant(beta, gamma, dt, m.matrix,
+                                                  k.matrix, c.matrix, f,
+                                                  elements)
+
+    # Imposed kinematics for every step (1/2 period of movement)
+    with timer.phase('motion'):
+        v_hat, a_hat = base_motion.history(time)
+
+    # Periodic snapshots and the one to resume from
+    snapshots = None
+    if sim.get('checkpoint') != None:
+        snapshots = checkpoint.Checkpoint(snapshot, sim['checkpoint'])
+    state = checkpoint.load(snapshot) if resume else None
+    done = 0
+    if resume:
+        done = int(state['step'])
+        print(f'Restarting from step {done} of {steps}')
+
+    # Integrate whole time history streaming recorded steps to disk (writes
+    # are timed apart from the time stepping)
+    stream = sink.TimedSink(recorder(out, saveDir, fmt), timer)
+    with timer.phase('solve'):
+        integrator.integrate(solver, v_hat, a_hat, sim.get('jit'), stream,
+                             sim.get('chunk'), snapshots, state)
+
+    # A finished run has nothing to resume
+    if os.path.exists(snapshot):
+        os.remove(snapshot)
+
+    finish(timer, sim, saveDir, steps - done, prof.num_nodes, digest,
+           store)
+    return saveDir
+
+
+def finish(timer, sim, path, steps, num_nodes, digest=None, store=None):
+    """Cache outputs of a finished run and report its phase timing
+
+    Outputs are marked with `digest` and stored in the result cache with
+    `'results'`, and phase timing is saved with `'profile'`.
 
-    # Change current directory to correct location
-    os.chdir(saveDir)
+    Parameters
+    ----------
+    timer : Profiler object
+        Phase timers of the run
+    sim : dict
+        Dictionary of simulation settings (see `solve`)
+    path : str
+        Output directory
+    steps : int
+        Number of time steps
+    num_nodes : int
+        Number of nodes
+    digest : str
+        Hash key of the run (default is None for no result cache)
+    store : ResultCache object
+        Result cache (default is None for no result cache)
+    """
+
+    if digest != None:
+        with timer.phase('save'):
+            results.mark(path, digest)
+            store.put(digest, path)
+
+    if not sim.get('profile'):
+        return
+
+    report = timer.report(steps, num_nodes)
+    report['engine'] = (sim['engine'] if (sim.get('engine') != None)
+                        else 'newmark')
+    save.saveProfile(report, path)
+
+    phases = ', '.join(f'{name} {entry["time"]:.3f} s'
+                       for name, entry in report['phases'].items())
+    print(f'Solved in {report["total"]:.3f} s ({phases})')
+    if report['node_steps_per_s'] != None:
+        print(f'{report["steps_per_s"]:.4e} steps/s, '
+              f'{report["node_steps_per_s"]:.4e} node steps/s')
+
+
+def assemble(params, sim):
+    """Discretize soil profile and assemble global matrices and force vector
+
+    Parameters
+    ----------
+    params : dict
+        Dictionary of material parameters (see `solve`)
+    sim : dict
+        Dictionary of simulation settings (see `solve`)
 
-    # Save input paramters
-    d = {'Params': params, 'Sim': sim}
-    save.saveDicts(d)
+    Returns
+    -------
+    prof : Profile object
+        Discretized soil column
+    m : MassMatrix object
+        Global mass matrix
+    k : StiffnessMatrix object
+        Global stiffness matrix
+    c : DampingMatrix object
+        Global damping matrix
+    f : ForceVector object
+        Global force vector
+
+    Raises
+    ------
+    ValueError
+        If total height and element height are incompatible
+    """
 
     # Grab mesh settings
-    h = sim['h']
-    h_elem = sim['h_elem'] if (sim.get('h_elem') != None) else 1.0
     w_elem = sim['w_elem'] if (sim.get('w_elem') != None) else 1.0
     l_elem = sim['l_elem'] if (sim.get('l_elem') != None) else 1.0
 
-    # Compute helpful mesh params
-    num_elem = int(h / h_elem)
-    num_nodes = num_elem + 1
+    # Stop if total height and element height are incompatible
+    if (params.get('layers') == None) and (sim.get('f_max') == None):
+        h = sim['h']
+        h_elem = sim['h_elem'] if (sim.get('h_elem') != None) else 1.0
+        if ((h % h_elem) != 0):
+            raise ValueError('total height and element height are '
+                             'incompatible')
+
+    # Discretize soil profile into per element properties
+    prof = profile.fromInputs(params, sim)
+    num_nodes = prof.num_nodes
+    h_elem = prof.h_elem
+    vs = prof.vs
+    rho = prof.rho
 
     # Compute cross sectional area
     area_elem = w_elem * l_elem
 
-    # Warning and quit if total height and element height are incompatible
-    if ((h % h_elem) != 0):
-        print('Warning: total height and element height are incompatible!!')
-        quit()
-
-    # Grab material params
-    vs = params['vs']
-    rho = params['rho']
+    # Grab rock params
     vs_rock = params['vs_rock']
     rho_rock = params['rho_rock']
 
+    # Grab matrix storage
+    storage = sim['storage'] if (sim.get('storage') != None) else 'banded'
+
     # Compute gloabl mass, stiffness, and damping matrix
-    m = mat.MassMatrix(num_nodes, rho, area_elem, h_elem)
-    k = mat.StiffnessMatrix(num_nodes, vs, rho, area_elem, h_elem)
-    c = mat.DampingMatrix(num_nodes, vs_rock, rho_rock, area_elem)
+    m = mat.MassMatrix(num_nodes, rho, h_elem, area_elem, storage)
+    k = mat.StiffnessMatrix(num_nodes, vs, rho, area_elem, h_elem, storage)
+    c = mat.DampingMatrix(num_nodes, vs_rock, rho_rock, area_elem, storage)
 
     # Compute gloabl force vector
     f = vec.ForceVector(num_nodes, vs_rock, rho_rock, area_elem)
 
-    # Grab print boolean and output matrices
-    p_flag = sim['pflag'] if (sim.get('print_flag') != None) else False
-    if p_flag:
-        m.out()
-        k.out()
-        c.out()
-        f.out()
+    return prof, m, k, c, f
 
-    # Grab kinematic parameters for base motion
-    rigid = sim['rigid']
-    A = sim['A']
-    B = sim['B']
-    base_motion = motion.Motion(A, B)
-
-    # Set explicit Newmark params
-    beta = 0.0
-    gamma = 0.5
-
-    #
-    tf = 2.5
-    dt = 1.0e-4
-
-    #
-    steps = int(tf / dt)
-    time = np.linspace(0, tf, steps)
-
-    # Set Newmark solver
-    solver = newmark.ExplicitNewmarkCompliant(beta, gamma, dt, B, m.matrix,
-                                              k.matrix, c.matrix, f)
-    if rigid:
-        solver = newmark.ExplicitNewmarkRigid(beta, gamma, dt, B, m.matrix,
-                                              k.matrix, c.matrix, f)
-
-    # Initialize nodes
-    u = np.zeros((num_nodes, steps + 1))
-    v = np.zeros((num_nodes, steps + 1))
-    a = np.zeros((num_nodes, steps + 1))
-
-    # Loop over each step
-    for s, t in enumerate(time):
-
-        # Imposed kinematics for current step
-        v_hat = base_motion.v(t)
-        a_hat = base_motion.a(t)
-
-        # Solve
-        utemp, vtemp, atemp = solver.solve(u[:, s], v[:, s], a[:, s], v_hat,
-                                           a_hat)
-
-        # Save current solution
-        u[:, s + 1] += utemp
-        v[:, s + 1] += vtemp
-        a[:, s + 1] += atemp
-
-    # Save simulation to txt for visualization
-    save.saveData(u, "disp")
-    save.saveData(v, "vel")
-    save.saveData(a, "acc")
+
+def timeStep(prof, sim):
+    """Return explicit time step, critical time step, and final time
+
+    Parameters
+    ----------
+    prof : Profile object
+        Discretized soil column
+    sim : dict
+        Dictionary of simulation settings with optional `'tf'`, `'dt'`, and
+        `'cfl'` (see `solve`)
+
+    Returns
+    -------
+    dt : float
+        Time step [s]
+    dt_cr : float
+        Critical time step [s]
+    tf : float
+        Final time [s]
+    """
+
+    # Largest stable explicit time step from the CFL limit of each element
+    dt_cr = stability.criticalTimeStep(prof.h_elem, prof.vs)
+    cfl = sim['cfl'] if (sim.get('cfl') != None) else 0.9
+
+    # Set time step (user time step is checked against the CFL limit, which
+    # only applies to explicit time stepping)
+    tf = sim['tf'] if (sim.get('tf') != None) else 2.5
+    bounded = ((sim.get('engine') in (None, 'newmark'))
+               and (sim.get('scheme') != 'implicit'))
+    if sim.get('dt') != None:
+        dt = sim['dt']
+        if (dt > dt_cr) and bounded:
+            print(f'Warning: time step {dt:.3e} s exceeds critical time step '
+                  f'{dt_cr:.3e} s!!')
+    elif bounded:
+        dt = stability.stableTimeStep(prof.h_elem, prof.vs, cfl)
+    else:
+        dt = cfl * dt_cr
+
+    return dt, dt_cr, tf
+
+
+def outputs(prof, sim, dt):
+    """Return recorded nodes, quantities, and output interval
+
+    Parameters
+    ----------
+    prof : Profile object
+        Discretized soil column
+    sim : dict
+        Dictionary of simulation settings with optional `'nodes'`,
+        `'depths'`, `'quantities'`, `'dt_out'`, and `'peaks'` (see `solve`)
+    dt : float
+        Time step [s]
+
+    Returns
+    -------
+    out : dict
+        Dictionary with `'nodes'` (Numpy array of node indices),
+        `'quantities'`, `'stride'` (time steps between records), `'dt_out'`
+        [s], and `'peaks'`
+    """
+
+    # Recorded nodes (nearest node of each depth)
+    if sim.get('depths') != None:
+        depths = np.asarray(sim['depths'], dtype=float)
+        nodes = np.abs(prof.depth[:, None] - depths[None, :]).argmin(axis=0)
+    elif sim.get('nodes') != None:
+        nodes = np.arange(prof.num_nodes)[np.asarray(sim['nodes'], dtype=int)]
+    else:
+        nodes = np.arange(prof.num_nodes)
+
+    # Recorded quantities and whole number of time steps between records
+    if sim.get('quantities') != None:
+        quantities = list(sim['quantities'])
+    else:
+        quantities = list(sink.NAMES)
+    if sim.get('dt_out') != None:
+        stride = max(1, int(round(sim['dt_out'] / dt)))
+    else:
+        stride = 1
+
+    return {
+        'nodes': nodes,
+        'quantities': quantities,
+        'stride': stride,
+        'dt_out': stride * dt,
+        'peaks': bool(sim.get('peaks')),
+    }
+
+
+def outputFormat(sim):
+    """Return output format of a run, checking it can be written
+
+    Parameters
+    ----------
+    sim : dict
+        Dictionary of simulation settings with optional `'format'` (see
+        `solve`)
+
+    Returns
+    -------
+    fmt : str
+        Output format (default is `'txt'`)
+
+    Raises
+    ------
+    ValueError
+        If the output format is unknown
+    ImportError
+        If the output format needs h5py or zarr and it is not installed
+    """
+
+    fmt = sim['format'] if (sim.get('format') != None) else 'txt'
+    if fmt not in save.FORMATS:
+        raise ValueError(f'unknown format {fmt!r}, use one of '
+                         f'{save.FORMATS}')
+    if (fmt == 'h5') and (save.h5py is None):
+        raise ImportError('h5 output requires h5py')
+    if (fmt == 'zarr') and (save.zarr is None):
+        raise ImportError('zarr output requires zarr')
+
+    return fmt
+
+
+def recorder(out, path, fmt):
+    """Return sink recording outputs to disk
+
+    Parameters
+    ----------
+    out : dict
+        Dictionary of recorded outputs from `outputs`
+    path : str
+        Output directory
+    fmt : str
+        Output format
+
+    Returns
+    -------
+    stream : Sink object
+        Sink taking nodal displacement, velocity, and acceleration blocks
+    """
+
+    stream = sink.Recorder(sink.FileSink(path, fmt, out['quantities']),
+                           out['nodes'], out['quantities'], out['stride'])
+    if out['peaks']:
+        stream = sink.TeeSink([stream, sink.PeakSink(path, fmt)])
+
+    return stream
+
+
+def metadata(prof, params, sim, dt, dt_cr, tf, steps, fmt, out):
+    """Return run metadata saved next to the data
+
+    Parameters
+    ----------
+    prof : Profile object
+        Discretized soil column
+    params : dict
+        Dictionary of material parameters
+    sim : dict
+        Dictionary of simulation settings
+    dt : float
+        Time step [s]
+    dt_cr : float
+        Critical time step [s]
+    tf : float
+        Final time [s]
+    steps : int
+        Number of time steps
+    fmt : str
+        Output format
+    out : dict
+        Dictionary of recorded outputs from `outputs`
+
+    Returns
+    -------
+    meta : dict
+        Dictionary of run metadata
+    """
+
+    return {
+        'format': fmt,
+        'quantities': out['quantities'],
+        'peaks': out['peaks'],
+        'num_nodes': prof.num_nodes,
+        'nodes': out['nodes'],
+        'h': prof.h,
+        'depth': prof.depth[out['nodes']],
+        'steps': steps,
+        'records': (steps // out['stride']) + 1,
+        'dt': dt,
+        'dt_out': out['dt_out'],
+        'dt_cr': dt_cr,
+        'tf': tf,
+        'params': params,
+        'sim': sim,
+    }
@@ -0,0 +1,205 @@
+import argparse
+import itertools
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import solve
+
+
+def grid(params, sim, params_grid=None, sim_grid=None):
+    """Return list of cases for every combination of grid values
+
+    Parameters
+    ----------
+    params : dict
+        Base dictionary of material parameters
+    sim : dict
+        Base dictionary of simulation settings (its `'name'` is used as the
+        parent directory of each case, or as the name of the single case of
+        an empty grid)
+    params_grid : dict
+        Dictionary of material parameter names to lists of values (default
+        is None)
+    sim_grid : dict
+        Dictionary of simulation setting names to lists of values (default
+        is None)
+
+    Returns
+    -------
+    cases : list
+        List of `(params, sim)` tuples with unique `sim['name']`
+    """
+
+    params_grid = params_grid if (params_grid != None) else {}
+    sim_grid = sim_grid if (sim_grid != None) else {}
+    keys = [('params', key) for key in params_grid]
+    keys += [('sim', key) for key in sim_grid]
+    values = list(params_grid.values()) + list(sim_grid.values())
+
+    cases = []
+    for combo in itertools.product(*values):
+        case_params = dict(params)
+        case_sim = dict(sim)
+        tags = []
+        for (where, key), value in zip(keys, combo):
+            if where == 'params':
+                case_params[key] = value
+            else:
+                case_sim[key] = value
+            tags += [f'{key}={value:g}' if isinstance(value, float) else
+                     f'{key}={value}']
+        if tags:
+            case_sim['name'] = os.path.join(sim['name'], '_'.join(tags))
+        cases += [(case_params, case_sim)]
+
+    return cases
+
+
+def runCase(params, sim, root):
+    """Solve one case and report its outcome instead of raising
+
+    Parameters
+    ----------
+    params : dict
+        Dictionary of material parameters
+    sim : dict
+        Dictionary of simulation settings
+    root : str
+        Directory holding output directories
+
+    Returns
+    -------
+    result : dict
+        Dictionary with `'name'`, `'ok'`, `'path'`, `'error'`, and
+        `'elapsed'` [s]
+    """
+
+    start = time.perf_counter()
+    result = {'name': sim.get('name'), 'ok': True, 'path': None,
+              'error': None}
+    try:
+        result['path'] = solve.solve(params, sim, root)
+    except Exception as e:
+        result['ok'] = False
+        result['error'] = f'{type(e).__name__}: {e}'
+        result['traceback'] = traceback.format_exc()
+    result['elapsed'] = time.perf_counter() - start
+
+    return result
+
+
+def sweep(cases, workers=None, root='simulation/data/', verbose=True):
+    """Solve cases in parallel across a process pool
+
+    Parameters
+    ----------
+    cases : list
+        List of `(params, sim)` tuples with unique `sim['name']`
+    workers : int
+        Number of worker processes (default is None for one per CPU)
+    root : str
+        Directory holding output directories (default is
+        `'simulation/data/'`)
+    verbose : bool
+        True to print progress and failures as cases finish (default is
+        True)
+
+    Returns
+    -------
+    results : list
+        List of result dictionaries from `runCase` in the order of `cases`
+    """
+
+    # Workers get an absolute root so they do not depend on their cwd
+    root = os.path.abspath(root)
+    names = [sim['name'] for _, sim in cases]
+    if len(set(names)) != len(names):
+        raise ValueError('case names must be unique')
+
+    results = [None] * len(cases)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(runCase, params, sim, root): i
+            for i, (params, sim) in enumerate(cases)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            i = futures[future]
+            results[i] = future.result()
+            if verbose:
+                r = results[i]
+                status = 'ok' if r['ok'] else f'FAILED ({r["error"]})'
+                print(f'[{done}/{len(cases)}] {r["name"]} {status} '
+                      f'in {r["elapsed"]:.2f} s')
+
+    if verbose:
+        failed = sum(not r['ok'] for r in results)
+        print(f'{len(cases) - failed} of {len(cases)} cases finished, '
+              f'{failed} failed')
+
+    return results
+
+
+def loadCases(fname):
+    """Return list of cases from a JSON sweep file
+
+    The file holds either a list of cases,
+    `{"cases": [{"params": {...}, "sim": {...}}, ...]}`, or a grid,
+    `{"params": {...}, "sim": {...}, "grid": {"params": {...}, "sim": {...}}}`
+    with lists of values in `"grid"`.
+
+    Parameters
+    ----------
+    fname : str
+        JSON file name
+
+    Returns
+    -------
+    cases : list
+        List of `(params, sim)` tuples
+    """
+
+    with open(fname) as f:
+        spec = json.load(f)
+
+    if 'cases' in spec:
+        return [(case['params'], case['sim']) for case in spec['cases']]
+
+    g = spec.get('grid', {})
+    return grid(spec['params'], spec['sim'], g.get('params'), g.get('sim'))
+
+
+def main():
+    """
+    Run a parameter sweep from a JSON file, for example
+        python simulation/sweep.py sweep.json --workers 8
+    """
+    parser = argparse.ArgumentParser(description='Parallel parameter sweep')
+    parser.add_argument('file', help='JSON file with cases or a grid')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of worker processes (default: CPUs)')
+    parser.add_argument('--root', default='simulation/data/',
+                        help='directory holding output directories')
+    parser.add_argument('--results', default=None,
+                        help='result cache directory reused across sweeps')
+    parser.add_argument('--results-size', type=float, default=None,
+                        help='largest size of the result cache in GB')
+    args = parser.parse_args()
+
+    # Cases without their own result cache share the given one
+    cases = loadCases(args.file)
+    if args.results != None:
+        shared = {'results': os.path.abspath(args.results),
+                  'results_size': args.results_size}
+        cases = [(params, dict(shared, **sim)) for params, sim in cases]
+
+    # Sweep and exit with failure if any case failed
+    results = sweep(cases, args.workers, args.root)
+    if not all(r['ok'] for r in results):
+        quit(1)
+
+
+if __name__ == '__main__':
+    main()
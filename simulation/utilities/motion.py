@@ -1,16 +1,25 @@
+import functools
+import os
+import re
+
 import numpy as np
 
 
 class Motion:
     """Parent class for imposed kinematic motion
 
+    Every method takes a scalar time or a Numpy array of times and returns
+    the same shape, so whole histories are evaluated in one vectorized pass.
+
     Attributes
     ----------
     A : float
         Amplitude
     B : float
         Period is 2*pi/B
-    
+    duration : float
+        Time of movement, 1/2 period equal pi/B
+
     Methods
     -------
     u(t)
@@ -19,6 +28,9 @@ class Motion:
         Return imposed velocity at time t
     a(t)
         Return imposed accelration at time t
+    history(time)
+        Return imposed velocity and acceleration at every time with only
+        1/2 period of movement
     """
 
     def __init__(self, A, B):
@@ -33,64 +45,395 @@ class Motion:
 
         self.A = A
         self.B = B
+        self.duration = (1.0 * np.pi) / B
 
     def u(self, t, tol=1e-14):
         """Return imposed displacement at time t
 
         Parameters
         ----------
-        t : float
+        t : float or Numpy array
             Time
         tol : float
             Tolerance (default is 1e-14)
 
         Returns
         -------
-        u : float
+        u : float or Numpy array
             Imposed displacement
         """
 
+        t = np.asarray(t, dtype=float)
         u = -(self.A * (np.sin(2 * self.B * t) - 2 * self.B * t))
         u *= 1 / (4 * self.B)
-        if abs(u) < tol: u = 0.0
-        return u
+        return _clip(u, tol)
 
     def v(self, t, tol=1e-14):
         """Return imposed velocity at time t
 
         Parameters
         ----------
-        t : float
+        t : float or Numpy array
             Time
         tol : float
             Tolerance (default is 1e-14)
 
         Returns
         -------
-        v : float
+        v : float or Numpy array
             Imposed velocity
         """
 
+        t = np.asarray(t, dtype=float)
         v = self.A * np.sin(self.B * t) * np.sin(self.B * t)
-        if abs(v) < tol: v = 0.0
-        return v
+        return _clip(v, tol)
 
     def a(self, t, tol=1e-14):
         """Return imposed acceleration at time t
 
         Parameters
         ----------
-        t : float
+        t : float or Numpy array
             Time
         tol : float
             Tolerance (default is 1e-14)
 
         Returns
         -------
-        a : float
+        a : float or Numpy array
             Imposed acceleration
         """
 
+        t = np.asarray(t, dtype=float)
         a = 2 * self.A * self.B * np.sin(self.B * t) * np.cos(self.B * t)
-        if abs(a) < tol: a = 0.0
-        return a
\ No newline at end of file
+        return _clip(a, tol)
+
+    def history(self, time):
+        """Return imposed velocity and acceleration at every time with only
+        1/2 period of movement
+
+        Parameters
+        ----------
+        time : Numpy array
+            Numpy array [steps] for time of each step
+
+        Returns
+        -------
+        v_hat : Numpy array
+            Numpy array [steps] for imposed velocity (zero after `duration`)
+        a_hat : Numpy array
+            Numpy array [steps] for imposed acceleration (zero after
+            `duration`)
+        """
+
+        time = np.asarray(time, dtype=float)
+        on = time <= self.duration
+        return (np.where(on, self.v(time), 0.0),
+                np.where(on, self.a(time), 0.0))
+
+
+class RecordedMotion(Motion):
+    """Child class for imposed motion from a recorded accelerogram
+
+    The record is loaded once (see `loadRecord`), its velocity is found by
+    trapezoidal integration and baseline corrected, and every method then
+    resamples the record to any times by linear interpolation. Velocity and
+    acceleration are zero before the record starts and after it ends (the
+    baseline correction brings the velocity to rest at the end, so the base
+    sees no step), and displacement is held at its final value.
+
+    Attributes
+    ----------
+    fname : str
+        Record file name (None for a record given as arrays)
+    scale : float
+        Factor applied to recorded acceleration (e.g. 9.81 for records in g)
+    time : Numpy array
+        Numpy array [samples] for record time starting at zero [s]
+    acc : Numpy array
+        Numpy array [samples] for baseline corrected acceleration
+    vel : Numpy array
+        Numpy array [samples] for baseline corrected velocity
+    disp : Numpy array
+        Numpy array [samples] for displacement
+    duration : float
+        Record length [s]
+
+    Methods
+    -------
+    u(t)
+        Return imposed displacement at time t
+    v(t)
+        Return imposed velocity at time t
+    a(t)
+        Return imposed accelration at time t
+    history(time)
+        Return imposed velocity and acceleration at every time
+    """
+
+    def __init__(self, record, dt=None, scale=1.0, order=1):
+        """
+        Parameters
+        ----------
+        record : str or tuple
+            Record file name (`.AT2` or `.csv`, see `loadRecord`) or tuple of
+            Numpy arrays `(time, acc)`
+        dt : float
+            Sample interval [s] of single column records (default is None)
+        scale : float
+            Factor applied to recorded acceleration (default is 1.0)
+        order : int
+            Order of polynomial removed from velocity as baseline
+            correction, fitted by least squares with the velocity at the
+            end of the record brought to zero (default is 1 for a linear
+            drift, None or 0 for no correction)
+        """
+
+        if isinstance(record, str):
+            self.fname = record
+            time, acc = loadRecord(record, dt)
+        else:
+            self.fname = None
+            time, acc = (np.asarray(x, dtype=float) for x in record)
+        self.scale = scale
+
+        # Velocity by trapezoidal integration
+        self.time = time - time[0]
+        acc = scale * acc
+        vel = _integrate(self.time, acc)
+
+        # Remove polynomial trend of velocity and its derivative from
+        # acceleration. In normalized time s = t / T the trend is
+        # vel[-1] * s plus a least squares fit of terms s^k - s (k >= 2),
+        # so it starts at rest and ends at vel[-1], leaving the corrected
+        # velocity zero at both ends of the record.
+        if (order != None) and (order > 0):
+            s = self.time / self.time[-1]
+            trend = vel[-1] * s
+            slope = np.full(len(s), vel[-1])
+            if order > 1:
+                powers = np.arange(2, order + 1)
+                basis = s[:, None] ** powers - s[:, None]
+                coef = np.linalg.lstsq(basis, vel - trend, rcond=None)[0]
+                trend = trend + basis @ coef
+                slope = slope + (powers * s[:, None] ** (powers - 1)
+                                 - 1.0) @ coef
+            vel = vel - trend
+            acc = acc - slope / self.time[-1]
+
+        self.acc = acc
+        self.vel = vel
+        self.disp = _integrate(self.time, vel)
+        self.duration = self.time[-1]
+
+    def _resample(self, record, t, tol):
+        """Return record linearly interpolated at t (zero outside record)"""
+
+        t = np.asarray(t, dtype=float)
+        x = np.interp(t, self.time, record, left=0.0, right=0.0)
+        return _clip(x, tol)
+
+    def u(self, t, tol=1e-14):
+        """Return imposed displacement at time t
+
+        Parameters
+        ----------
+        t : float or Numpy array
+            Time
+        tol : float
+            Tolerance (default is 1e-14)
+
+        Returns
+        -------
+        u : float or Numpy array
+            Imposed displacement (held at final value after the record ends)
+        """
+
+        t = np.asarray(t, dtype=float)
+        u = np.interp(t, self.time, self.disp, left=0.0)
+        return _clip(u, tol)
+
+    def v(self, t, tol=1e-14):
+        """Return imposed velocity at time t
+
+        Parameters
+        ----------
+        t : float or Numpy array
+            Time
+        tol : float
+            Tolerance (default is 1e-14)
+
+        Returns
+        -------
+        v : float or Numpy array
+            Imposed velocity
+        """
+
+        return self._resample(self.vel, t, tol)
+
+    def a(self, t, tol=1e-14):
+        """Return imposed acceleration at time t
+
+        Parameters
+        ----------
+        t : float or Numpy array
+            Time
+        tol : float
+            Tolerance (default is 1e-14)
+
+        Returns
+        -------
+        a : float or Numpy array
+            Imposed acceleration
+        """
+
+        return self._resample(self.acc, t, tol)
+
+
+def fromInputs(sim):
+    """Return base motion from simulation inputs
+
+    Parameters
+    ----------
+    sim : dict
+        Dictionary of simulation settings with either `'motion'` (record
+        file name) and optional `'motion_dt'`, `'motion_scale'`, and
+        `'baseline'`, or `'A'` and `'B'` for the analytic pulse
+
+    Returns
+    -------
+    base_motion : Motion object
+        Imposed base motion
+    """
+
+    if sim.get('motion') == None:
+        return Motion(sim['A'], sim['B'])
+
+    scale = sim['motion_scale'] if (sim.get('motion_scale') != None) else 1.0
+    order = sim['baseline'] if ('baseline' in sim) else 1
+    return RecordedMotion(sim['motion'], sim.get('motion_dt'), scale, order)
+
+
+def loadRecord(fname, dt=None):
+    """Return time and acceleration of a recorded accelerogram
+
+    Parsed records are cached by file name and modification time, so a
+    library of records is parsed once per process however many runs use it.
+
+    Supported files are PEER `.AT2` files (NPTS and DT read from the
+    header) and `.csv` (or other text) files with either `time, acc`
+    columns or a single `acc` column sampled every `dt`. Header and comment
+    lines, and numeric header lines before the data rows, are skipped.
+
+    Parameters
+    ----------
+    fname : str
+        Record file name
+    dt : float
+        Sample interval [s] of single column records (default is None)
+
+    Returns
+    -------
+    time : Numpy array
+        Numpy array [samples] for time [s] (read only)
+    acc : Numpy array
+        Numpy array [samples] for acceleration in record units (read only)
+
+    Raises
+    ------
+    ValueError
+        If the record has no time column and no `dt` is known, or its data
+        rows have different numbers of values
+    """
+
+    fname = os.path.abspath(fname)
+    return _loadRecord(fname, os.path.getmtime(fname), dt)
+
+
+@functools.lru_cache(maxsize=256)
+def _loadRecord(fname, mtime, dt):
+    """Parse record file (cached on file name, modification time, and dt)"""
+
+    if fname.upper().endswith('.AT2'):
+        time, acc = _readAT2(fname)
+    else:
+        time, acc = _readColumns(fname, dt)
+
+    # Cached arrays are shared by every caller
+    time.flags.writeable = False
+    acc.flags.writeable = False
+
+    return time, acc
+
+
+def _readAT2(fname):
+    """Return time and acceleration from PEER `.AT2` file"""
+
+    with open(fname) as f:
+        header = [f.readline() for _ in range(4)]
+        values = np.array(f.read().split(), dtype=float)
+
+    # Header line looks like "NPTS=  7990, DT=   .0050 SEC" in newer files
+    # and "7990   .0050   NPTS, DT" in older ones
+    line = header[3]
+    npts = re.search(r'NPTS\s*=\s*(\d+)', line, re.I)
+    dt = re.search(r'DT\s*=\s*([-+.\dEe]+)', line, re.I)
+    if npts and dt:
+        npts, dt = int(npts.group(1)), float(dt.group(1))
+    else:
+        numbers = re.findall(r'[-+]?\d*\.?\d+(?:[Ee][-+]?\d+)?', line)
+        npts, dt = int(float(numbers[0])), float(numbers[1])
+
+    acc = values[:npts]
+    return dt * np.arange(len(acc)), acc
+
+
+def _readColumns(fname, dt):
+    """Return time and acceleration from comma or space separated columns"""
+
+    rows = []
+    with open(fname) as f:
+        for line in f:
+            fields = line.replace(',', ' ').split()
+            try:
+                row = [float(x) for x in fields]
+            except ValueError:
+                continue
+            if row:
+                rows += [row]
+    if not rows:
+        raise ValueError(f'record {fname} holds no numeric rows')
+
+    # Data rows share the most common number of columns, numeric header
+    # lines (e.g. a sample count) before them are skipped
+    counts = [len(row) for row in rows]
+    width = max(set(counts), key=counts.count)
+    first = counts.index(width)
+    if any(count != width for count in counts[first:]):
+        raise ValueError(f'record {fname} has rows of {sorted(set(counts))} '
+                         f'values, use one value or one time, acc pair per '
+                         f'line')
+    data = np.array(rows[first:])
+
+    if width >= 2:
+        return data[:, 0].copy(), data[:, 1].copy()
+    if dt == None:
+        raise ValueError(f'record {fname} has no time column, set its dt')
+    acc = data[:, 0].copy()
+    return dt * np.arange(len(acc)), acc
+
+
+def _integrate(time, x):
+    """Return cumulative trapezoidal integral of x starting at zero"""
+
+    out = np.zeros(len(x))
+    np.cumsum(0.5 * np.diff(time) * (x[1:] + x[:-1]), out=out[1:])
+    return out
+
+
+def _clip(x, tol):
+    """Return `x` with values below `tol` in magnitude set to zero (float
+    for scalar `x`)"""
+
+    x = np.where(np.abs(x) < tol, 0.0, x)
+    return float(x) if (x.ndim == 0) else x
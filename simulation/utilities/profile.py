@@ -0,0 +1,139 @@
+import numpy as np
+
+
+class Profile:
+    """Layered soil column discretized into two node elements
+
+    Layers are listed from the top (surface) down, matching the node order
+    of the global matrices where node 0 is the surface and the last node is
+    the base.
+
+    Attributes
+    ----------
+    layers : list
+        List of layer dictionaries with `'h'`, `'vs'`, `'rho'`, and optional
+        `'h_elem'`
+    h : float
+        Height of total column [m]
+    num_elem : int
+        Number of elements
+    num_nodes : int
+        Number of nodes
+    h_elem : Numpy array
+        Numpy array [num_elem] for height of each element [m]
+    vs : Numpy array
+        Numpy array [num_elem] for shear wave velocity of each element [m/s]
+    rho : Numpy array
+        Numpy array [num_elem] for mass density of each element [kg/m3]
+    layer : Numpy array
+        Numpy array [num_elem] for layer index of each element
+    depth : Numpy array
+        Numpy array [num_nodes] for depth of each node below surface [m]
+
+    Methods
+    -------
+    out()
+        Print layer and mesh summary to terminal
+    """
+
+    def __init__(self, layers, f_max=None, ppw=10.0, h_elem=1.0):
+        """
+        Parameters
+        ----------
+        layers : list
+            List of layer dictionaries from the top down:
+            `'h'`: Thickness of layer [m]
+            `'vs'`: Shear wave velocity [m/s]
+            `'rho'`: Mass density [kg/m3]
+            `'h_elem'`: Height of element in layer [m] (optional)
+        f_max : float
+            Highest frequency to resolve [Hz] (default is None to use
+            `h_elem` for layers without their own element height)
+        ppw : float
+            Target number of nodes per shortest wavelength `vs / f_max`
+            (default is 10.0)
+        h_elem : float
+            Height of element [m] for layers without their own element height
+            when `f_max` is None (default is 1.0)
+        """
+
+        self.layers = layers
+
+        # Element height per layer (coarsest that meets points per wavelength)
+        h_elem_layer = []
+        num_elem_layer = []
+        for layer in layers:
+            if layer.get('h_elem') != None:
+                h_max = layer['h_elem']
+            elif f_max != None:
+                h_max = layer['vs'] / (f_max * ppw)
+            else:
+                h_max = h_elem
+            n = max(1, int(np.ceil(layer['h'] / h_max - 1e-9)))
+            num_elem_layer += [n]
+            h_elem_layer += [layer['h'] / n]
+
+        # Per element arrays
+        num_elem_layer = np.array(num_elem_layer)
+        self.layer = np.repeat(np.arange(len(layers)), num_elem_layer)
+        self.h_elem = np.array(h_elem_layer)[self.layer]
+        vs = np.array([layer['vs'] for layer in layers], dtype=float)
+        rho = np.array([layer['rho'] for layer in layers], dtype=float)
+        self.vs = vs[self.layer]
+        self.rho = rho[self.layer]
+
+        # Mesh sizes and node depths
+        self.num_elem = int(num_elem_layer.sum())
+        self.num_nodes = self.num_elem + 1
+        self.depth = np.concatenate(([0.0], np.cumsum(self.h_elem)))
+        self.h = self.depth[-1]
+
+    def out(self):
+        """Print layer and mesh summary to terminal
+
+        Parameters
+        ----------
+        None
+        """
+
+        print(f'\n{"Soil Profile" : ^70}')
+        print('-' * 70)
+        print(f'{"layer":>6}{"h [m]":>12}{"vs [m/s]":>12}{"rho [kg/m3]":>14}'
+              f'{"elements":>10}{"h_elem [m]":>14}')
+        for i, layer in enumerate(self.layers):
+            mask = self.layer == i
+            print(f'{i:>6d}{layer["h"]:>12.3f}{layer["vs"]:>12.2f}'
+                  f'{layer["rho"]:>14.1f}{np.count_nonzero(mask):>10d}'
+                  f'{self.h_elem[mask][0]:>14.4f}')
+        print(f'\nTotal height {self.h:.3f} m, {self.num_nodes} nodes\n')
+
+
+def fromInputs(params, sim):
+    """Return profile from simulation inputs
+
+    Parameters
+    ----------
+    params : dict
+        Dictionary of material parameters with either a `'layers'` list or
+        uniform `'vs'` and `'rho'`
+    sim : dict
+        Dictionary of simulation settings with `'h'` (uniform column only)
+        and optional `'h_elem'`, `'f_max'`, and `'ppw'`
+
+    Returns
+    -------
+    prof : Profile object
+        Discretized soil column
+    """
+
+    # Uniform column is a single layer
+    if params.get('layers') != None:
+        layers = params['layers']
+    else:
+        layers = [{'h': sim['h'], 'vs': params['vs'], 'rho': params['rho']}]
+
+    f_max = sim.get('f_max')
+    ppw = sim['ppw'] if (sim.get('ppw') != None) else 10.0
+    h_elem = sim['h_elem'] if (sim.get('h_elem') != None) else 1.0
+
+    return Profile(layers, f_max, ppw, h_elem)
@@ -0,0 +1,357 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+# Settings that only change where or how outputs are written, not results
+IGNORED = ('name', 'print_flag', 'profile', 'checkpoint', 'restart', 'chunk',
+           'cache_dir', 'results', 'results_size')
+
+# Files of an output directory describing the run rather than its results,
+# rewritten from the inputs of each run reusing an entry
+UNCACHED = ('profile.json', 'checkpoint.npz', 'saveParams.txt', 'saveSim.txt',
+            'saveTime.txt', 'meta.json')
+
+# Solver packages and modules whose source shapes the outputs, relative to
+# the `simulation` directory (drivers such as `main.py` are left out)
+SOURCES = ('arrays', 'frequency', 'modal', 'newmark', 'solve.py',
+           'utilities/motion.py', 'utilities/profile.py', 'utilities/save.py',
+           'utilities/sink.py')
+
+# File recording the key of finished results in an output directory
+MARKER = 'saveKey.txt'
+
+# Copy of the run metadata kept in each entry, so a run reusing the entry
+# knows its time stepping without assembling (entry files starting with a
+# dot are never linked into output directories)
+META = '.meta.json'
+
+# Source hash of this process
+_version = None
+
+
+class ResultCache:
+    """Content addressed cache of finished output directories
+
+    Entries are keyed by a hash of the material parameters, the simulation
+    settings, the bytes of any recorded motion, and the source of the
+    solver (see `key`), so any run with the same inputs on the same code
+    can reuse the outputs of another. Entries are directories of hard links
+    to the output files (copies across file systems), so storing and
+    reusing an entry costs no more than listing its files. Least recently
+    used entries are evicted once the cache outgrows `maxsize` bytes.
+
+    Attributes
+    ----------
+    path : str
+        Cache directory
+    maxsize : float
+        Largest total size of entries [bytes]
+
+    Methods
+    -------
+    get(key, dst, copy=())
+        Copy outputs of entry `key` to directory `dst` if cached
+    meta(key)
+        Return run metadata stored with entry `key`
+    put(key, src)
+        Store outputs of directory `src` as entry `key`
+    evict()
+        Remove least recently used entries until within `maxsize`
+    """
+
+    def __init__(self, path, maxsize=10 * 2**30):
+        """
+        Parameters
+        ----------
+        path : str
+            Cache directory
+        maxsize : float
+            Largest total size of entries [bytes] (default is 10 GiB)
+        """
+
+        self.path = path
+        self.maxsize = maxsize
+        os.makedirs(path, exist_ok=True)
+
+    def get(self, key, dst, copy=()):
+        """Copy outputs of entry `key` to directory `dst` if cached
+
+        Entries hold no files in `UNCACHED`, which the caller writes for its
+        own run.
+
+        Parameters
+        ----------
+        key : str
+            Entry key (see `key`)
+        dst : str
+            Output directory, must not exist
+        copy : tuple
+            Names of files or directories in the entry copied rather than
+            linked, because the caller modifies them (default is none)
+
+        Returns
+        -------
+        hit : bool
+            True if `dst` now holds the outputs of the entry
+        """
+
+        entry = os.path.join(self.path, key)
+        if not os.path.isdir(entry):
+            return False
+
+        # An entry evicted while linking is a miss
+        try:
+            _link(entry, dst, copy=copy)
+            os.utime(entry)
+        except OSError:
+            shutil.rmtree(dst, ignore_errors=True)
+            return False
+
+        return True
+
+    def meta(self, key):
+        """Return run metadata stored with entry `key`
+
+        Parameters
+        ----------
+        key : str
+            Entry key (see `key`)
+
+        Returns
+        -------
+        meta : dict
+            Dictionary of metadata of the run that stored the entry (None if
+            the entry is not cached)
+        """
+
+        try:
+            with open(os.path.join(self.path, key, META)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, src):
+        """Store outputs of directory `src` as entry `key`
+
+        The entry is built aside and renamed into place, so concurrent
+        runs never see part of an entry.
+
+        Parameters
+        ----------
+        key : str
+            Entry key (see `key`)
+        src : str
+            Output directory of a finished run
+        """
+
+        entry = os.path.join(self.path, key)
+        if os.path.isdir(entry):
+            os.utime(entry)
+            return
+
+        tmp = os.path.join(self.path, f'.{key}.{os.getpid()}.tmp')
+        size = _link(src, tmp, UNCACHED)
+        meta = os.path.join(src, 'meta.json')
+        if os.path.exists(meta):
+            shutil.copy2(meta, os.path.join(tmp, META))
+        with open(os.path.join(tmp, '.size'), 'w') as f:
+            f.write(str(size))
+        try:
+            os.rename(tmp, entry)
+        except OSError:
+            # Stored by another run in the meantime
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        """Remove least recently used entries until within `maxsize`"""
+
+        entries = []
+        for item in os.scandir(self.path):
+            if item.name.startswith('.') or not item.is_dir():
+                continue
+            try:
+                with open(os.path.join(item.path, '.size')) as f:
+                    size = int(f.read())
+                entries += [(item.stat().st_mtime, size, item.path)]
+            except (OSError, ValueError):
+                continue
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.maxsize:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def key(params, sim):
+    """Return hash key of the results of a run
+
+    Parameters
+    ----------
+    params : dict
+        Dictionary of material parameters (see `solve.solve`)
+    sim : dict
+        Dictionary of simulation settings (see `solve.solve`), settings in
+        `IGNORED` are left out and a `'motion'` file is hashed by content
+        rather than name
+
+    Returns
+    -------
+    key : str
+        Hex digest of the inputs, the recorded motion, and `version()`
+    """
+
+    record = sim.get('motion')
+    sim = {name: value for name, value in sim.items()
+           if name not in IGNORED + ('motion',)}
+
+    h = hashlib.sha256()
+    h.update(json.dumps([canonical(params), canonical(sim)],
+                        sort_keys=True).encode())
+    if record != None:
+        with open(record, 'rb') as f:
+            for block in iter(lambda: f.read(2**20), b''):
+                h.update(block)
+    h.update(version().encode())
+
+    return h.hexdigest()
+
+
+def mark(path, key):
+    """Record that the output directory `path` holds finished results of
+    `key`
+
+    Parameters
+    ----------
+    path : str
+        Output directory
+    key : str
+        Hash key of the run (see `key`)
+    """
+
+    with open(os.path.join(path, MARKER), 'w') as f:
+        f.write(key)
+
+
+def marked(path):
+    """Return key of the finished results in output directory `path`
+
+    Parameters
+    ----------
+    path : str
+        Output directory
+
+    Returns
+    -------
+    key : str
+        Hash key recorded by `mark` (None if the directory holds no finished
+        results)
+    """
+
+    try:
+        with open(os.path.join(path, MARKER)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def canonical(obj):
+    """Return JSON friendly copy of `obj` with numbers as floats
+
+    Integers and floats of equal value (and Numpy scalars and arrays) give
+    the same JSON text, so `1` and `1.0` hash alike.
+
+    Parameters
+    ----------
+    obj : object
+        Nested dictionaries, lists, tuples, strings, and numbers
+
+    Returns
+    -------
+    obj : object
+        Nested dictionaries, lists, strings, booleans, None, and floats
+    """
+
+    if isinstance(obj, dict):
+        return {str(k): canonical(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple, np.ndarray)):
+        return [canonical(v) for v in obj]
+    if isinstance(obj, (bool, np.bool_)) or (obj is None):
+        return None if (obj is None) else bool(obj)
+    if isinstance(obj, (int, float, np.number)):
+        return float(obj)
+    return str(obj)
+
+
+def version():
+    """Return hash of the solver source
+
+    The `.py` files of `SOURCES` are hashed once per process, so any change
+    of the solver invalidates cached results, while editing run drivers
+    such as `main.py` or `sweep.py` does not.
+
+    Returns
+    -------
+    version : str
+        Hex digest
+    """
+
+    global _version
+    if _version is None:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        fnames = []
+        for source in SOURCES:
+            path = os.path.join(root, *source.split('/'))
+            if os.path.isfile(path):
+                fnames += [path]
+                continue
+            for folder, dirs, files in os.walk(path):
+                dirs[:] = [d for d in dirs if d != '__pycache__']
+                fnames += [os.path.join(folder, name) for name in files
+                           if name.endswith('.py')]
+
+        h = hashlib.sha256()
+        for fname in sorted(fnames):
+            h.update(os.path.relpath(fname, root).encode())
+            with open(fname, 'rb') as f:
+                h.update(f.read())
+        _version = h.hexdigest()
+
+    return _version
+
+
+def _link(src, dst, skip=(), copy=()):
+    """Hard link (or copy) the tree `src` to the new directory `dst` and
+    return its size [bytes]
+
+    Top level files in `skip` or starting with a dot (entry bookkeeping)
+    are left out and top level files or directories in `copy` are
+    copied."""
+
+    size = 0
+    for folder, dirs, files in os.walk(src):
+        rel = os.path.relpath(folder, src)
+        out = os.path.join(dst, rel)
+        os.makedirs(out)
+        top = rel.split(os.sep)[0]
+        for name in files:
+            if (rel == '.') and ((name in skip) or name.startswith('.')):
+                continue
+            fname = os.path.join(folder, name)
+            target = os.path.join(out, name)
+            if (top in copy) or ((rel == '.') and (name in copy)):
+                shutil.copy2(fname, target)
+            else:
+                try:
+                    os.link(fname, target)
+                except OSError:
+                    shutil.copy2(fname, target)
+            size += os.path.getsize(fname)
+
+    return size
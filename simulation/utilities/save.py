@@ -1,7 +1,45 @@
+import json
+import os
+
 import numpy as np
 
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+FORMATS = ('txt', 'npy', 'npz', 'h5', 'zarr')
+
+
+def dataFile(name, fmt='txt'):
+    """Return file name holding simulation data
+
+    Parameters
+    ----------
+    name : str
+        Data name (`'disp'`, `'vel'`, or `'acc'`)
+    fmt : str
+        Output format (default is `'txt'`)
+
+    Returns
+    -------
+    fname : str
+        File name (one shared file for `'h5'` and `'zarr'`)
+    """
+
+    if fmt == 'h5':
+        return 'data.h5'
+    if fmt == 'zarr':
+        return 'data.zarr'
+    return f'{name}Data.{fmt}'
+
 
-def saveData(df, name):
+def saveData(df, name, path='.', fmt='txt'):
     """Save simulation data
 
     Parameters
@@ -10,23 +48,59 @@ def saveData(df, name):
         Numpy array [dim x steps]
     name : str
         File name
+    path : str
+        Output directory (default is current directory)
+    fmt : str
+        `'txt'`, `'npy'`, `'npz'` (compressed), `'h5'` (HDF5), or `'zarr'`;
+        `'h5'` and `'zarr'` store every name as a chunked, compressed array
+        in one shared file (default is `'txt'`)
 
     Returns
     -------
     None
     """
 
-    fname = f'{name}Data.txt'
-    np.savetxt(fname, df, fmt='%.12f', delimiter=' ')
+    fname = os.path.join(path, dataFile(name, fmt))
+
+    if fmt == 'txt':
+        np.savetxt(fname, df, fmt='%.12f', delimiter=' ')
+
+    elif fmt == 'npy':
+        np.save(fname, np.ascontiguousarray(df))
+
+    elif fmt == 'npz':
+        np.savez_compressed(fname, data=df)
+
+    elif fmt == 'h5':
+        if h5py is None:
+            raise ImportError('h5 output requires h5py')
+        with h5py.File(fname, 'a') as f:
+            if name in f:
+                del f[name]
+            f.create_dataset(name, data=df, chunks=_chunks(df.shape),
+                             compression='gzip', compression_opts=4,
+                             shuffle=True)
+
+    elif fmt == 'zarr':
+        if zarr is None:
+            raise ImportError('zarr output requires zarr')
+        group = zarr.open_group(fname, mode='a')
+        create = getattr(group, 'create_array', None) or group.create_dataset
+        create(name, data=df, chunks=_chunks(df.shape), overwrite=True)
 
+    else:
+        raise ValueError(f'unknown format {fmt!r}, use one of {FORMATS}')
 
-def saveDicts(d):
+
+def saveDicts(d, path='.'):
     """Save dictionary as text file
 
     Parameters
     ----------
     d : dict
         Dictionary of dictionaries with various input settings
+    path : str
+        Output directory (default is current directory)
 
     Returns
     -------
@@ -35,7 +109,78 @@ def saveDicts(d):
 
     for key in d:
 
-        fname = f'save{key}.txt'
+        fname = os.path.join(path, f'save{key}.txt')
         f = open(fname, 'w')
         f.write(str(d[key]))
-        f.close()
\ No newline at end of file
+        f.close()
+
+
+def saveMeta(meta, path='.'):
+    """Save run metadata as JSON next to the data
+
+    Metadata is written to `meta.json` and, for `'h5'` and `'zarr'` output,
+    also attached to the shared data file as the `'meta'` attribute.
+
+    Parameters
+    ----------
+    meta : dict
+        Run metadata with at least `'format'`
+    path : str
+        Output directory (default is current directory)
+
+    Returns
+    -------
+    None
+    """
+
+    text = json.dumps(meta, indent=2, default=_jsonable)
+    with open(os.path.join(path, 'meta.json'), 'w') as f:
+        f.write(text)
+
+    fmt = meta.get('format', 'txt')
+    fname = os.path.join(path, dataFile(None, fmt))
+    if fmt == 'h5':
+        with h5py.File(fname, 'a') as f:
+            f.attrs['meta'] = text
+    elif fmt == 'zarr':
+        zarr.open_group(fname, mode='a').attrs['meta'] = text
+
+
+def saveProfile(report, path='.'):
+    """Save timing report of a run as JSON next to the data
+
+    Parameters
+    ----------
+    report : dict
+        Timing report (see `timing.Profiler.report`)
+    path : str
+        Output directory (default is current directory)
+
+    Returns
+    -------
+    None
+    """
+
+    with open(os.path.join(path, 'profile.json'), 'w') as f:
+        f.write(json.dumps(report, indent=2, default=_jsonable))
+
+
+def _chunks(shape, nodes=64, steps=1024):
+    """Return chunk shape of blocks of nodes and time steps
+
+    Chunks stay near half a megabyte however long the column, so reading a
+    few nodes decompresses only their blocks, and match the blocks of the
+    integrator so each written block fills whole chunks."""
+
+    return ((max(1, min(shape[0], nodes)),) + tuple(shape[1:-1])
+            + (max(1, min(shape[-1], steps)),))
+
+
+def _jsonable(obj):
+    """Return JSON friendly version of Numpy values"""
+
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
@@ -0,0 +1,644 @@
+import os
+import zipfile
+
+import numpy as np
+
+import utilities.save as save
+
+try:
+    import h5py
+except ImportError:
+    h5py = None
+
+try:
+    import zarr
+except ImportError:
+    zarr = None
+
+NAMES = ('disp', 'vel', 'acc')
+
+
+class Sink:
+    """Parent class for destinations of streamed nodal histories
+
+    The integrator opens a sink with the shape of the whole run, then writes
+    blocks of consecutive time steps (time on the last axis) as they are
+    computed, and closes it at the end.
+
+    Attributes
+    ----------
+    shape : tuple
+        Shape of whole histories, nodal shape + (steps + 1,)
+    count : int
+        Number of time steps written so far
+
+    Methods
+    -------
+    open(shape)
+        Prepare storage for histories of `shape`
+    write(*arrays)
+        Append a block of time steps
+    close()
+        Finish writing and return result
+    state()
+        Return in memory state needed to resume writing
+    resume(shape, count, state)
+        Continue writing histories after `count` time steps
+    """
+
+    def __init__(self):
+        self.shape = None
+        self.count = 0
+
+    def open(self, shape):
+        """Prepare storage for histories of `shape`
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of whole histories, nodal shape + (steps + 1,)
+        """
+
+        self.shape = tuple(shape)
+        self.count = 0
+
+    def write(self, *arrays):
+        """Append a block of time steps
+
+        Parameters
+        ----------
+        *arrays : Numpy array
+            Numpy arrays [nodal shape x n], one per quantity (nodal
+            displacement, velocity, and acceleration from the integrator)
+        """
+
+        n = arrays[0].shape[-1]
+        if self.count + n > self.shape[-1]:
+            raise ValueError('more time steps written than sink was opened '
+                             'for')
+        self.store(slice(self.count, self.count + n), arrays)
+        self.count += n
+
+    def store(self, cols, arrays):
+        """Store arrays in time step slice `cols` (implemented by children)"""
+
+        raise NotImplementedError
+
+    def state(self):
+        """Return in memory state needed to resume writing
+
+        Returns
+        -------
+        state : dict
+            Dictionary of Numpy arrays (empty for sinks keeping nothing
+            between blocks)
+        """
+
+        return {}
+
+    def resume(self, shape, count, state):
+        """Continue writing histories after `count` time steps
+
+        Used instead of `open` to append to histories written by an earlier
+        run that stopped after `count` time steps.
+
+        Parameters
+        ----------
+        shape : tuple
+            Shape of whole histories, nodal shape + (steps + 1,)
+        count : int
+            Number of time steps already written
+        state : dict
+            Dictionary from `state` when the `count` steps were written
+        """
+
+        self.shape = tuple(shape)
+        self.count = count
+
+    def close(self):
+        """Finish writing and return result
+
+        Returns
+        -------
+        result : object
+            Sink dependent result
+        """
+
+        return None
+
+
+class FileSink(Sink):
+    """Sink writing histories straight to disk in any output format
+
+    `'npy'`, `'h5'`, and `'zarr'` data is written in place as blocks
+    arrive, so a run stopped early keeps every finished block. `'txt'` and
+    `'npz'` cannot be appended along time, so blocks go to a memory mapped
+    scratch `.npy` file that is converted one node at a time on `close`.
+
+    Attributes
+    ----------
+    path : str
+        Output directory
+    fmt : str
+        Output format (see `save.saveData`)
+    names : tuple
+        Data names of written arrays in order
+    """
+
+    def __init__(self, path='.', fmt='txt', names=NAMES):
+        """
+        Parameters
+        ----------
+        path : str
+            Output directory (default is current directory)
+        fmt : str
+            Output format (default is `'txt'`)
+        names : tuple
+            Data names of written arrays in order (default is
+            `('disp', 'vel', 'acc')`)
+        """
+
+        super().__init__()
+        if fmt not in save.FORMATS:
+            raise ValueError(f'unknown format {fmt!r}, use one of '
+                             f'{save.FORMATS}')
+        self.path = path
+        self.fmt = fmt
+        self.names = tuple(names)
+        self._out = []
+        self._file = None
+
+    def open(self, shape):
+        super().open(shape)
+        self._out = [self._create(name) for name in self.names]
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        self._out = [self._reopen(name) for name in self.names]
+
+    def _create(self, name):
+        """Return writable array of whole history for `name`"""
+
+        fname = os.path.join(self.path, save.dataFile(name, self.fmt))
+
+        if self.fmt == 'h5':
+            if h5py is None:
+                raise ImportError('h5 output requires h5py')
+            if self._file is None:
+                self._file = h5py.File(fname, 'a')
+            if name in self._file:
+                del self._file[name]
+            return self._file.create_dataset(
+                name, shape=self.shape, dtype=float,
+                chunks=save._chunks(self.shape), compression='gzip',
+                compression_opts=4, shuffle=True)
+
+        if self.fmt == 'zarr':
+            if zarr is None:
+                raise ImportError('zarr output requires zarr')
+            if self._file is None:
+                self._file = zarr.open_group(fname, mode='a')
+            create = (getattr(self._file, 'create_array', None)
+                      or self._file.create_dataset)
+            return create(name, shape=self.shape, dtype=float,
+                          chunks=save._chunks(self.shape), overwrite=True)
+
+        if self.fmt != 'npy':
+            fname = self._scratch(name)
+        return np.lib.format.open_memmap(fname, mode='w+', dtype=float,
+                                         shape=self.shape)
+
+    def _reopen(self, name):
+        """Return existing writable array of whole history for `name`"""
+
+        fname = os.path.join(self.path, save.dataFile(name, self.fmt))
+
+        if self.fmt == 'h5':
+            if h5py is None:
+                raise ImportError('h5 output requires h5py')
+            if self._file is None:
+                self._file = h5py.File(fname, 'a')
+            out = self._file[name]
+        elif self.fmt == 'zarr':
+            if zarr is None:
+                raise ImportError('zarr output requires zarr')
+            if self._file is None:
+                self._file = zarr.open_group(fname, mode='a')
+            out = self._file[name]
+        else:
+            if self.fmt != 'npy':
+                fname = self._scratch(name)
+            out = np.lib.format.open_memmap(fname, mode='r+')
+
+        if tuple(out.shape) != self.shape:
+            raise ValueError(f'cannot resume {name} data of shape '
+                             f'{tuple(out.shape)} as shape {self.shape}')
+        return out
+
+    def _scratch(self, name):
+        """Return scratch file name for formats converted on close"""
+
+        return os.path.join(self.path, f'.{name}Data.tmp.npy')
+
+    def store(self, cols, arrays):
+        for out, block in zip(self._out, arrays):
+            out[..., cols] = block
+        self.flush()
+
+    def flush(self):
+        """Push written blocks to disk"""
+
+        if self.fmt == 'h5':
+            self._file.flush()
+        elif self.fmt != 'zarr':
+            for out in self._out:
+                out.flush()
+
+    def close(self):
+        """Finish files and return their names
+
+        Returns
+        -------
+        fnames : list
+            List of written file names
+        """
+
+        fnames = [os.path.join(self.path, save.dataFile(name, self.fmt))
+                  for name in self.names]
+
+        if self.fmt == 'h5':
+            self._file.close()
+        elif self.fmt in ('txt', 'npz'):
+            for out, fname in zip(self._out, fnames):
+                if self.fmt == 'txt':
+                    _writeText(out, fname)
+                else:
+                    _writeCompressed(out, fname)
+
+        # Release memory maps before removing scratch files
+        self._out = []
+        self._file = None
+        if self.fmt in ('txt', 'npz'):
+            for name in self.names:
+                os.remove(self._scratch(name))
+
+        return list(dict.fromkeys(fnames))
+
+
+class BatchSink(Sink):
+    """Sink splitting batch histories [dim x N x steps] into one sink per
+    case
+
+    Attributes
+    ----------
+    sinks : list
+        List of N sinks receiving [dim x steps] histories
+    """
+
+    def __init__(self, sinks):
+        """
+        Parameters
+        ----------
+        sinks : list
+            List of N sinks, one per batch case
+        """
+
+        super().__init__()
+        self.sinks = sinks
+
+    def open(self, shape):
+        super().open(shape)
+        if shape[-2] != len(self.sinks):
+            raise ValueError('need one sink per batch case')
+        for sink in self.sinks:
+            sink.open(shape[:-2] + shape[-1:])
+
+    def store(self, cols, arrays):
+        for j, sink in enumerate(self.sinks):
+            sink.write(*[block[..., j, :] for block in arrays])
+
+    def state(self):
+        return _nest(self.sinks)
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        for j, sink in enumerate(self.sinks):
+            sink.resume(shape[:-2] + shape[-1:], count, _unnest(state, j))
+
+    def close(self):
+        """Close every case sink
+
+        Returns
+        -------
+        results : list
+            List of N results from the case sinks
+        """
+
+        return [sink.close() for sink in self.sinks]
+
+
+class Recorder(Sink):
+    """Sink recording selected nodes and quantities every `stride` steps
+
+    The integrator still runs at its own time step, the recorder only passes
+    time steps `0, stride, 2 * stride, ...` of the selected nodes and
+    quantities on to `sink`.
+
+    Attributes
+    ----------
+    sink : Sink object
+        Destination of recorded histories
+    nodes : Numpy array
+        Numpy array of recorded node indices (None for every node)
+    keep : list
+        List of indices of recorded quantities in `NAMES`
+    stride : int
+        Number of time steps between records
+    """
+
+    def __init__(self, sink, nodes=None, names=NAMES, stride=1):
+        """
+        Parameters
+        ----------
+        sink : Sink object
+            Destination of recorded histories, written with one array per
+            name in `names`
+        nodes : list
+            List of recorded node indices (default is None for every node)
+        names : tuple
+            Recorded quantities from `NAMES` (default is every quantity)
+        stride : int
+            Number of time steps between records (default is 1)
+        """
+
+        super().__init__()
+        unknown = set(names) - set(NAMES)
+        if unknown:
+            raise ValueError(f'unknown quantities {sorted(unknown)}, use '
+                             f'{NAMES}')
+        if int(stride) < 1:
+            raise ValueError('stride must be a positive number of steps')
+        self.sink = sink
+        self.nodes = None if (nodes is None) else np.asarray(nodes, dtype=int)
+        self.keep = [NAMES.index(name) for name in names]
+        self.stride = int(stride)
+
+    def open(self, shape):
+        super().open(shape)
+        nodal = shape[:-1]
+        if self.nodes is not None:
+            nodal = (len(self.nodes),) + nodal[1:]
+        if self.keep:
+            self.sink.open(nodal + (_records(shape[-1], self.stride),))
+
+    def state(self):
+        return self.sink.state() if self.keep else {}
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        nodal = shape[:-1]
+        if self.nodes is not None:
+            nodal = (len(self.nodes),) + nodal[1:]
+        if self.keep:
+            self.sink.resume(nodal + (_records(shape[-1], self.stride),),
+                             _records(count, self.stride), state)
+
+    def store(self, cols, arrays):
+        if not self.keep:
+            return
+
+        # Block columns that land on a recorded step
+        first = -cols.start % self.stride
+        take = slice(first, cols.stop - cols.start, self.stride)
+        if first >= cols.stop - cols.start:
+            return
+
+        blocks = [arrays[i] for i in self.keep]
+        if self.nodes is not None:
+            blocks = [block[self.nodes] for block in blocks]
+        self.sink.write(*[block[..., take] for block in blocks])
+
+    def close(self):
+        """Close recorded sink
+
+        Returns
+        -------
+        result : object
+            Result of closing `sink` (None if no quantity is recorded)
+        """
+
+        return self.sink.close() if self.keep else None
+
+
+class PeakSink(Sink):
+    """Sink keeping peak absolute values of every node and quantity
+
+    Peaks are taken over every time step and saved with `save.saveData` as
+    `name` data [nodal shape x 3] holding displacement, velocity, and
+    acceleration columns.
+
+    Attributes
+    ----------
+    path : str
+        Output directory
+    fmt : str
+        Output format (see `save.saveData`)
+    name : str
+        Data name
+    peak : Numpy array
+        Numpy array [nodal shape x 3] for peak absolute values so far
+    """
+
+    def __init__(self, path='.', fmt='txt', name='peak'):
+        """
+        Parameters
+        ----------
+        path : str
+            Output directory (default is current directory)
+        fmt : str
+            Output format (default is `'txt'`)
+        name : str
+            Data name (default is `'peak'`)
+        """
+
+        super().__init__()
+        self.path = path
+        self.fmt = fmt
+        self.name = name
+        self.peak = None
+
+    def open(self, shape):
+        super().open(shape)
+        self.peak = np.zeros(self.shape[:-1] + (len(NAMES),))
+
+    def state(self):
+        return {'peak': self.peak}
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        self.peak = np.array(state['peak'], dtype=float)
+
+    def store(self, cols, arrays):
+        for i, block in enumerate(arrays):
+            np.maximum(self.peak[..., i], np.abs(block).max(axis=-1),
+                       out=self.peak[..., i])
+
+    def close(self):
+        """Save peaks
+
+        Returns
+        -------
+        peak : Numpy array
+            Numpy array [nodal shape x 3] for peak absolute values
+        """
+
+        save.saveData(self.peak, self.name, self.path, self.fmt)
+
+        return self.peak
+
+
+class TeeSink(Sink):
+    """Sink passing every block on to several sinks
+
+    Attributes
+    ----------
+    sinks : list
+        List of sinks receiving the same blocks
+    """
+
+    def __init__(self, sinks):
+        """
+        Parameters
+        ----------
+        sinks : list
+            List of sinks receiving the same blocks
+        """
+
+        super().__init__()
+        self.sinks = sinks
+
+    def open(self, shape):
+        super().open(shape)
+        for sink in self.sinks:
+            sink.open(shape)
+
+    def store(self, cols, arrays):
+        for sink in self.sinks:
+            sink.write(*arrays)
+
+    def state(self):
+        return _nest(self.sinks)
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        for j, sink in enumerate(self.sinks):
+            sink.resume(shape, count, _unnest(state, j))
+
+    def close(self):
+        """Close every sink
+
+        Returns
+        -------
+        results : list
+            List of results from the sinks
+        """
+
+        return [sink.close() for sink in self.sinks]
+
+
+class TimedSink(Sink):
+    """Sink timing every call to another sink as one phase of a run
+
+    Attributes
+    ----------
+    sink : Sink object
+        Sink receiving the blocks
+    timer : Profiler object
+        Profiler timing the calls (see `timing.Profiler`)
+    name : str
+        Name of the timed phase
+    """
+
+    def __init__(self, sink, timer, name='save'):
+        """
+        Parameters
+        ----------
+        sink : Sink object
+            Sink receiving the blocks
+        timer : Profiler object
+            Profiler timing the calls
+        name : str
+            Name of the timed phase (default is `'save'`)
+        """
+
+        super().__init__()
+        self.sink = sink
+        self.timer = timer
+        self.name = name
+
+    def open(self, shape):
+        super().open(shape)
+        with self.timer.phase(self.name):
+            self.sink.open(shape)
+
+    def store(self, cols, arrays):
+        with self.timer.phase(self.name):
+            self.sink.write(*arrays)
+
+    def state(self):
+        return self.sink.state()
+
+    def resume(self, shape, count, state):
+        super().resume(shape, count, state)
+        with self.timer.phase(self.name):
+            self.sink.resume(shape, count, state)
+
+    def close(self):
+        """Close the timed sink
+
+        Returns
+        -------
+        result : object
+            Result of the timed sink
+        """
+
+        with self.timer.phase(self.name):
+            return self.sink.close()
+
+
+def _nest(sinks):
+    """Return state of several sinks keyed by their position"""
+
+    return {f'{j}/{key}': value for j, sink in enumerate(sinks)
+            for key, value in sink.state().items()}
+
+
+def _unnest(state, j):
+    """Return state of sink `j` from `_nest`"""
+
+    prefix = f'{j}/'
+    return {key[len(prefix):]: value for key, value in state.items()
+            if key.startswith(prefix)}
+
+
+def _records(steps, stride):
+    """Return number of recorded time steps out of `steps`"""
+
+    return (steps - 1) // stride + 1
+
+
+def _writeText(df, fname):
+    """Write [dim x steps] array to text one node per line"""
+
+    with open(fname, 'w') as f:
+        for row in df.reshape(df.shape[0], -1):
+            np.savetxt(f, row[None, :], fmt='%.12f', delimiter=' ')
+
+
+def _writeCompressed(df, fname):
+    """Write array to compressed `.npz` without loading it whole"""
+
+    with zipfile.ZipFile(fname, 'w', compression=zipfile.ZIP_DEFLATED,
+                         allowZip64=True) as z:
+        with z.open('data.npy', 'w', force_zip64=True) as f:
+            np.lib.format.write_array(f, df, allow_pickle=False)
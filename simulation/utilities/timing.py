@@ -0,0 +1,128 @@
+import contextlib
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Profiler:
+    """Wall clock timers of the phases of a run
+
+    Phases are timed with `time.perf_counter` around whole blocks of work,
+    never single time steps, so timing costs nothing measurable. A phase
+    entered inside another is excluded from the time of the outer phase, so
+    phase times add up to the timed part of the run.
+
+    Attributes
+    ----------
+    phases : dict
+        Dictionary of phase names to dictionaries with `'time'` (exclusive
+        wall time [s]), `'calls'`, and `'peak_mb'` (peak resident memory of
+        the process at the end of the phase [MB], None if unknown)
+    start : float
+        Performance counter at creation [s]
+
+    Methods
+    -------
+    phase(name)
+        Context manager timing a phase
+    report(steps, num_nodes, work='solve')
+        Return timing report with throughput of the `work` phase
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.start = time.perf_counter()
+        self._stack = []
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager timing a phase
+
+        Parameters
+        ----------
+        name : str
+            Name of phase, time of repeated phases is summed
+        """
+
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[0]
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+            entry = self.phases.setdefault(name, {'time': 0.0, 'calls': 0,
+                                                  'peak_mb': None})
+            entry['time'] += elapsed - frame[1]
+            entry['calls'] += 1
+            entry['peak_mb'] = peakMemory()
+
+    def report(self, steps, num_nodes, work='solve'):
+        """Return timing report with throughput of the `work` phase
+
+        Parameters
+        ----------
+        steps : int
+            Number of time steps of the run
+        num_nodes : int
+            Number of nodes of the column
+        work : str
+            Phase doing the time stepping (default is `'solve'`)
+
+        Returns
+        -------
+        report : dict
+            Dictionary with `'total'` (wall time since creation [s]),
+            `'phases'` (see `phases`, with `'fraction'` of total),
+            `'other'` (untimed wall time [s]), `'steps'`, `'num_nodes'`,
+            `'steps_per_s'`, `'node_steps_per_s'`, and `'peak_mb'`
+        """
+
+        total = time.perf_counter() - self.start
+        phases = {name: dict(entry, fraction=entry['time'] / total)
+                  for name, entry in self.phases.items()}
+        timed = sum(entry['time'] for entry in self.phases.values())
+
+        # Throughput of the time stepping alone
+        t_work = self.phases[work]['time'] if (work in self.phases) else 0.0
+        rate = (steps / t_work) if (t_work > 0.0) else None
+
+        return {
+            'total': total,
+            'phases': phases,
+            'other': total - timed,
+            'steps': steps,
+            'num_nodes': num_nodes,
+            'steps_per_s': rate,
+            'node_steps_per_s': (rate * num_nodes) if (rate != None)
+                                else None,
+            'peak_mb': peakMemory(),
+        }
+
+
+def peakMemory():
+    """Return peak resident memory of the process [MB]
+
+    Returns
+    -------
+    peak : float
+        Peak resident set size [MB] (None where the `resource` module is
+        unavailable)
+    """
+
+    if resource is None:
+        return None
+
+    # Kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak /= 1024
+
+    return peak / 1024
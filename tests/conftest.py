@@ -0,0 +1,121 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Tests import the simulation and post-processing modules as scripts in
+# those directories do
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'post-processing'))
+sys.path.insert(0, os.path.join(ROOT, 'simulation'))
+
+import read
+
+import solve
+
+# Largest difference of rearranged explicit Newmark runs from the
+# original solver, relative to the largest value
+TOL = 2e-12
+
+# Column of the regression runs, small enough to step in well under a
+# second without the compiled kernel
+PARAMS = {'vs': 100.0, 'rho': 1000.0, 'vs_rock': 200.0, 'rho_rock': 2000.0}
+SIM = {'h': 20.0, 'h_elem': 1.0, 'A': 1.0, 'B': 4 * np.pi, 'dt': 2e-4,
+       'tf': 0.6, 'rigid': False}
+
+
+def baseline(params, sim):
+    """Return displacement, velocity, and acceleration [dim x steps + 1] of
+    the original explicit Newmark solver
+
+    Dense matrices, a full solve every step, and the pulse evaluated one
+    step at a time, as the solver was first written.
+    """
+
+    h_elem = sim['h_elem']
+    dim = int(round(sim['h'] / h_elem)) + 1
+    dt = sim['dt']
+    steps = int(round(sim['tf'] / dt))
+    A, B = sim['A'], sim['B']
+    gamma = 0.5
+
+    mass = params['rho'] * h_elem
+    m = np.diag(np.full(dim, mass))
+    m[0, 0] = m[-1, -1] = 0.5 * mass
+    g = params['vs']**2 * params['rho'] / h_elem
+    k = (np.diag(np.full(dim, 2.0 * g)) - np.diag(np.full(dim - 1, g), 1)
+         - np.diag(np.full(dim - 1, g), -1))
+    k[0, 0] = k[-1, -1] = g
+    c = np.zeros((dim, dim))
+    c[-1, -1] = params['vs_rock'] * params['rho_rock']
+    f = np.zeros(dim)
+    f[-1] = 2.0 * c[-1, -1]
+
+    u = np.zeros((dim, steps + 1))
+    v = np.zeros((dim, steps + 1))
+    a = np.zeros((dim, steps + 1))
+    for s in range(steps):
+        t = s * dt
+        on = t <= np.pi / B
+        v_hat = A * np.sin(B * t)**2 if on else 0.0
+        a_hat = 2 * A * B * np.sin(B * t) * np.cos(B * t) if on else 0.0
+
+        u_temp = u[:, s] + dt * v[:, s] + 0.5 * dt * dt * a[:, s]
+        v_temp = v[:, s] + (1 - gamma) * dt * a[:, s]
+        if sim['rigid']:
+            lhs = m.copy()
+            rhs = -(k @ u_temp)
+            lhs[-1, :] = 0.0
+            lhs[-1, -1] = 1.0
+            rhs[-1] = a_hat
+        else:
+            lhs = m + gamma * dt * c
+            rhs = f * v_hat - c @ v_temp - k @ u_temp
+        a[:, s + 1] = np.linalg.solve(lhs, rhs)
+        v[:, s + 1] = v_temp + gamma * dt * a[:, s + 1]
+        u[:, s + 1] = u_temp
+
+    return u, v, a
+
+
+@pytest.fixture(scope='session')
+def reference():
+    """Baseline histories of the compliant and rigid regression columns"""
+
+    return {rigid: baseline(PARAMS, dict(SIM, rigid=rigid))
+            for rigid in (False, True)}
+
+
+@pytest.fixture(scope='session')
+def explicit(tmp_path_factory):
+    """Explicit Newmark histories of the compliant and rigid columns"""
+
+    root = str(tmp_path_factory.mktemp('explicit')) + '/'
+    out = {}
+    for rigid in (False, True):
+        sim = dict(SIM, name=f'rigid{rigid}', rigid=rigid, format='npy')
+        with read.Results(solve.solve(PARAMS, sim, root=root)) as results:
+            out[rigid] = tuple(results.get(q) for q in ('disp', 'vel', 'acc'))
+
+    return out
+
+
+@pytest.fixture
+def run(tmp_path):
+    """Return function solving a regression column into `tmp_path` and
+    reading back its histories"""
+
+    def run(name='run', params=None, **settings):
+        sim = dict(SIM, name=name, **settings)
+        saveDir = solve.solve(params or PARAMS, sim, root=str(tmp_path) + '/')
+        with read.Results(saveDir) as results:
+            return tuple(results.get(q) for q in ('disp', 'vel', 'acc'))
+
+    return run
+
+
+def relative(x, ref):
+    """Return largest difference of `x` from `ref` relative to `ref`"""
+
+    return np.max(np.abs(x - ref)) / np.max(np.abs(ref))
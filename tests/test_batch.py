@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+import batch
+import read
+
+from conftest import PARAMS, SIM, relative
+
+CASES = [
+    (PARAMS, {'A': 1.0}),
+    (dict(PARAMS, vs=150.0), {'A': 0.5}),
+    (dict(PARAMS, rho=1800.0), {'A': 2.0, 'B': 2 * np.pi}),
+]
+
+
+def sims(**settings):
+    return [dict(SIM, name=f'case{j}', **sim, **settings)
+            for j, (_, sim) in enumerate(CASES)]
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+def test_batch_matches_cases(run, tmp_path, rigid):
+    params_list = [params for params, _ in CASES]
+    saveDirs = batch.solveBatch(params_list, sims(rigid=rigid, format='npy'),
+                                root=str(tmp_path / 'batch') + '/')
+    for j, (params, sim) in enumerate(CASES):
+        expected = run(f'single{j}', params=params, rigid=rigid,
+                       format='npy', **sim)
+        with read.Results(saveDirs[j]) as results:
+            for name, ref in zip(('disp', 'vel', 'acc'), expected):
+                assert relative(results.get(name), ref) <= 2e-12
+
+
+@pytest.mark.parametrize('setting', [
+    {'engine': 'frequency'},
+    {'scheme': 'implicit'},
+    {'nonlinear': True},
+    {'jit': True},
+    {'storage': 'csr'},
+    {'checkpoint': 60.0},
+    {'restart': True},
+    {'results': 'cache'},
+    {'profile': True},
+    {'format': 'bin'},
+])
+def test_rejected(tmp_path, setting):
+    sim_list = sims(format='npy')
+    sim_list[-1].update(setting)
+    with pytest.raises(ValueError):
+        batch.solveBatch([params for params, _ in CASES], sim_list,
+                         root=str(tmp_path) + '/')
+    assert os.listdir(tmp_path) == []
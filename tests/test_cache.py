@@ -0,0 +1,95 @@
+import os
+
+import numpy as np
+import pytest
+
+import solve
+
+import frequency.cache as cache
+import frequency.frequency as frequency
+
+from conftest import PARAMS, SIM
+
+
+@pytest.fixture(scope='module')
+def column():
+    prof, m, k, c, f = solve.assemble(PARAMS, SIM)
+    return m.matrix, k.matrix, c.matrix
+
+
+def omega(n, shift=0.0):
+    return np.linspace(1.0, 500.0, n) + shift
+
+
+def test_hits(column):
+    tf_cache = cache.TransferCache()
+    H = tf_cache.get(*column, omega(64))
+    assert np.array_equal(H, frequency.transferFunction(*column, omega(64)))
+    assert tf_cache.get(*column, omega(64)) is H
+    assert (tf_cache.hits, tf_cache.misses) == (1, 1)
+    assert not H.flags.writeable
+    tf_cache.get(*column, omega(64), [0])
+    tf_cache.get(*column, omega(64, 1.0))
+    assert (tf_cache.hits, tf_cache.misses) == (1, 3)
+
+
+def test_keys(column):
+    m, k, c = column
+    tf_cache = cache.TransferCache()
+    key = tf_cache.key(m, k, c, omega(8))
+    assert key == tf_cache.key(m.copy(), k.copy(), c.copy(), omega(8))
+    assert key != tf_cache.key(m, k * 1.01, c, omega(8))
+    assert key != tf_cache.key(m, k, c, omega(8), [0, 20])
+    assert key != tf_cache.key(m, k, c, omega(8) - 0.5j)
+
+
+def test_byte_bound(column):
+    """Least recently used transfer functions are dropped past the bound"""
+
+    size = 21 * 64 * 16
+    tf_cache = cache.TransferCache(maxbytes=2 * size)
+    first = tf_cache.get(*column, omega(64, 0.0))
+    tf_cache.get(*column, omega(64, 1.0))
+    assert tf_cache.get(*column, omega(64, 0.0)) is first
+    tf_cache.get(*column, omega(64, 2.0))
+    assert tf_cache.nbytes == 2 * size
+    assert tf_cache.get(*column, omega(64, 0.0)) is first
+    assert tf_cache.hits == 2
+    tf_cache.get(*column, omega(64, 1.0))
+    assert tf_cache.misses == 4
+    assert tf_cache.nbytes <= tf_cache.maxbytes
+    tf_cache.clear()
+    assert tf_cache.nbytes == 0
+
+
+def test_oversize(column):
+    tf_cache = cache.TransferCache(maxbytes=1000)
+    H = tf_cache.get(*column, omega(64))
+    assert H.shape == (21, 64)
+    assert tf_cache.nbytes == 0
+    tf_cache.get(*column, omega(64))
+    assert (tf_cache.hits, tf_cache.misses) == (0, 2)
+
+
+def test_disk(tmp_path, column):
+    path = str(tmp_path / 'tf')
+    H = cache.TransferCache(maxbytes=0, path=path).get(*column, omega(64))
+    later = cache.TransferCache(path=path)
+    assert np.array_equal(later.get(*column, omega(64)), H)
+    assert (later.hits, later.misses) == (1, 0)
+    assert [name.endswith('.npz') and ('tmp' not in name)
+            for name in os.listdir(path)] == [True]
+
+
+def test_motions(run, monkeypatch, tmp_path):
+    """Later motions on the same column reuse its transfer function"""
+
+    monkeypatch.setattr(cache, '_shared', {})
+    one = run('one', engine='frequency', format='npy')
+    two = run('two', engine='frequency', format='npy', A=2.0)
+    tf_cache = cache.shared()
+    assert (tf_cache.hits, tf_cache.misses) == (1, 1)
+    for x, y in zip(one, two):
+        assert np.allclose(y, 2.0 * x, rtol=0.0, atol=1e-12 * np.abs(x).max())
+    assert cache.shared() is tf_cache
+    assert cache.shared(str(tmp_path / 'tf')) is not tf_cache
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pytest
+
+import read
+import solve
+
+import newmark.checkpoint as checkpoint
+import utilities.sink as sink
+
+from conftest import PARAMS, SIM, TOL, relative
+
+
+class Crash(Exception):
+    pass
+
+
+def interrupt(monkeypatch, blocks):
+    """Make file sinks fail on writing block `blocks`, as if the run was
+    killed part way"""
+
+    store = sink.FileSink.store
+    calls = [0]
+
+    def failing(self, cols, arrays):
+        calls[0] += 1
+        if calls[0] > blocks:
+            raise Crash()
+        return store(self, cols, arrays)
+
+    monkeypatch.setattr(sink.FileSink, 'store', failing)
+
+
+def outputs(saveDir, peaks=False):
+    """Return every saved array of an output directory by name"""
+
+    names = ('disp', 'vel', 'acc') + (('peak',) if peaks else ())
+    with read.Results(saveDir) as results:
+        return {name: results.get(name) for name in names}
+
+
+@pytest.mark.parametrize('settings', [
+    {'format': 'npy'},
+    {'format': 'txt', 'dt_out': 1e-3, 'peaks': True},
+    {'format': 'h5', 'nodes': [0, 5, 20]},
+    {'format': 'npy', 'nonlinear': True, 'A': 4.0},
+])
+def test_restart(tmp_path, monkeypatch, settings):
+    if settings['format'] == 'h5':
+        pytest.importorskip('h5py')
+    params = dict(PARAMS, gamma_ref=1e-4, curvature=0.9)
+    root = str(tmp_path) + '/'
+    sim = dict(SIM, chunk=500, **settings)
+
+    whole = solve.solve(params, dict(sim, name='whole'), root=root)
+
+    with monkeypatch.context() as patch:
+        interrupt(patch, 3)
+        with pytest.raises(Crash):
+            solve.solve(params, dict(sim, name='part', checkpoint=0.0),
+                        root=root)
+    part = os.path.join(root, 'part')
+    assert os.path.exists(os.path.join(part, solve.CHECKPOINT))
+
+    resumed = solve.solve(params, dict(sim, name='part', checkpoint=0.0,
+                                       restart=True), root=root)
+    assert not os.path.exists(os.path.join(resumed, solve.CHECKPOINT))
+    peaks = bool(settings.get('peaks'))
+    expected = outputs(whole, peaks)
+    for name, x in outputs(resumed, peaks).items():
+        assert np.array_equal(x, expected[name])
+
+
+def crashed(tmp_path, monkeypatch, **settings):
+    """Return root of a regression run killed after its third block"""
+
+    root = str(tmp_path) + '/'
+    sim = dict(SIM, name='part', chunk=500, format='npy', checkpoint=0.0,
+               **settings)
+    with monkeypatch.context() as patch:
+        interrupt(patch, 3)
+        with pytest.raises(Crash):
+            solve.solve(PARAMS, sim, root=root)
+
+    return root
+
+
+@pytest.mark.parametrize('settings', [{'dt': 1e-4}, {'h_elem': 0.5}])
+def test_mismatch(tmp_path, monkeypatch, settings):
+    """Snapshots are only resumed by the system and step they came from"""
+
+    root = crashed(tmp_path, monkeypatch)
+    sim = dict(SIM, name='part', chunk=500, format='npy', checkpoint=0.0,
+               restart=True, **settings)
+    with pytest.raises(ValueError):
+        solve.solve(PARAMS, sim, root=root)
+
+
+def test_snapshot(tmp_path, monkeypatch):
+    root = crashed(tmp_path, monkeypatch)
+    files = os.listdir(os.path.join(root, 'part'))
+    assert not any(name.endswith('.tmp') for name in files)
+    state = checkpoint.load(os.path.join(root, 'part', solve.CHECKPOINT))
+    assert int(state['step']) == 1000
+    assert float(state['time']) == pytest.approx(1000 * SIM['dt'],
+                                                 rel=1e-12)
+    assert state['u'].shape == (21,)
+
+    assert checkpoint.Checkpoint('unused', 0.0).due()
+    assert not checkpoint.Checkpoint('unused', 600.0).due()
+
+
+@pytest.mark.parametrize('settings', [
+    {'engine': 'frequency', 'checkpoint': 0.0},
+    {'engine': 'modal', 'rigid': True, 'restart': True},
+])
+def test_engine(tmp_path, settings):
+    with pytest.raises(ValueError):
+        solve.solve(PARAMS, dict(SIM, name='run', **settings),
+                    root=str(tmp_path) + '/')
+    assert os.listdir(tmp_path) == []
+
+
+def test_nothing_to_resume(run, reference):
+    """Restarting a run with no snapshot solves it from the start"""
+
+    out = run(restart=True, checkpoint=0.0, format='npy')
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref) <= TOL
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+import solve
+
+import frequency.equivalent as equivalent
+import utilities.motion as motion
+import utilities.profile as profile
+
+from conftest import PARAMS, SIM, relative
+
+LAYERS = [{'h': 8.0, 'vs': 100.0, 'rho': 1000.0, 'gamma_ref': 1e-4},
+          {'h': 12.0, 'vs': 150.0, 'rho': 1000.0, 'gamma_ref': 3e-4,
+           'curvature': 0.9}]
+
+
+def column(A=0.005):
+    """Return arguments of `equivalent.response` for the layered column
+    shaken by a pulse of amplitude `A`"""
+
+    params = dict(PARAMS, layers=LAYERS, damping_min=0.01)
+    prof, m, k, c, f = solve.assemble(params, {})
+    steps = int(round(SIM['tf'] / SIM['dt']))
+    v_hat = motion.Motion(A, SIM['B']).history(
+        SIM['dt'] * np.arange(steps + 1))[0]
+    return (m.matrix, c.matrix, f, k.g, prof.h_elem,
+            equivalent.fromProfile(prof, params), v_hat, SIM['dt'])
+
+
+def test_curves():
+    curves = equivalent.Curves([1e-4, np.inf], [1.0, 1.0], [0.01, 0.02],
+                               [0.21, 0.02])
+    modulus, damping = curves.evaluate([-1e-4, 1e-2])
+    assert np.allclose(modulus, [0.5, 1.0], rtol=1e-14)
+    assert np.allclose(damping, [0.11, 0.02], rtol=1e-14)
+    table = {'strain': [1e-6, 1e-4, 1e-2], 'modulus': [1.0, 0.6, 0.1],
+             'damping': [0.01, 0.05, 0.2]}
+    curves = equivalent.Curves([np.inf], [1.0], [0.0], [0.0],
+                               [(np.array([True]), *table.values())])
+    modulus, damping = curves.evaluate([1e-3])
+    assert np.allclose((modulus, damping), ([0.35], [0.125]), rtol=1e-14)
+    assert np.allclose(curves.evaluate([1e-8]), ([1.0], [0.01]), rtol=1e-14)
+
+
+def test_layers():
+    """Layers set their own curves, falling back to `params`"""
+
+    prof = profile.Profile(LAYERS + [{'h': 2.0, 'vs': 400.0, 'rho': 2000.0,
+                                      'gamma_ref': None}])
+    curves = equivalent.fromProfile(prof, dict(PARAMS, curvature=0.8,
+                                               damping_max=0.3))
+    assert np.array_equal(curves.gamma_ref, np.repeat([1e-4, 3e-4, np.inf],
+                                                      [8, 12, 2]))
+    assert np.array_equal(curves.curvature, np.repeat([0.8, 0.9, 0.8],
+                                                      [8, 12, 2]))
+    assert np.array_equal(curves.damping_max, np.repeat([0.3, 0.3, 0.0],
+                                                        [8, 12, 2]))
+
+
+def test_linear(run):
+    """Undamped linear elements give the frequency domain response"""
+
+    out = run('equivalent', engine='equivalent', format='npy')
+    ref = run('frequency', engine='frequency', format='npy')
+    for x, y in zip(out, ref):
+        assert relative(x, y) <= 1e-12
+
+
+def test_convergence():
+    u, v, a, result = equivalent.response(*column(), tol=1e-3)
+    assert result['converged']
+    assert 1 < result['iterations'] < 15
+    assert result['change'] <= 1e-3
+    curves = column()[5]
+    modulus, damping = curves.evaluate(result['strain'])
+    assert np.allclose(modulus, result['modulus'], rtol=2e-3)
+    assert np.allclose(damping, result['damping'], rtol=2e-3)
+    assert np.all(result['modulus'] < 1.0)
+    assert np.all(np.isfinite(u))
+
+    # Stronger shaking softens every element further
+    stronger = equivalent.response(*column(0.01), tol=1e-3)[3]
+    assert np.all(stronger['modulus'] < result['modulus'])
+
+
+def test_pad():
+    """Converged properties do not depend on the padding"""
+
+    short = equivalent.response(*column(), tol=1e-4, pad=2.0)[3]
+    long = equivalent.response(*column(), tol=1e-4, pad=4.0)[3]
+    assert np.allclose(short['modulus'], long['modulus'], rtol=1e-2)
+    with pytest.raises(ValueError):
+        equivalent.response(*column(), pad=1.2)
+
+
+def test_not_converged(run, capsys):
+    params = dict(PARAMS, gamma_ref=1e-4)
+    run(params=params, engine='equivalent', A=0.005, max_iter=1,
+        format='npy')
+    assert 'did not converge' in capsys.readouterr().out
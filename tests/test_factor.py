@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import arrays.factor as fac
+import arrays.storage as sto
+
+sparse = pytest.importorskip('scipy.sparse')
+
+
+def banded(dim, lower, upper):
+    """Return diagonally dominant banded matrix with given off diagonals"""
+
+    matrix = sto.BandedMatrix(dim)
+    matrix.band(0)[:] = 4.0 + np.arange(dim)
+    matrix.band(1)[:] = upper
+    matrix.band(-1)[:] = lower
+    return matrix
+
+
+@pytest.mark.parametrize('storage, kind', [
+    ('dense', 'lu'),
+    ('banded', 'cholesky_banded'),
+    ('csr', 'splu'),
+])
+def test_symmetric(storage, kind):
+    matrix = banded(8, -1.0, -1.0)
+    if storage == 'dense':
+        matrix = matrix.toarray()
+    elif storage == 'csr':
+        matrix = sparse.csr_matrix(matrix.toarray())
+    factor = fac.Factor(matrix)
+    assert factor.kind == kind
+
+    rhs = np.random.default_rng(0).standard_normal((8, 3))
+    assert np.allclose(sto.toDense(matrix) @ factor.solve(rhs), rhs)
+    assert np.allclose(sto.toDense(matrix) @ factor.solve(rhs[:, 0]),
+                       rhs[:, 0])
+
+
+def test_unsymmetric_banded(monkeypatch):
+    """Banded systems that are not positive definite are factored once"""
+
+    matrix = banded(8, -1.0, 0.5)
+    factor = fac.Factor(matrix)
+    assert factor.kind == 'splu'
+
+    monkeypatch.setattr(fac.sla, 'solve_banded', None)
+    monkeypatch.setattr(fac.spla, 'splu', None)
+    rhs = np.random.default_rng(1).standard_normal((8, 5))
+    for col in rhs.T:
+        assert np.allclose(matrix.toarray() @ factor.solve(col), col)
+
+
+def test_diagonal():
+    matrix = banded(8, 0.0, 0.0)
+    factor = fac.Factor(matrix)
+    assert factor.kind == 'diagonal'
+    assert np.allclose(factor.solve(np.ones(8)), 1.0 / matrix.diagonal())
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+def test_factored_once(run, monkeypatch, rigid):
+    """Implicit runs factor their left hand side once, not every step"""
+
+    calls = []
+    init = fac.Factor.__init__
+
+    def counted(self, *args, **kwargs):
+        calls.append(1)
+        init(self, *args, **kwargs)
+
+    monkeypatch.setattr(fac.Factor, '__init__', counted)
+    run(rigid=rigid, scheme='implicit', format='npy')
+    assert len(calls) == 1
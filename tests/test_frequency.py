@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import solve
+
+import frequency.frequency as frequency
+import frequency.tridiagonal as tri
+
+from conftest import PARAMS, SIM, relative
+
+# Frequency solution is exact in time, so it differs from explicit Newmark
+# by the first order discretization error of the time stepping
+TOL = 1e-2
+
+
+def dynamic(m, k, c, w):
+    """Return dense dynamic stiffness K + i w C - w^2 M"""
+
+    return k + 1j * w * c - w * w * m
+
+
+def test_tridiagonal():
+    rng = np.random.default_rng(0)
+    dim, n = 30, 5
+    lower = rng.standard_normal((dim - 1, n)) + 1j * rng.standard_normal(
+        (dim - 1, n))
+    upper = rng.standard_normal((dim - 1, n))
+    diag = 4.0 + rng.standard_normal((dim, n))
+    rhs = rng.standard_normal((dim, n))
+    x = tri.solve(lower, diag, upper, rhs)
+    for j in range(n):
+        a = (np.diag(diag[:, j]) + np.diag(lower[:, j], -1)
+             + np.diag(upper[:, j], 1))
+        assert np.allclose(a @ x[:, j], rhs[:, j], rtol=0.0, atol=1e-12)
+
+
+def test_transfer_function():
+    prof, m, k, c, f = solve.assemble(PARAMS, dict(SIM, storage='dense'))
+    omega = np.array([0.0, 3.0, 40.0 - 2.0j, 600.0])
+    H = frequency.transferFunction(m.matrix, k.matrix, c.matrix, omega)
+    for j, w in enumerate(omega[1:], 1):
+        e = np.zeros(prof.num_nodes)
+        e[-1] = 1.0
+        U = np.linalg.solve(dynamic(m.matrix, k.matrix, c.matrix, w), e)
+        assert np.allclose(H[:, j], 1j * w * U, rtol=1e-10)
+    assert np.allclose(H[:, 0], 1.0 / c.c, rtol=1e-14)
+    rows = frequency.transferFunction(m.matrix, k.matrix, c.matrix, omega,
+                                      [0, 20])
+    assert np.array_equal(rows, H[[0, 20]])
+
+
+@pytest.mark.parametrize('pad', [1.0, 2.0, 4.0])
+def test_frequency(run, explicit, pad):
+    out = run(engine='frequency', pad=pad, format='npy')
+    for x, ref in zip(out, explicit[False]):
+        assert relative(x, ref) <= TOL
+
+
+def test_frequency_converges(run, explicit):
+    """Explicit Newmark approaches the frequency solution as `dt` halves"""
+
+    exact = run('exact', engine='frequency', format='npy')[0]
+    coarse = relative(explicit[False][0], exact)
+    fine = relative(run('fine', dt=1e-4, format='npy')[0][:, ::2], exact)
+    assert fine < 0.6 * coarse
+
+
+def test_no_cfl(run, explicit, capsys):
+    """Steps past the explicit stability limit sample the same response"""
+
+    out = run(engine='frequency', dt=1.2e-2, format='npy')
+    assert 'Warning' not in capsys.readouterr().out
+    x = out[1]
+    ref = explicit[False][1][:, ::60]
+    assert relative(x, ref) <= 5e-2
@@ -0,0 +1,135 @@
+import numpy as np
+import pytest
+
+import newmark.hysteresis as hysteresis
+import newmark.kernels as kernels
+
+from conftest import PARAMS, relative
+
+jit = pytest.mark.skipif(kernels.masingForce is None, reason='needs numba')
+
+
+def history(elements, u, monkeypatch=None):
+    """Return restoring forces [dim x steps] of displacements `u` [dim x
+    steps], with the numpy update if `monkeypatch` is given"""
+
+    if monkeypatch is not None:
+        monkeypatch.setattr(kernels, 'masingForce', None)
+    out = np.empty(u.shape)
+    for s in range(u.shape[1]):
+        elements.force(u[:, s], out[:, s])
+
+    return out
+
+
+def cyclic(dim, steps, seed=0):
+    """Return displacements [dim x steps] of irregular cyclic loading up to
+    strains of several reference strains"""
+
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0.0, 6 * np.pi, steps)
+    walk = np.cumsum(rng.standard_normal((dim, steps)), axis=1)
+    return 1e-3 * np.arange(dim)[:, None] * np.sin(t) + 1e-4 * walk
+
+
+def elements(dim=12):
+    """Return elements of increasing stiffness between `dim` nodes"""
+
+    return hysteresis.Masing(np.linspace(1e6, 2e6, dim - 1),
+                             np.ones(dim - 1), 1e-3, 0.9)
+
+
+@jit
+def test_numba_numpy(monkeypatch):
+    u = cyclic(12, 4000)
+    compiled = history(elements(), u)
+    plain = history(elements(), u, monkeypatch)
+    assert np.array_equal(compiled, plain)
+
+
+def test_state_restore():
+    """Restored state continues the loading history unchanged"""
+
+    u = cyclic(12, 2000)
+    whole = history(elements(), u)
+    first = elements()
+    history(first, u[:, :800])
+    second = elements()
+    second.restore(first.state())
+    assert np.array_equal(history(second, u[:, 800:]), whole[:, 800:])
+
+
+def test_linear_limit(run, reference):
+    """Elements of infinite reference strain follow the linear column"""
+
+    params = dict(PARAMS, gamma_ref=np.inf, curvature=1.0)
+    out = run(params=params, nonlinear=True, format='npy')
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref) <= 2e-12
+
+
+@jit
+def test_nonlinear_jit(run, monkeypatch):
+    params = dict(PARAMS, gamma_ref=1e-4, curvature=0.9)
+    sim = {'nonlinear': True, 'format': 'npy', 'A': 4.0}
+    compiled = run('compiled', params=params, jit=True, **sim)
+    monkeypatch.setattr(kernels, 'masingForce', None)
+    plain = run('plain', params=params, jit=False, **sim)
+    for x, y in zip(compiled, plain):
+        assert np.array_equal(x, y)
+
+
+def loading(element, gammas):
+    """Return element stresses over `G_max` along strains `gammas` of one
+    element of unit height fixed at its lower node"""
+
+    out = np.empty(2)
+    return np.array([element.force(np.array([0.0, gamma]), out)[1]
+                     for gamma in gammas]) / element.g_max[0]
+
+
+@pytest.mark.parametrize('compiled', [False, pytest.param(True, marks=jit)])
+def test_masing_loop(monkeypatch, compiled):
+    """Unloading and reloading follow backbone curves scaled by two and
+    close the loop at the reversal points"""
+
+    if not compiled:
+        monkeypatch.setattr(kernels, 'masingForce', None)
+    element = hysteresis.Masing(2e6, [1.0], 1e-3, 0.9)
+    backbone = element.backbone(np.linspace(0.0, 4e-3, 41), np.empty(41))
+    gamma_a = 4e-3
+    up = np.linspace(0.0, gamma_a, 41)
+    down = np.linspace(gamma_a, -gamma_a, 81)[1:]
+    path = loading(element, np.concatenate((up, down, -down)))
+    assert np.allclose(path[:41], backbone, rtol=1e-14)
+    tau_a = backbone[-1]
+    branch = tau_a + 2 * element.backbone(0.5 * (down - gamma_a),
+                                          np.empty(80))
+    assert np.allclose(path[41:121], branch, rtol=1e-14)
+    assert path[120] == pytest.approx(-tau_a, rel=1e-14)
+    assert path[-1] == pytest.approx(tau_a, rel=1e-14)
+    assert np.allclose(path[121:], -path[41:121], rtol=1e-12)
+
+    # Loop encloses dissipated energy, and loading past the largest strain
+    # rejoins the backbone
+    gamma = np.concatenate(([gamma_a], down, -down))
+    area = np.sum(np.diff(gamma) * 0.5 * (path[41:] + path[40:-1]))
+    assert area > 0.0
+    more = loading(element, [5e-3])[0]
+    assert more == pytest.approx(element.backbone(np.array([5e-3]),
+                                                  np.empty(1))[0], rel=1e-14)
+
+
+def test_nodal_forces():
+    """Element forces balance and reduce to the linear stiffness at small
+    strain"""
+
+    u = cyclic(12, 1)[:, 0] * 1e-6
+    g_max = np.linspace(1e6, 2e6, 11)
+    force = hysteresis.Masing(g_max, np.ones(11), np.inf).force(
+        u, np.empty(12))
+    k = (np.diag(np.append(g_max, 0.0) + np.insert(g_max, 0, 0.0))
+         - np.diag(g_max, 1) - np.diag(g_max, -1))
+    assert np.allclose(force, k @ u, rtol=1e-14, atol=1e-20)
+    nonlinear = elements().force(cyclic(12, 1)[:, 0], np.empty(12))
+    assert abs(nonlinear.sum()) <= 1e-12 * np.abs(nonlinear).max()
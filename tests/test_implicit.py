@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+import solve
+
+import newmark.newmark as newmark
+
+from conftest import PARAMS, SIM, relative
+
+# Average acceleration differs from explicit Newmark by the discretization
+# error of both schemes
+TOL = 1e-3
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+def test_implicit(run, explicit, rigid):
+    out = run(rigid=rigid, scheme='implicit', format='npy')
+    for x, ref in zip(out, explicit[rigid]):
+        assert relative(x, ref) <= TOL
+
+
+def test_rigid_base(run, reference):
+    """Base node follows the imposed acceleration"""
+
+    out = run(rigid=True, scheme='implicit', format='npy')
+    assert np.allclose(out[2][-1], reference[True][2][-1], rtol=0.0,
+                       atol=1e-12)
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+def test_large_steps(run, rigid, capsys):
+    """Steps past the explicit stability limit converge to the fine
+    solution"""
+
+    fine = run('fine', rigid=rigid, scheme='implicit', dt=1e-3,
+               format='npy')[1]
+    errors = []
+    for dt in (2e-2, 1e-2, 5e-3):
+        stride = int(round(dt / 1e-3))
+        x = run(f'dt{dt}', rigid=rigid, scheme='implicit', dt=dt,
+                format='npy')[1]
+        assert np.all(np.isfinite(x))
+        errors += [relative(x, fine[:, ::stride])]
+    assert 'Warning' not in capsys.readouterr().out
+    assert errors[0] < 0.5
+    assert errors[1] < 0.6 * errors[0]
+    assert errors[2] < 0.6 * errors[1]
+
+
+def test_parameters():
+    prof, m, k, c, f = solve.assemble(PARAMS, SIM)
+    with pytest.raises(ValueError):
+        newmark.ImplicitNewmark(0.0, 0.5, 1e-3, m.matrix, k.matrix,
+                                c.matrix, f)
+    with pytest.raises(ValueError):
+        newmark.ImplicitNewmark(0.25, 0.4, 1e-3, m.matrix, k.matrix,
+                                c.matrix, f)
@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import solve
+
+import newmark.integrator as integrator
+import newmark.kernels as kernels
+import newmark.newmark as newmark
+import utilities.motion as motion
+import utilities.sink as sink
+
+from conftest import PARAMS, SIM, TOL, relative
+
+jit = pytest.mark.skipif(kernels.explicitTridiagonal is None,
+                         reason='needs numba')
+
+
+class Memory(sink.Sink):
+    """Sink keeping whole histories in memory"""
+
+    def open(self, shape):
+        sink.Sink.open(self, shape)
+        self.out = tuple(np.zeros(shape) for _ in range(3))
+
+    def store(self, cols, arrays):
+        for x, y in zip(self.out, arrays):
+            x[..., cols] = y
+
+    def close(self):
+        return self.out
+
+
+def column(rigid, storage='banded'):
+    """Return explicit solver and imposed kinematics of the regression
+    column"""
+
+    prof, m, k, c, f = solve.assemble(PARAMS, dict(SIM, storage=storage))
+    if rigid:
+        cls = newmark.ExplicitNewmarkRigid
+    elif storage == 'dense':
+        cls = newmark.ExplicitNewmarkCompliant
+    else:
+        cls = newmark.ExplicitNewmarkLumped
+    solver = cls(0.0, 0.5, SIM['dt'], m.matrix, k.matrix, c.matrix, f)
+    steps = int(round(SIM['tf'] / SIM['dt']))
+    v_hat, a_hat = motion.Motion(SIM['A'], SIM['B']).history(
+        SIM['dt'] * np.arange(steps))
+
+    return solver, v_hat, a_hat
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+def test_whole_run(reference, rigid):
+    solver, v_hat, a_hat = column(rigid)
+    out = integrator.integrate(solver, v_hat, a_hat, jit=False)
+    for x, ref in zip(out, reference[rigid]):
+        assert relative(x, ref) <= TOL
+    assert solver.time == pytest.approx(SIM['tf'], rel=1e-12)
+
+
+@pytest.mark.parametrize('chunk', [1, 7, 1024, 5000])
+def test_chunks(chunk):
+    """Streamed blocks of any size give the in memory histories"""
+
+    whole = integrator.integrate(*column(False), jit=False)
+    out = integrator.integrate(*column(False), jit=False, sink=Memory(),
+                               chunk=chunk)
+    for x, y in zip(out, whole):
+        assert np.array_equal(x, y)
+
+
+@jit
+@pytest.mark.parametrize('rigid', [False, True])
+def test_jit(run, reference, rigid):
+    out = run(storage='banded', rigid=rigid, jit=True, format='npy')
+    for x, ref in zip(out, reference[rigid]):
+        assert relative(x, ref) <= TOL
+
+
+def test_unsupported(monkeypatch):
+    with pytest.raises(ValueError):
+        integrator.integrate(*column(False, 'dense'), jit=True)
+    with pytest.raises(ValueError):
+        integrator.integrate(*column(False), state={'step': 0})
+    monkeypatch.setattr(kernels, 'explicitTridiagonal', None)
+    with pytest.raises(ValueError):
+        integrator.integrate(*column(False), jit=True)
+    assert integrator.kernelArgs(column(False, 'dense')[0]) is None
@@ -0,0 +1,80 @@
+import collections
+
+import numpy as np
+import pytest
+
+import solve
+
+import modal.modal as modal
+import utilities.motion as motion
+
+from conftest import PARAMS, SIM, relative
+
+sla = pytest.importorskip('scipy.linalg')
+
+# Modal solution is exact in time, so it differs from explicit Newmark by
+# the first order discretization error of the time stepping
+TOL = 1e-2
+
+
+@pytest.fixture(scope='module')
+def column():
+    prof, m, k, c, f = solve.assemble(PARAMS, dict(SIM, rigid=True))
+    steps = int(round(SIM['tf'] / SIM['dt']))
+    a_hat = motion.Motion(SIM['A'], SIM['B']).history(
+        SIM['dt'] * np.arange(steps + 1))[1]
+    return m.matrix, k.matrix, a_hat
+
+
+def test_modal(run, explicit):
+    out = run(engine='modal', rigid=True, format='npy')
+    for x, ref in zip(out, explicit[True]):
+        assert relative(x, ref) <= TOL
+
+
+def test_modes(column, monkeypatch):
+    monkeypatch.setattr(modal, '_cache', collections.OrderedDict())
+    m, k = (x.toarray() for x in column[:2])
+    basis = modal.modes(*column[:2], 8)
+    w2 = sla.eigh(k[:-1, :-1], m[:-1, :-1], eigvals_only=True)[:8]
+    assert np.allclose(basis.omega, np.sqrt(w2), rtol=1e-10)
+    assert np.allclose(basis.phi.T @ m @ basis.phi, np.eye(8), atol=1e-10)
+    assert not np.any(basis.phi[-1])
+
+    # Fixed base shear column of height h, w = (2n - 1) pi vs / 2h
+    exact = np.pi * PARAMS['vs'] / (2 * SIM['h'])
+    assert basis.omega[0] == pytest.approx(exact, rel=1e-2)
+    assert basis.omega[1] == pytest.approx(3 * exact, rel=1e-2)
+
+
+def test_cache(column, monkeypatch):
+    monkeypatch.setattr(modal, '_cache', collections.OrderedDict())
+    m, k = column[:2]
+    basis = modal.modes(m, k, 8)
+    assert modal.modes(m.copy(), k.copy(), 8) is basis
+    assert modal.modes(m, k, 6) is not basis
+    for scale in range(2, modal.CACHE_SIZE + 3):
+        modal.modes(m, k * float(scale), 8)
+    assert len(modal._cache) == modal.CACHE_SIZE
+    assert modal.modes(m, k, 8) is not basis
+
+
+def test_truncation(column):
+    """Lowest modes carry the response of a pulse well below the highest
+    frequencies of the column"""
+
+    m, k, a_hat = column
+    full = modal.response(m, k, a_hat, SIM['dt'], 20)
+    few = modal.response(m, k, a_hat, SIM['dt'], 5, [0, 10])
+    for x, ref in zip(few[:2], full[:2]):
+        assert relative(x, ref[[0, 10]]) <= 1e-2
+    rows = modal.response(m, k, a_hat, SIM['dt'], 20, [0, 10])
+    for x, ref in zip(rows, full):
+        assert np.allclose(x, ref[[0, 10]], rtol=0.0, atol=1e-14)
+
+
+def test_damping(column):
+    m, k, a_hat = column
+    free = modal.response(m, k, a_hat, SIM['dt'])[2][0]
+    damped = modal.response(m, k, a_hat, SIM['dt'], zeta=0.05)[2][0]
+    assert np.abs(damped[-1000:]).max() < np.abs(free[-1000:]).max()
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+import utilities.motion as motion
+
+from conftest import PARAMS, SIM, relative
+
+DT = 0.005
+ACC = np.sin(np.linspace(0.0, 3 * np.pi, 50)) * np.linspace(1.0, 0.2, 50)
+
+
+def write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('header', [
+    'NPTS=   50, DT=   .0050 SEC',
+    '50   .0050   NPTS, DT',
+])
+def test_at2(tmp_path, header):
+    lines = ['PEER NGA STRONG MOTION DATABASE RECORD', 'TEST 90',
+             'ACCELERATION TIME SERIES IN UNITS OF G', header]
+    lines += [' '.join(f'{x:.7E}' for x in ACC[i:i + 5])
+              for i in range(0, len(ACC), 5)]
+    time, acc = motion.loadRecord(write(tmp_path / 'rec.AT2',
+                                        '\n'.join(lines) + '\n'))
+    assert np.allclose(acc, ACC)
+    assert np.allclose(time, DT * np.arange(len(ACC)))
+
+
+def test_columns(tmp_path):
+    body = '\n'.join(f'{t:.4f}, {x:.12f}' for t, x in
+                     zip(DT * np.arange(len(ACC)), ACC))
+    fname = write(tmp_path / 'rec.csv',
+                  f'# station A\ntime, acc\nNPTS 50\n50\n{body}\n')
+    time, acc = motion.loadRecord(fname)
+    assert np.allclose(acc, ACC)
+    assert np.allclose(time, DT * np.arange(len(ACC)))
+
+
+def test_single_column(tmp_path):
+    fname = write(tmp_path / 'rec.txt',
+                  '\n'.join(f'{x:.12f}' for x in ACC) + '\n')
+    with pytest.raises(ValueError, match='dt'):
+        motion.loadRecord(fname)
+    time, acc = motion.loadRecord(fname, 0.01)
+    assert np.allclose(acc, ACC)
+    assert np.allclose(time, 0.01 * np.arange(len(ACC)))
+
+
+def test_ragged(tmp_path):
+    body = '\n'.join(' '.join(f'{x:.12f}' for x in ACC[i:i + 4])
+                     for i in range(0, len(ACC), 4))
+    with pytest.raises(ValueError, match='rows'):
+        motion.loadRecord(write(tmp_path / 'rec.txt', body + '\n'), DT)
+
+
+def test_cached(tmp_path):
+    fname = write(tmp_path / 'rec.txt',
+                  '\n'.join(f'{x:.12f}' for x in ACC) + '\n')
+    first = motion.loadRecord(fname, DT)
+    assert motion.loadRecord(fname, DT)[1] is first[1]
+    assert not first[1].flags.writeable
+
+
+@pytest.mark.parametrize('order', [1, 2, 3])
+def test_baseline(order):
+    """Corrected velocity starts and ends at rest and matches the corrected
+    acceleration to the accuracy of the trapezoid rule"""
+
+    time = DT * np.arange(400)
+    acc = np.sin(2 * np.pi * time) + 0.3
+    record = motion.RecordedMotion((time, acc), order=order)
+    assert record.vel[0] == 0.0
+    assert abs(record.vel[-1]) < 1e-15
+    assert np.allclose(motion._integrate(time, record.acc), record.vel,
+                       atol=1e-6)
+
+    # No velocity step at the end of the record, displacement held
+    t = time[-1] + np.array([0.0, DT, 1.0])
+    assert np.allclose(record.v(t), 0.0)
+    assert np.allclose(record.a(t[1:]), 0.0)
+    assert np.allclose(record.u(t), record.disp[-1])
+
+
+def test_no_baseline():
+    time = DT * np.arange(400)
+    record = motion.RecordedMotion((time, np.ones(400)), order=None)
+    assert np.allclose(record.vel, time)
+
+
+def test_recorded_pulse(run, tmp_path):
+    """Recording the analytic pulse gives the same response"""
+
+    pulse = motion.Motion(SIM['A'], SIM['B'])
+    time = 1e-4 * np.arange(int(pulse.duration / 1e-4) + 1)
+    body = '\n'.join(f'{t:.6f},{x:.15e}' for t, x in zip(time, pulse.a(time)))
+    fname = write(tmp_path / 'pulse.csv', body + '\n')
+    recorded = run('recorded', motion=fname, baseline=None, format='npy')
+    expected = run('pulse', format='npy')
+    for x, ref in zip(recorded, expected):
+        assert relative(x, ref) <= 1e-2
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+import read
+import solve
+
+from conftest import PARAMS, SIM, TOL, relative
+
+
+def record(tmp_path, name='run', **settings):
+    """Return results of the regression column recording `settings`"""
+
+    sim = dict(SIM, name=name, format='npy', **settings)
+    return read.Results(solve.solve(PARAMS, sim, root=str(tmp_path) + '/'))
+
+
+def test_recorded_nodes(run, reference):
+    out = run(format='npy', nodes=[0, 7, 20], dt_out=1e-3)
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref[[0, 7, 20], ::5]) <= TOL
+
+
+def test_depths(tmp_path, reference):
+    """Depths are recorded at their nearest node"""
+
+    with record(tmp_path, depths=[0.2, 9.6, 20.0]) as results:
+        assert results.meta['nodes'] == [0, 10, 20]
+        assert results.meta['depth'] == [0.0, 10.0, 20.0]
+        assert relative(results.get('vel'), reference[False][1][[0, 10, 20]]
+                        ) <= TOL
+    with record(tmp_path, 'last', nodes=[-1]) as results:
+        assert results.meta['nodes'] == [20]
+
+
+def test_quantities(tmp_path, reference):
+    with record(tmp_path, quantities=['acc'], dt_out=2e-3) as results:
+        assert results.meta['quantities'] == ['acc']
+        assert results.shape('acc') == (21, 301)
+        assert results.meta['dt_out'] == pytest.approx(2e-3, rel=1e-12)
+        assert relative(results.get('acc'), reference[False][2][:, ::10]
+                        ) <= TOL
+        files = os.listdir(results.inDir)
+    assert 'accData.npy' in files
+    assert 'dispData.npy' not in files
+    assert 'velData.npy' not in files
+
+
+@pytest.mark.parametrize('engine', ['newmark', 'frequency'])
+def test_peaks(tmp_path, reference, engine):
+    """Peaks cover every node and time step whatever is recorded"""
+
+    with record(tmp_path, engine=engine, nodes=[0], dt_out=5e-3,
+                peaks=True) as results:
+        peak = results.get('peak')
+        assert peak.shape == (21, 3)
+        assert results.shape('disp') == (1, 121)
+        if engine == 'newmark':
+            expected = np.column_stack([np.abs(x).max(axis=1)
+                                        for x in reference[False]])
+            assert np.allclose(peak, expected, rtol=1e-12, atol=0.0)
+        else:
+            recorded = np.abs(results.get('disp')[0]).max()
+            assert recorded <= peak[0, 0] <= recorded * (1 + 1e-4)
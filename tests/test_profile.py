@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import solve
+
+import utilities.profile as profile
+
+from conftest import PARAMS, SIM, TOL, relative
+
+LAYERS = [{'h': 4.0, 'vs': 100.0, 'rho': 1600.0},
+          {'h': 10.0, 'vs': 250.0, 'rho': 1900.0, 'h_elem': 2.5},
+          {'h': 30.0, 'vs': 600.0, 'rho': 2100.0}]
+
+
+def test_uniform():
+    prof = profile.fromInputs(PARAMS, SIM)
+    assert prof.num_nodes == 21
+    assert np.array_equal(prof.depth, np.arange(21.0))
+    assert np.all(prof.vs == PARAMS['vs'])
+    assert np.all(prof.rho == PARAMS['rho'])
+
+
+def test_layers():
+    prof = profile.Profile(LAYERS, h_elem=2.0)
+    assert np.array_equal(prof.layer, np.repeat([0, 1, 2], [2, 4, 15]))
+    assert np.array_equal(prof.h_elem, np.repeat([2.0, 2.5, 2.0],
+                                                 [2, 4, 15]))
+    assert np.array_equal(prof.vs, np.repeat([100.0, 250.0, 600.0],
+                                             [2, 4, 15]))
+    assert prof.num_nodes == 22
+    assert prof.depth[[0, 2, 6, -1]].tolist() == [0.0, 4.0, 14.0, 44.0]
+
+
+@pytest.mark.parametrize('f_max', [5.0, 12.0, 30.0])
+@pytest.mark.parametrize('ppw', [6.0, 10.0])
+def test_wavelength(f_max, ppw):
+    """Each layer gets the fewest elements meeting the points per
+    wavelength target"""
+
+    prof = profile.Profile(LAYERS, f_max, ppw)
+    for i, layer in enumerate(LAYERS):
+        h_elem = prof.h_elem[prof.layer == i]
+        h_max = layer.get('h_elem', layer['vs'] / (f_max * ppw))
+        assert np.all(h_elem <= h_max * (1 + 1e-12))
+        assert (len(h_elem) == 1) or (layer['h'] / (len(h_elem) - 1) > h_max)
+        assert np.isclose(h_elem.sum(), layer['h'])
+    assert np.isclose(prof.h, 44.0)
+
+
+def test_assemble():
+    """Matrices are assembled from the properties of each element"""
+
+    params = dict(PARAMS, layers=LAYERS)
+    prof, m, k, c, f = solve.assemble(params, {'f_max': 10.0, 'ppw': 8.0})
+    g = prof.vs**2 * prof.rho / prof.h_elem
+    mass = prof.rho * prof.h_elem
+    assert np.allclose(np.diag(k.matrix.toarray(), 1), -g, rtol=1e-14)
+    assert np.isclose(m.diagonal().sum(), mass.sum(), rtol=1e-14)
+    assert np.allclose(m.diagonal()[1:-1], 0.5 * (mass[:-1] + mass[1:]),
+                       rtol=1e-14)
+    assert k.dim == m.dim == c.dim == prof.num_nodes
+
+
+def test_split_column(run, reference):
+    """Layers of the same material solve as the uniform column"""
+
+    layers = [{'h': 6.0, 'vs': 100.0, 'rho': 1000.0},
+              {'h': 14.0, 'vs': 100.0, 'rho': 1000.0}]
+    out = run(params=dict(PARAMS, layers=layers), format='npy')
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref) <= TOL
+
+
+def test_incompatible():
+    with pytest.raises(ValueError):
+        solve.assemble(PARAMS, dict(SIM, h_elem=3.0))
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pytest
+
+import read
+import solve
+
+from conftest import PARAMS, SIM
+
+FORMATS = ['txt', 'npy', 'npz', 'h5', 'zarr']
+
+
+@pytest.fixture(scope='module')
+def runs(tmp_path_factory):
+    """Output directories of one column saved in every format"""
+
+    root = str(tmp_path_factory.mktemp('read')) + '/'
+    saveDirs = {}
+    for fmt in FORMATS:
+        if fmt in ('h5', 'zarr'):
+            try:
+                solve.outputFormat({'format': fmt})
+            except ImportError:
+                continue
+        sim = dict(SIM, name=fmt, format=fmt, tf=0.2)
+        saveDirs[fmt] = solve.solve(PARAMS, sim, root=root)
+
+    return saveDirs
+
+
+@pytest.mark.parametrize('fmt', FORMATS)
+def test_slices(runs, fmt):
+    if fmt not in runs:
+        pytest.skip(f'{fmt} output not installed')
+
+    # Text keeps twelve decimals
+    atol = 1e-12 if (fmt == 'txt') else 0.0
+    whole = read.loadData(runs['npy'], 'vel')
+    with read.Results(runs[fmt]) as results:
+        assert results.fmt == fmt
+        assert results.shape('vel') == whole.shape
+        assert np.allclose(results.get('vel'), whole, rtol=0.0, atol=atol)
+
+        # Unsorted and repeated rows in a time window, both ends inclusive
+        rows = [15, 2, 15, 0]
+        df = results.get('vel', rows, 0.05, 0.1)
+        assert np.allclose(results.time(0.05, 0.1, 'vel'),
+                           results.dt * np.arange(250, 501))
+        assert np.allclose(df, whole[rows, 250:501], rtol=0.0, atol=atol)
+
+        # Rows nearest to depths
+        assert list(results.rows([0.0, 2.4, 20.0])) == [0, 2, 20]
+
+
+def test_plot(tmp_path, monkeypatch):
+    """Plots runs that recorded only some quantities"""
+
+    matplotlib = pytest.importorskip('matplotlib')
+    matplotlib.use('Agg')
+    import plot
+
+    root = tmp_path / 'simulation' / 'data'
+    solve.solve(PARAMS, dict(SIM, name='vel', format='npy', tf=0.2,
+                             quantities=['vel'], nodes=[0, 4, 8]),
+                root=str(root) + '/')
+    cwd = tmp_path / 'a' / 'b' / 'c'
+    cwd.mkdir(parents=True)
+    monkeypatch.chdir(cwd)
+    monkeypatch.setattr(plot.plt, 'savefig',
+                        lambda fname, **kwargs: open(fname, 'w').close())
+    plot.plot(True, 'vel')
+    assert os.path.exists(cwd / 'kinematic.png')
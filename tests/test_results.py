@@ -0,0 +1,117 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import read
+import solve
+
+import utilities.results as results
+
+from conftest import PARAMS, SIM
+
+
+@pytest.fixture
+def cached(tmp_path):
+    """Return function solving a column with the result cache in
+    `tmp_path`"""
+
+    store = str(tmp_path / 'store')
+
+    def cached(name, params=None, **settings):
+        sim = dict(SIM, name=name, results=store, format='npy', **settings)
+        return solve.solve(params or PARAMS, sim,
+                           root=str(tmp_path / 'runs') + '/')
+
+    return cached
+
+
+def outputs(saveDir):
+    with read.Results(saveDir) as out:
+        return [out.get(name) for name in ('disp', 'vel', 'acc')]
+
+
+def test_hit(cached, monkeypatch):
+    first = cached('first')
+
+    # A hit neither assembles nor solves, and rewrites the inputs
+    monkeypatch.setattr(solve, 'assemble', None)
+    second = cached('second', profile=True)
+    for x, y in zip(outputs(second), outputs(first)):
+        assert np.array_equal(x, y)
+    with open(os.path.join(second, 'meta.json')) as f:
+        meta = json.load(f)
+    with open(os.path.join(first, 'meta.json')) as f:
+        assert meta == dict(json.load(f), sim=meta['sim'])
+    assert meta['sim']['name'] == 'second'
+    with open(os.path.join(second, 'saveTime.txt')) as f:
+        assert 'dt' in f.read()
+
+    # Outputs are linked to the entry, run files are not
+    assert os.stat(os.path.join(second, 'dispData.npy')).st_nlink > 1
+    assert os.stat(os.path.join(second, 'meta.json')).st_nlink == 1
+    assert not os.path.exists(os.path.join(second, results.META))
+
+
+def test_miss(cached, monkeypatch):
+    cached('first')
+    calls = []
+    assemble = solve.assemble
+
+    def counted(*args):
+        calls.append(1)
+        return assemble(*args)
+
+    monkeypatch.setattr(solve, 'assemble', counted)
+    cached('vs', params=dict(PARAMS, vs=150.0))
+    cached('tf', tf=0.4)
+    assert len(calls) == 2
+
+
+def test_source_change(cached, monkeypatch):
+    cached('first')
+    monkeypatch.setattr(results, '_version', 'other source')
+    calls = []
+    assemble = solve.assemble
+    monkeypatch.setattr(solve, 'assemble',
+                        lambda *args: calls.append(1) or assemble(*args))
+    cached('second')
+    assert calls == [1]
+
+
+def test_finished(cached, monkeypatch):
+    """Rerunning finished outputs with the same inputs is a no-op"""
+
+    saveDir = cached('first')
+    assert results.marked(saveDir) == results.key(
+        PARAMS, dict(SIM, name='first', format='npy'))
+    monkeypatch.setattr(solve, 'assemble', None)
+    assert cached('first') == saveDir
+
+
+def test_key():
+    sim = dict(SIM, name='a')
+    assert results.key(PARAMS, sim) == results.key(
+        PARAMS, dict(sim, name='b', profile=True))
+    assert results.key(PARAMS, sim) != results.key(PARAMS, dict(sim, h=10))
+
+
+def test_evict(tmp_path):
+    store = results.ResultCache(str(tmp_path / 'store'), maxsize=2500)
+    for j in range(3):
+        src = tmp_path / f'run{j}'
+        src.mkdir()
+        (src / 'data.bin').write_bytes(bytes(1000))
+        (src / 'meta.json').write_text('{}')
+        os.utime(src / 'data.bin')
+        store.put(f'key{j}', str(src))
+        os.utime(os.path.join(store.path, f'key{j}'), (j, j))
+
+    store.evict()
+    assert sorted(os.listdir(store.path)) == ['key1', 'key2']
+    assert store.meta('key2') == {}
+    assert store.meta('key0') is None
+    assert not store.get('key0', str(tmp_path / 'out'))
+    assert store.get('key2', str(tmp_path / 'out'))
+    assert os.listdir(tmp_path / 'out') == ['data.bin']
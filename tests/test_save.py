@@ -0,0 +1,79 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+import read
+import solve
+
+import utilities.save as save
+
+from conftest import PARAMS, SIM, TOL, relative
+
+
+def available(fmt):
+    if fmt == 'h5':
+        pytest.importorskip('h5py')
+    if fmt == 'zarr':
+        pytest.importorskip('zarr')
+
+
+@pytest.mark.parametrize('fmt', save.FORMATS)
+def test_round_trip(tmp_path, fmt):
+    available(fmt)
+    rng = np.random.default_rng(0)
+    data = {name: rng.standard_normal((21, 3001))
+            for name in ('disp', 'vel', 'acc')}
+    for name, df in data.items():
+        save.saveData(df, name, str(tmp_path), fmt)
+    save.saveMeta({'format': fmt, 'dt': 2e-4}, str(tmp_path))
+    assert read.findFormat(str(tmp_path)) == fmt
+    for name, df in data.items():
+        if fmt == 'txt':
+            assert np.allclose(read.loadData(str(tmp_path), name), df,
+                               rtol=0.0, atol=1e-12)
+        else:
+            assert np.array_equal(read.loadData(str(tmp_path), name), df)
+
+
+@pytest.mark.parametrize('fmt', save.FORMATS)
+def test_format(run, reference, fmt):
+    available(fmt)
+    out = run(format=fmt, chunk=700)
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref) <= TOL
+
+
+@pytest.mark.parametrize('fmt', ['npy', 'h5'])
+def test_meta(tmp_path, fmt):
+    available(fmt)
+    sim = dict(SIM, name='run', format=fmt)
+    saveDir = solve.solve(PARAMS, sim, root=str(tmp_path) + '/')
+    meta = read.loadMeta(saveDir)
+    assert meta['format'] == fmt
+    assert (meta['num_nodes'], meta['steps']) == (21, 3000)
+    assert meta['dt'] == SIM['dt']
+    assert meta['params'] == PARAMS
+    if fmt == 'h5':
+        import h5py
+        with h5py.File(os.path.join(saveDir, 'data.h5'), 'r') as f:
+            assert json.loads(f.attrs['meta']) == meta
+
+
+def test_no_meta(tmp_path):
+    """Runs saved before metadata are read by their file names"""
+
+    df = np.arange(12.0).reshape(3, 4)
+    save.saveData(df, 'disp', str(tmp_path), 'npy')
+    assert read.findFormat(str(tmp_path)) == 'npy'
+    assert np.array_equal(read.loadData(str(tmp_path), 'disp'), df)
+    with pytest.raises(FileNotFoundError):
+        read.findFormat(str(tmp_path), 'vel')
+
+
+def test_unknown(tmp_path):
+    with pytest.raises(ValueError):
+        solve.solve(PARAMS, dict(SIM, name='run', format='csv'),
+                    root=str(tmp_path) + '/')
+    assert os.listdir(tmp_path) == []
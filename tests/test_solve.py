@@ -0,0 +1,10 @@
+from conftest import relative
+
+
+def test_print_flag(run, reference, capsys):
+    out = run(print_flag=True, format='npy')
+    printed = capsys.readouterr().out
+    for name in ('Mass Matrix', 'Stiffness Matrix', 'Damping Matrix'):
+        assert name in printed
+    for x, ref in zip(out, reference[False]):
+        assert relative(x, ref) <= 2e-12
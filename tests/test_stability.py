@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import read
+import solve
+
+import newmark.stability as stability
+import utilities.profile as profile
+
+from conftest import PARAMS, SIM
+
+LAYERS = [{'h': 5.0, 'vs': 120.0, 'rho': 1700.0, 'h_elem': 0.5},
+          {'h': 15.0, 'vs': 400.0, 'rho': 2000.0, 'h_elem': 1.5}]
+
+
+def omega(params, sim):
+    """Return highest natural frequency [rad/s] of the free column"""
+
+    prof, m, k, c, f = solve.assemble(params, dict(sim, storage='dense'))
+    return np.sqrt(np.max(np.linalg.eigvals(k.matrix / m.diagonal()[:, None]
+                                            ).real))
+
+
+def test_critical():
+    """Per element limit is the crossing time of the stiffest element and
+    bounds the stable step of the assembled column"""
+
+    prof = profile.Profile(LAYERS)
+    dt_cr = stability.criticalTimeStep(prof.h_elem, prof.vs)
+    assert dt_cr == pytest.approx(1.5 / 400.0, rel=1e-14)
+    assert dt_cr <= 2.0 / omega(dict(PARAMS, layers=LAYERS), {})
+    uniform = stability.criticalTimeStep(1.0, PARAMS['vs'])
+    assert uniform == pytest.approx(2.0 / omega(PARAMS, SIM), rel=1e-2)
+
+
+def test_defaults():
+    prof = profile.fromInputs(PARAMS, SIM)
+    dt, dt_cr, tf = solve.timeStep(prof, {})
+    assert dt_cr == pytest.approx(1e-2, rel=1e-14)
+    assert dt == pytest.approx(0.9 * dt_cr, rel=1e-14)
+    assert tf == 2.5
+    dt, dt_cr, tf = solve.timeStep(prof, {'cfl': 0.5, 'tf': 1.0})
+    assert (dt, tf) == (pytest.approx(0.5 * dt_cr, rel=1e-14), 1.0)
+    with pytest.raises(ValueError):
+        solve.timeStep(prof, {'cfl': 1.5})
+
+
+def test_user_step(capsys):
+    prof = profile.fromInputs(PARAMS, SIM)
+    assert solve.timeStep(prof, {'dt': 2e-3})[0] == 2e-3
+    assert 'Warning' not in capsys.readouterr().out
+    assert solve.timeStep(prof, {'dt': 2e-2})[0] == 2e-2
+    assert 'exceeds critical' in capsys.readouterr().out
+    solve.timeStep(prof, {'dt': 2e-2, 'scheme': 'implicit'})
+    solve.timeStep(prof, {'dt': 2e-2, 'engine': 'frequency'})
+    assert 'Warning' not in capsys.readouterr().out
+
+
+def test_stable_run(tmp_path):
+    """Run at the automatic step stays bounded, one past the limit blows
+    up"""
+
+    root = str(tmp_path) + '/'
+    peaks = {}
+    for name, dt in (('auto', None), ('unstable', 1.2e-2)):
+        sim = dict(SIM, name=name, dt=dt, tf=2.0, format='npy')
+        with read.Results(solve.solve(PARAMS, sim, root=root)) as results:
+            assert results.meta['dt_cr'] == pytest.approx(1e-2, rel=1e-14)
+            with np.errstate(all='ignore'):
+                peaks[name] = np.max(np.abs(results.get('disp')))
+            if dt == None:
+                assert results.dt == pytest.approx(9e-3, rel=1e-14)
+    assert peaks['auto'] < 1.0
+    assert not (peaks['unstable'] < 1e3)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import arrays.matrix as mat
+import arrays.storage as sto
+
+from conftest import TOL, relative
+
+STORAGES = ['dense', 'banded', 'csr']
+
+
+def matrices(storage):
+    rho = np.linspace(1500.0, 2000.0, 9)
+    vs = np.linspace(100.0, 300.0, 9)
+    return (mat.MassMatrix(10, rho, 0.5, 1.0, storage),
+            mat.StiffnessMatrix(10, vs, rho, 1.0, 0.5, storage),
+            mat.DampingMatrix(10, 400.0, 2200.0, 1.0, storage))
+
+
+@pytest.mark.parametrize('storage', STORAGES)
+def test_matrices(storage):
+    if storage == 'csr':
+        pytest.importorskip('scipy')
+    x = np.random.default_rng(0).standard_normal(10)
+    for matrix, dense in zip(matrices(storage), matrices('dense')):
+        assert matrix.storage == storage
+        assert np.array_equal(sto.toDense(matrix.matrix), dense.matrix)
+        assert np.allclose(sto.matvec(matrix.matrix, x, np.empty(10)),
+                           dense.matrix @ x, rtol=1e-14)
+        assert np.array_equal(matrix.diagonal(), np.diag(dense.matrix))
+        assert matrix.isDiagonal() == (not np.any(
+            dense.matrix - np.diag(np.diag(dense.matrix))))
+
+
+@pytest.mark.parametrize('rigid', [False, True])
+@pytest.mark.parametrize('storage', STORAGES)
+def test_storage(run, reference, storage, rigid):
+    if storage == 'csr':
+        pytest.importorskip('scipy')
+    out = run(storage=storage, rigid=rigid, jit=False, format='npy')
+    for x, ref in zip(out, reference[rigid]):
+        assert relative(x, ref) <= TOL
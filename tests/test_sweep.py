@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+
+import read
+import sweep
+
+from conftest import PARAMS, SIM, relative
+
+
+def test_grid():
+    cases = sweep.grid(PARAMS, dict(SIM, name='sweep'),
+                       {'vs': [100.0, 150.0]}, {'A': [1, 2], 'rigid': [True]})
+    names = [sim['name'] for _, sim in cases]
+    assert names == [os.path.join('sweep', f'vs={vs}_A={A}_rigid=True')
+                     for vs in (100, 150) for A in (1, 2)]
+    assert [params['vs'] for params, _ in cases] == [100.0, 100.0, 150.0,
+                                                     150.0]
+    assert all(sim['rigid'] for _, sim in cases)
+
+
+def test_empty_grid():
+    cases = sweep.grid(PARAMS, dict(SIM, name='single'))
+    assert len(cases) == 1
+    assert cases[0][1]['name'] == 'single'
+
+
+def test_sweep(run, tmp_path):
+    cases = sweep.grid(PARAMS, dict(SIM, name='sweep', format='npy'),
+                       {'vs': [100.0, 150.0]}, {'A': [1.0, 'bad']})
+    results = sweep.sweep(cases, workers=2, root=str(tmp_path / 'sweep'),
+                          verbose=False)
+
+    # Failures are reported per case without stopping the others
+    assert [r['ok'] for r in results] == [True, False, True, False]
+    assert all('TypeError' in r['error'] for r in results[1::2])
+    for r, (params, sim) in zip(results[::2], cases[::2]):
+        expected = run(sim['name'].replace(os.sep, '_'), params=params,
+                       format='npy')
+        with read.Results(r['path']) as out:
+            assert relative(out.get('disp'), expected[0]) <= 2e-12
+    assert np.all([r['elapsed'] > 0.0 for r in results])
@@ -0,0 +1,74 @@
+import json
+import os
+import types
+
+import pytest
+
+import solve
+
+import utilities.timing as timing
+
+from conftest import PARAMS, SIM
+
+
+class Clock:
+    """Performance counter advanced by hand"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_phases(monkeypatch):
+    """Nested phases are excluded from their outer phase"""
+
+    clock = Clock()
+    monkeypatch.setattr(timing, 'time',
+                        types.SimpleNamespace(perf_counter=clock))
+    timer = timing.Profiler()
+    clock.now += 1.0
+    with timer.phase('solve'):
+        clock.now += 2.0
+        with timer.phase('save'):
+            clock.now += 0.5
+        clock.now += 2.0
+    with timer.phase('save'):
+        clock.now += 0.5
+    clock.now += 2.0
+
+    report = timer.report(1000, 50)
+    assert report['total'] == 8.0
+    assert report['phases']['solve']['time'] == 4.0
+    assert report['phases']['save']['time'] == 1.0
+    assert report['phases']['save']['calls'] == 2
+    assert report['phases']['solve']['fraction'] == 0.5
+    assert report['other'] == 3.0
+    assert report['steps_per_s'] == 250.0
+    assert report['node_steps_per_s'] == 12500.0
+    assert timing.Profiler().report(1000, 50)['steps_per_s'] is None
+
+
+@pytest.mark.parametrize('engine', ['newmark', 'frequency'])
+def test_report(tmp_path, engine, capsys):
+    sim = dict(SIM, name='run', engine=engine, format='npy', profile=True)
+    saveDir = solve.solve(PARAMS, sim, root=str(tmp_path) + '/')
+    with open(os.path.join(saveDir, 'profile.json')) as f:
+        report = json.load(f)
+    assert set(report['phases']) == {'assemble', 'motion', 'solve', 'save'}
+    assert (report['steps'], report['num_nodes']) == (3000, 21)
+    assert report['engine'] == engine
+    assert report['steps_per_s'] > 0.0
+    assert report['node_steps_per_s'] == pytest.approx(
+        21 * report['steps_per_s'], rel=1e-12)
+    total = sum(p['time'] for p in report['phases'].values())
+    assert total + report['other'] == pytest.approx(report['total'],
+                                                    rel=1e-9)
+    assert 'steps/s' in capsys.readouterr().out
+
+
+def test_off(tmp_path):
+    saveDir = solve.solve(PARAMS, dict(SIM, name='run', format='npy'),
+                          root=str(tmp_path) + '/')
+    assert not os.path.exists(os.path.join(saveDir, 'profile.json'))